@@ -16,12 +16,12 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
-import re
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 from collections import defaultdict
 
 from ..utils.paths import find_existing_analysis_file
+from .wos_summary import summarize_wos_file
 
 
 class PublicationCitationAnalyzer:
@@ -72,29 +72,15 @@ class PublicationCitationAnalyzer:
         publications = defaultdict(int)
         citations = defaultdict(int)
 
-        with open(file_path, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-
-        # 按记录分割
-        records = content.split('\n\nPT ')[1:]  # 跳过文件头
-
-        for record in records:
-            if not record.strip():
-                continue
-
-            # 提取年份 (PY字段)
-            py_match = re.search(r'^PY\s+(\d{4})', record, re.MULTILINE)
-            if not py_match:
+        # 与文档类型分析共用同一份记录摘要，同一文件只解析一次
+        for record in summarize_wos_file(file_path):
+            if record.year is None:
                 continue
 
-            year = int(py_match.group(1))
-            publications[year] += 1
+            publications[record.year] += 1
 
-            # 提取引用次数 (TC字段)
-            tc_match = re.search(r'^TC\s+(\d+)', record, re.MULTILINE)
-            if tc_match:
-                citation_count = int(tc_match.group(1))
-                citations[year] += citation_count
+            if record.times_cited is not None:
+                citations[record.year] += record.times_cited
 
         return dict(publications), dict(citations)
 
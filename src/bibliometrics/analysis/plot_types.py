@@ -6,13 +6,40 @@
 自动从WOS文件中提取文档类型统计并生成可视化图表
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import re
+from __future__ import annotations
+
+import importlib.util
 from pathlib import Path
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
 from ..utils.paths import find_existing_analysis_file
+from .wos_summary import journal_doc_type_year_counts, summarize_wos_files
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas/matplotlib 延迟到真正绘图时再导入；这里只检查是否已安装，
+# 缺失时仍在导入阶段抛出 ImportError，便于 workflow 禁用图表步骤
+_MISSING_PLOT_DEPENDENCIES = [
+    name for name in ('pandas', 'matplotlib', 'PIL') if importlib.util.find_spec(name) is None
+]
+if _MISSING_PLOT_DEPENDENCIES:
+    raise ImportError(f"缺少绘图依赖: {', '.join(_MISSING_PLOT_DEPENDENCIES)}")
+
+# 环形图样式
+_DONUT_WEDGE_PROPS = {'width': 0.4, 'edgecolor': 'white', 'linewidth': 2}
+_DONUT_TEXT_PROPS = {'fontsize': 16, 'fontweight': 'bold'}
+
+
+def _save_png_and_tiff(fig, base_path: Path, dpi: int = 300):
+    """只渲染一次：先保存PNG，再由同一位图转存为LZW压缩的TIFF（无损）"""
+    from PIL import Image
+
+    png_path = base_path.with_suffix('.png')
+    fig.savefig(png_path, dpi=dpi, bbox_inches='tight', format='png',
+                facecolor='white', edgecolor='none')
+    with Image.open(png_path) as image:
+        image.save(base_path.with_suffix('.tiff'), format='TIFF', dpi=(dpi, dpi), compression='tiff_lzw')
 
 
 class DocumentTypeAnalyzer:
@@ -23,6 +50,8 @@ class DocumentTypeAnalyzer:
 
     def _setup_plot_style(self):
         """设置图表样式"""
+        import matplotlib.pyplot as plt
+
         try:
             plt.rcParams['font.family'] = 'Arial'
         except Exception:
@@ -53,38 +82,26 @@ class DocumentTypeAnalyzer:
             max_year: 最大年份（可选，用于筛选）
         """
         counts = {'Article': 0, 'Review': 0}
-
-        with open(file_path, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-
-        records = content.split('\n\nPT ')[1:]  # 跳过文件头
-
-        for record in records:
-            if record.strip():
-                match = re.search(r'^J\s*$', record, re.MULTILINE)
-                if match:
-                    # 如果指定了年份范围，先检查年份
-                    if min_year is not None or max_year is not None:
-                        py_match = re.search(r'^PY\s+(\d{4})', record, re.MULTILINE)
-                        if py_match:
-                            year = int(py_match.group(1))
-                            # 年份不在范围内，跳过
-                            if min_year and year < min_year:
-                                continue
-                            if max_year and year > max_year:
-                                continue
-                        else:
-                            # 没有年份信息，跳过
-                            continue
-
-                    # 查找DT字段
-                    dt_match = re.search(r'^DT\s+(.+?)$', record, re.MULTILINE)
-                    if dt_match:
-                        doc_type = dt_match.group(1).strip()
-                        if 'Article' in doc_type:
-                            counts['Article'] += 1
-                        elif 'Review' in doc_type:
-                            counts['Review'] += 1
+        filter_by_year = min_year is not None or max_year is not None
+
+        def in_year_range(year: Optional[int]) -> bool:
+            # 没有年份信息时跳过
+            if year is None:
+                return False
+            if min_year and year < min_year:
+                return False
+            if max_year and year > max_year:
+                return False
+            return True
+
+        # 遍历缓存的 (DT, 年份) 组合计数而非逐条记录，每种组合只归类一次
+        for (doc_type, year), count in journal_doc_type_year_counts(file_path).items():
+            if filter_by_year and not in_year_range(year):
+                continue
+            if 'Article' in doc_type:
+                counts['Article'] += count
+            elif 'Review' in doc_type:
+                counts['Review'] += count
 
         return counts
 
@@ -99,6 +116,11 @@ class DocumentTypeAnalyzer:
             min_year: 最小年份（可选）
             max_year: 最大年份（可选）
         """
+        import pandas as pd
+
+        # 三个文件一次性预解析（大文件时多进程并行），下面的统计直接命中缓存
+        summarize_wos_files([wos_file, scopus_file, final_file])
+
         # 为了兼容 workflow 与独立调用，三个输入都允许再次应用年份筛选。
         wos_counts = self.parse_wos_file(wos_file, min_year, max_year)
         scopus_counts = self.parse_wos_file(scopus_file, min_year, max_year)
@@ -113,72 +135,47 @@ class DocumentTypeAnalyzer:
 
         return data
 
+    def _draw_donut(self, ax, sub: pd.DataFrame, title: str):
+        """在单个子图上绘制环形图（无数据时显示 No Data）"""
+        total = int(sub['Count'].sum())
+        if total > 0:
+            # 列一次性转成 Python 列表，颜色和标签共用
+            article_types = sub['Article_Type'].tolist()
+            counts = sub['Count'].tolist()
+            colors = [self.palette[cat] for cat in article_types]
+            labels = [f"{article_type}\n(n={int(count)})" for article_type, count in zip(article_types, counts)]
+            _, _, pct_texts = ax.pie(sub['Count'], labels=labels, colors=colors, autopct='%1.1f%%',
+                                     startangle=90, wedgeprops=_DONUT_WEDGE_PROPS,
+                                     textprops=_DONUT_TEXT_PROPS, pctdistance=0.8)
+            # 设置百分比标签颜色为白色
+            for text in pct_texts:
+                text.set(color='white', fontsize=16, fontweight='bold')
+            ax.text(0, 0, f'n={total}', ha='center', va='center', fontsize=30, fontweight='bold')
+        else:
+            ax.text(0.5, 0.5, 'No Data', ha='center', va='center', fontsize=20,
+                    transform=ax.transAxes, color='gray')
+        ax.set_title(title, pad=20)
+
     def plot_distribution(self, data: pd.DataFrame, output_dir: str):
         """绘制文档类型分布图"""
+        import matplotlib.pyplot as plt
+
         fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(22, 8))
 
-        donut_width = 0.4
-        wedge_props = {'width': donut_width, 'edgecolor': 'white', 'linewidth': 2}
-        text_props = {'fontsize': 16, 'fontweight': 'bold'}
-
-        # Web of Science
-        data1 = data[['Article_Type', 'WoS_Count']].rename(columns={'WoS_Count': 'Count'})
-        total1 = int(data1['Count'].sum())
-        if total1 > 0:
-            colors1 = [self.palette[cat] for cat in data1['Article_Type']]
-            labels1 = [f"{row['Article_Type']}\n(n={int(row['Count'])})" for _, row in data1.iterrows()]
-            ax1.pie(data1['Count'], labels=labels1, colors=colors1, autopct='%1.1f%%',
-                    startangle=90, wedgeprops=wedge_props, textprops=text_props, pctdistance=0.8)
-            ax1.text(0, 0, f'n={total1}', ha='center', va='center', fontsize=30, fontweight='bold')
-        else:
-            ax1.text(0.5, 0.5, 'No Data', ha='center', va='center', fontsize=20,
-                    transform=ax1.transAxes, color='gray')
-        ax1.set_title('Web of Science', pad=20)
-
-        # Scopus
-        data2 = data[['Article_Type', 'Scopus_Count']].rename(columns={'Scopus_Count': 'Count'})
-        total2 = int(data2['Count'].sum())
-        if total2 > 0:
-            colors2 = [self.palette[cat] for cat in data2['Article_Type']]
-            labels2 = [f"{row['Article_Type']}\n(n={int(row['Count'])})" for _, row in data2.iterrows()]
-            ax2.pie(data2['Count'], labels=labels2, colors=colors2, autopct='%1.1f%%',
-                    startangle=90, wedgeprops=wedge_props, textprops=text_props, pctdistance=0.8)
-            ax2.text(0, 0, f'n={total2}', ha='center', va='center', fontsize=30, fontweight='bold')
-        else:
-            ax2.text(0.5, 0.5, 'No Data', ha='center', va='center', fontsize=20,
-                    transform=ax2.transAxes, color='gray')
-        ax2.set_title('Scopus', pad=20)
-
-        # Final Dataset
-        data3 = data[['Article_Type', 'Final_Count']].rename(columns={'Final_Count': 'Count'})
-        total3 = int(data3['Count'].sum())
-        if total3 > 0:
-            colors3 = [self.palette[cat] for cat in data3['Article_Type']]
-            labels3 = [f"{row['Article_Type']}\n(n={int(row['Count'])})" for _, row in data3.iterrows()]
-            ax3.pie(data3['Count'], labels=labels3, colors=colors3, autopct='%1.1f%%',
-                    startangle=90, wedgeprops=wedge_props, textprops=text_props, pctdistance=0.8)
-            ax3.text(0, 0, f'n={total3}', ha='center', va='center', fontsize=30, fontweight='bold')
-        else:
-            ax3.text(0.5, 0.5, 'No Data', ha='center', va='center', fontsize=20,
-                    transform=ax3.transAxes, color='gray')
-        ax3.set_title('Final Dataset', pad=20)
-
-        # 设置百分比标签颜色为白色
-        for ax in [ax1, ax2, ax3]:
-            for text in ax.texts:
-                if text.get_text().endswith('%'):
-                    text.set_color('white')
-                    text.set_fontsize(16)
-                    text.set_fontweight('bold')
+        panels = [
+            (ax1, 'WoS_Count', 'Web of Science'),
+            (ax2, 'Scopus_Count', 'Scopus'),
+            (ax3, 'Final_Count', 'Final Dataset'),
+        ]
+        for ax, column, title in panels:
+            self._draw_donut(ax, data[['Article_Type', column]].rename(columns={column: 'Count'}), title)
 
         fig.suptitle('Distribution of Articles and Reviews Across Databases', y=1.02, fontweight='bold')
         fig.tight_layout(rect=[0, 0, 1, 0.95])
 
         # 保存图片
         output_path = Path(output_dir)
-        for fmt in ['tiff', 'png']:
-            fig.savefig(output_path / f'document_types.{fmt}', dpi=300, bbox_inches='tight',
-                       format=fmt, facecolor='white', edgecolor='none')
+        _save_png_and_tiff(fig, output_path / 'document_types')
 
         plt.close(fig)
         print(f"✓ 图表已保存: {output_path}/document_types.tiff 和 .png")
@@ -267,12 +264,12 @@ def generate_document_type_analysis(data_dir: str, min_year: int = None, max_yea
     data_folder = data_dir / 'data'
     data_folder.mkdir(exist_ok=True)
     final_data_output = data_folder / 'download_final_data.txt'
-    shutil.copy(final_file, final_data_output)
+    shutil.copyfile(final_file, final_data_output)
     print(f"  ✓ 分析数据已复制到: {final_data_output}")
 
     # 保存代码副本
     code_copy = output_dir / 'plot_document_types.py'
-    shutil.copy(__file__, code_copy)
+    shutil.copyfile(__file__, code_copy)
     print(f"  ✓ 脚本副本: {code_copy.name}")
 
     # 最后总结
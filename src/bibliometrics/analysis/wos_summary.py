@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WOS文件记录摘要
+
+一次扫描提取每条记录的 PT/DT/PY/TC，供文档类型图和年度发文/引用图共用，
+同一文件（路径、修改时间、大小均未变）只解析一次。
+"""
+
+import os
+import re
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# 记录中需要的字段行（PT/DT/PY/TC）及记录结束行 ER
+# 直接在原始字节上匹配，省去整文件的 UTF-8 解码，只解码 DT 值
+_RECORD_FIELD_RE = re.compile(rb'^(PT|DT|PY|TC|ER)\b[ \t]*(.*?)[ \t\r]*$', re.MULTILINE)
+_LEADING_DIGITS_RE = re.compile(rb'\d+')
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+# 缓存最近解析过的文件数
+_CACHE_MAX_ENTRIES = 8
+# 未缓存文件合计超过该大小时才用多进程并行解析，小文件不值得启动进程池
+_PARALLEL_MIN_BYTES = 32 << 20
+
+
+class RecordSummary(NamedTuple):
+    """单条WOS记录的摘要字段"""
+    is_journal: bool
+    doc_type: Optional[str]
+    year: Optional[int]
+    times_cited: Optional[int]
+
+
+_CacheKey = Tuple[str, int, int]
+_summary_cache: 'OrderedDict[_CacheKey, Tuple[RecordSummary, ...]]' = OrderedDict()
+_journal_tally_cache: 'OrderedDict[_CacheKey, Counter]' = OrderedDict()
+
+
+def summarize_wos_file(file_path: str) -> Tuple[RecordSummary, ...]:
+    """解析WOS文件并返回每条记录的摘要（按文件路径、修改时间和大小缓存）"""
+    return summarize_wos_files([file_path])[0]
+
+
+def summarize_wos_files(file_paths: Sequence[str]) -> List[Tuple[RecordSummary, ...]]:
+    """批量解析多个WOS文件；未缓存的大文件用多进程并行解析，结果写入共享缓存"""
+    keys = [_cache_key(file_path) for file_path in file_paths]
+    resolved: Dict[_CacheKey, Tuple[RecordSummary, ...]] = {}
+    pending = []
+    for key in dict.fromkeys(keys):
+        if key in _summary_cache:
+            _summary_cache.move_to_end(key)
+            resolved[key] = _summary_cache[key]
+        else:
+            pending.append(key)
+
+    if len(pending) > 1 and sum(size for _, _, size in pending) >= _PARALLEL_MIN_BYTES:
+        with ProcessPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as executor:
+            results = list(executor.map(_parse_wos_file, [path for path, _, _ in pending]))
+    else:
+        results = [_parse_wos_file(path) for path, _, _ in pending]
+
+    for key, summaries in zip(pending, results):
+        resolved[key] = summaries
+        _summary_cache[key] = summaries
+        if len(_summary_cache) > _CACHE_MAX_ENTRIES:
+            _summary_cache.popitem(last=False)
+
+    return [resolved[key] for key in keys]
+
+
+def journal_doc_type_year_counts(file_path: str) -> Counter:
+    """期刊记录按 (DT原文, 年份) 的计数（与摘要同样按文件缓存），统计只需遍历不同组合"""
+    key = _cache_key(file_path)
+    tally = _journal_tally_cache.get(key)
+    if tally is None:
+        tally = Counter(
+            (record.doc_type, record.year) for record in summarize_wos_file(file_path)
+            if record.is_journal and record.doc_type
+        )
+        _journal_tally_cache[key] = tally
+        if len(_journal_tally_cache) > _CACHE_MAX_ENTRIES:
+            _journal_tally_cache.popitem(last=False)
+    else:
+        _journal_tally_cache.move_to_end(key)
+    return tally
+
+
+def _cache_key(file_path: str) -> _CacheKey:
+    stat_result = os.stat(file_path)
+    return os.path.abspath(file_path), stat_result.st_mtime_ns, stat_result.st_size
+
+
+def _parse_wos_file(file_path: str) -> Tuple[RecordSummary, ...]:
+    content = Path(file_path).read_bytes()
+    if content.startswith(_UTF8_BOM):
+        content = content[len(_UTF8_BOM):]
+
+    # 报告等非WOS文本中没有 PT 行，子串检查即可跳过整个正则扫描
+    if b'PT ' not in content:
+        return ()
+
+    # 同一种 DT 只解码一次，各记录共享同一个字符串对象
+    doc_type_names: Dict[bytes, str] = {}
+    summaries = []
+    in_record = False
+    is_journal = False
+    doc_type = None
+    year = None
+    times_cited = None
+
+    # 单次扫描全文，只在 PT/DT/PY/TC/ER 行上回到 Python 层；各字段取第一个有效值
+    for match in _RECORD_FIELD_RE.finditer(content):
+        tag, value = match.group(1), match.group(2)
+        if tag == b'PT':
+            if in_record:
+                summaries.append(RecordSummary(is_journal, doc_type, year, times_cited))
+            in_record = True
+            is_journal = value == b'J'
+            doc_type = None
+            year = None
+            times_cited = None
+        elif not in_record:
+            continue
+        elif tag == b'DT':
+            if doc_type is None:
+                doc_type = doc_type_names.get(value)
+                if doc_type is None:
+                    doc_type = doc_type_names[value] = value.decode('utf-8', 'replace')
+        elif tag == b'PY':
+            if year is None and len(value) >= 4 and value[:4].isdigit():
+                year = int(value[:4])
+        elif tag == b'TC':
+            if times_cited is None:
+                digits = _LEADING_DIGITS_RE.match(value)
+                if digits:
+                    times_cited = int(digits.group())
+        else:
+            summaries.append(RecordSummary(is_journal, doc_type, year, times_cited))
+            in_record = False
+
+    # 文件末尾缺少 ER 的记录也计入
+    if in_record:
+        summaries.append(RecordSummary(is_journal, doc_type, year, times_cited))
+
+    return tuple(summaries)
@@ -17,12 +17,12 @@ import os
 
 import logging
 import re
-import time
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 from ..standardizers.wos import WOSStandardizerBatch
 from .scopus import ScopusToWosConverter
 from ..gemini_config import GeminiConfig
+from ..utils.wos_records import iter_wos_record_blocks
 
 logging.basicConfig(
     level=logging.INFO,
@@ -36,7 +36,8 @@ class EnhancedConverterBatchV2:
     """增强版转换器（批量并发版 v2.0 - 只标准化国家和期刊）"""
 
     def __init__(self, input_file: str, output_file: str, enable_standardization: bool = True,
-                 max_workers: int = 5, batch_size: int = 20, reference_wos_file: Optional[str] = None):
+                 max_workers: int = 5, batch_size: int = 20, reference_wos_file: Optional[str] = None,
+                 records: Optional[List[Dict]] = None):
         self.input_file = input_file
         self.output_file = output_file
         self.enable_standardization = enable_standardization
@@ -47,6 +48,7 @@ class EnhancedConverterBatchV2:
             input_file,
             output_file,
             reference_wos_file=reference_wos_file,
+            records=records,
         )
 
         # 创建WOS标准化器（批量并发版，降低并发数避免429错误）
@@ -98,6 +100,7 @@ class EnhancedConverterBatchV2:
 
         # 保存数据库
         self.standardizer.db.save_database()
+        self.standardizer.close()
 
         # 打印统计
         self._print_statistics()
@@ -148,11 +151,6 @@ class EnhancedConverterBatchV2:
         logger.info("批量标准化国家名...")
         country_mapping = self.standardizer.standardize_countries_batch(unique_countries)
 
-        # 批次间延迟，避免429错误
-        if unique_journals:
-            logger.info("⏸️  等待3秒后继续...")
-            time.sleep(3.0)
-
         # 批量标准化期刊
         logger.info("批量标准化期刊名...")
         journal_mapping = self.standardizer.standardize_journals_batch(unique_journals)
@@ -213,10 +211,8 @@ class EnhancedConverterBatchV2:
     def _parse_wos_file(self, content: str) -> List[Dict[str, str]]:
         """解析WOS文件"""
         records = []
-        record_blocks = content.split('\n\nPT ')[1:]
 
-        for block in record_blocks:
-            block = 'PT ' + block
+        for block in iter_wos_record_blocks(content):
             record = {}
             current_field = None
             current_value = []
@@ -21,15 +21,22 @@ Scopus CSV to WOS Plain Text Converter
 """
 
 import csv
+import functools
+import itertools
 import re
+import operator
 import os
+import stat
 import sys
 import json
 import logging
 import unicodedata
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
 from pathlib import Path
+from types import MappingProxyType
 
 from ..utils.paths import resolve_project_path
 
@@ -41,12 +48,401 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 驻留（sys.intern）字符串的长度上限：作者名、机构地址在语料中反复出现，超长文本不值得驻留
+_INTERN_MAX_LENGTH = 256
+
+
+def _intern_short(value: str) -> str:
+    """驻留较短的重复字符串，使相同内容共享同一对象"""
+    return sys.intern(value) if len(value) <= _INTERN_MAX_LENGTH else value
+
+
+# 机构块切分用的国家名（小写，与 _normalize_lookup_key 的结果一致）
+_AFFILIATION_SPLIT_COUNTRIES = frozenset(sys.intern(country.lower()) for country in [
+    'USA', 'United States', 'United Kingdom', 'England', 'Scotland', 'Wales',
+    'China', 'Peoples R China', 'Japan', 'Germany', 'France', 'Italy', 'Spain',
+    'Canada', 'Australia', 'India', 'South Korea', 'Brazil', 'Russia',
+    'Netherlands', 'Switzerland', 'Sweden', 'Belgium', 'Austria', 'Poland',
+    'Israel', 'Palestine', 'Argentina', 'Mexico', 'Turkey', 'Turkiye',
+    'South Africa', 'Singapore', 'Taiwan', 'Hong Kong', 'Ireland', 'Denmark',
+    'Norway', 'Finland', 'Greece', 'Portugal', 'Czech Republic', 'Hungary',
+    'Romania', 'Chile', 'Colombia', 'Peru', 'Iran', 'Iraq', 'Egypt', 'Thailand'
+])
+
+
+# 一级机构关键词（明确的）
+_PRIMARY_INSTITUTION_KEYWORDS = [
+    'University', 'Università', 'Universität', 'Universit', 'Univ',
+    'Hospital', 'Ospedale', 'Hosp',
+    'Institute', 'Istituto', 'Institut',
+    'Foundation', 'Fondazione', 'Fdn',
+    'IRCCS', 'Policlinico', 'Clinic',
+    'Center', 'Centre', 'Centro', 'Academy', 'Accademia'
+]
+
+# 二级单位关键词（明确的）
+_SECONDARY_INSTITUTION_KEYWORDS = [
+    'Department', 'Dipartimento', 'Dept',
+    'Division', 'Divisione', 'Div',
+    'Faculty', 'Facolta', 'Fac',
+    'Unit', 'Unità',
+    'Laboratory', 'Laboratorio', 'Lab',
+    'Service', 'Servizio',
+    'Section', 'Sezione'
+]
+
+# 专业学院指示词：School 名称中出现这些词时通常为独立机构
+_PROFESSIONAL_SCHOOL_INDICATORS = (
+    'medical', 'medicine', 'pharmacy', 'law', 'business',
+    'engineering', 'public health', 'hygiene', 'economics',
+    'tropical', 'veterinary', 'dental', 'nursing'
+)
+
+# extract_primary_institutions 使用的关键词表（小写，逐段匹配）
+_C3_PRIMARY_KEYWORDS = tuple(keyword.lower() for keyword in [
+    'University', 'Università', 'Universität', 'Universi',  # 大学
+    'Hospital', 'Ospedale', 'Clinic', 'Medical Center',     # 医院
+    'Institute', 'Istituto', 'Institut',                    # 研究所
+    'Academy', 'Accademia',                                 # 科学院
+    'Foundation', 'Fondazione', 'IRCCS',                    # 基金会/研究机构
+    'Corporation', 'Company', 'Ltd',                        # 企业
+    'Ministry', 'Government',                               # 政府机构
+])
+
+# 二级单位关键词（需要过滤掉）
+# 匹配策略：
+# 1. "xxx of" 形式：精确匹配开头
+# 2. 单词形式（dept, faculty等）：匹配任意位置或开头
+_C3_SECONDARY_PREFIXES = (
+    # 严格匹配开头的模式（"of"形式）
+    'department of', 'dept of', 'dept.',
+    'division of', 'div of',
+    'section of', 'unit of',
+    'laboratory of', 'lab of',
+    'center for', 'centre for',
+    'school of', 'faculty of', 'college of',
+    'group of', 'branch of',
+)
+
+# 宽松匹配的二级单位标识（匹配任意位置）
+_C3_SECONDARY_INDICATORS = (
+    'dept ', ' dept', 'dept.', 'dept,',  # dept作为单词
+    'department',  # department作为单词
+    'faculty ',  # faculty作为单词（注意空格，避免匹配Faculty of XX）
+    'facoltà', 'faculdade', 'fac ',  # 意大利语/葡萄牙语/西班牙语学院
+    'graduate school',  # 研究生院
+    'u.o.', 'uo ', 'uoc ',  # 意大利语部门缩写（Unità Operativa）
+    ' unit', ' group', ' programme', ' program',  # 单元、小组、项目
+    ' branch', ' ward', ' office',  # 分支、病区、办公室
+    'oncologia ', 'anatomia ', 'epidemiologia ',  # 意大利语学科部门
+    'departamento de', 'dipartimento di',  # 西班牙语/意大利语部门
+    'sch ', ' sch',  # school的缩写（如"sch pharm", "tongji sch"）
+    'school med', 'school pharm', 'school engn',  # 学院+专业缩写组合
+    'faculty med', 'faculty pharm', 'faculty phys',  # 学院+专业缩写组合
+    'college engn',  # 学院+专业缩写组合
+    ' med iii', ' med ii', ' med i',  # 内科三科、二科、一科（部门编号）
+    'internal med',  # 内科（部门）
+)
+
+# 地址信息关键词
+_C3_ADDRESS_INDICATORS = (
+    'ave', 'avenue', 'blvd', 'boulevard', 'rd', 'road',
+    'st ', 'street', 'dr ', 'drive', 'lane', 'way'
+)
+
+# 单个学科词（没有机构关键词时应该过滤）
+_C3_DISCIPLINE_ONLY_PATTERNS = (
+    'microbiology', 'immunology', 'oncology', 'pathology',
+    'pharmacology', 'physiology', 'biochemistry', 'biology',
+    'chemistry', 'physics', 'engineering', 'development',
+    'pulmonary', 'cardiology', 'neurology', 'dermatology',
+    'venereology', 'allergology', 'translational',
+    'biotechnological', 'pharmaceutical', 'biomedical',
+    'therapeutics', 'genomics', 'immunotherapy', 'biophysical',
+    'thermodynamics', 'interface', 'medicinal', 'regulatory',
+    'zoology', 'transplantation', 'infectious diseases',
+    'pneumology', 'surgical', 'experimental', 'clinical',
+    ' sci', ' biol', ' chem',  # 缩写形式（带空格避免误匹配）
+)
+
+# 设施类关键词（应该被过滤）
+_C3_FACILITY_INDICATORS = (
+    'facility', 'core', 'platform', 'service',
+)
+
+
+# 并行转换时每个任务包含的记录数
+_PARALLEL_CHUNKSIZE = 64
+
+# WOS 多值字段的续行分隔（换行 + 三个空格缩进）
+_CONTINUATION_SEPARATOR = '\n   '
+
+# 作者缩写中需要删除的点号与空格（M. V. -> MV）
+_INITIALS_STRIP_TABLE = str.maketrans('', '', '. ')
+
+# 姓氏粒子（大小写敏感匹配）
+_NAME_PARTICLES = frozenset([
+    'Abu', 'Al', 'El', 'Ibn', 'bin',  # 阿拉伯语
+    'van', 'van der', 'van den', 'von', 'von der',  # 荷兰语/德语
+    'de', 'del', 'della', 'di', 'da',  # 西班牙语/意大利语
+    'Mc', 'Mac',  # 爱尔兰语
+])
+
+# 作者全名尾部的学位/头衔（按顺序依次去除）
+_DEGREE_SUFFIX_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r',?\s*M\.?D\.?$', r',?\s*Ph\.?D\.?$', r',?\s*Dr\.?$',
+    r',?\s*Prof\.?$', r',?\s*M\.?S\.?$', r',?\s*B\.?S\.?$'
+))
+
+# 通讯作者姓名中的辈分后缀与姓氏粒子（小写）
+_CORRESPONDENCE_NAME_SUFFIXES = frozenset({'jr', 'jnr', 'sr', 'ii', 'iii', 'iv'})
+_CORRESPONDENCE_SURNAME_PARTICLES = frozenset({
+    'al', 'el', 'de', 'del', 'della', 'da', 'di', 'van', 'von', 'bin', 'ibn', 'abu', 'ben'
+})
+
+# 国家名称映射表（Scopus → WOS标准，键为小写）
+_WOS_COUNTRY_MAPPING = {scopus_name.lower(): wos_name for scopus_name, wos_name in {
+    'United States': 'USA',
+    'United Kingdom': 'England',  # 默认England，除非明确是Scotland等
+    'P. R. China': 'Peoples R China',
+    'PR China': 'Peoples R China',
+    'China': 'Peoples R China',
+    'South Korea': 'South Korea',
+    'Korea': 'South Korea',
+    'Turkey': 'Turkiye',
+    'Russia': 'Russia',
+    'Iran': 'Iran',
+    'Vietnam': 'Vietnam',
+    'Czech Republic': 'Czech Republic',
+    'Taiwan': 'Taiwan',
+}.items()}
+
+# 转换过程中实际读取的 Scopus CSV 列（其余列如 Funding Texts、Index Keywords 不载入内存）
+_SCOPUS_COLUMNS = (
+    'Authors', 'Author full names', 'Title', 'Year', 'Source title',
+    'Abbreviated Source Title', 'Volume', 'Issue', 'Art. No.', 'Page start',
+    'Page end', 'Cited by', 'DOI', 'Affiliations', 'Authors with affiliations',
+    'Abstract', 'Author Keywords', 'References', 'Correspondence Address',
+    'Publisher', 'ISSN', 'PubMed ID', 'Language of Original Document',
+    'Document Type', 'EID',
+)
+
+
+def _compile_substring_alternation(keywords: Iterable[str]) -> re.Pattern:
+    """把关键词编译为小写子串交替式，用于在已小写的文本上做一次性 search。"""
+    return re.compile('|'.join(re.escape(keyword.lower()) for keyword in keywords))
+
+
+@functools.cache
+def _raise_csv_field_size_limit() -> None:
+    """放宽 csv 单字段长度上限（默认 128K，长参考文献列表会超出），进程内只设置一次"""
+    limit = sys.maxsize
+    while True:
+        try:
+            csv.field_size_limit(limit)
+            return
+        except OverflowError:
+            # Windows 上 C long 为 32 位
+            limit //= 10
+
+
+def scopus_record_builder(header: List[str]) -> Callable[[List[str]], Dict]:
+    """
+    按CSV表头生成“行 → 记录字典”的转换函数（只保留转换用到的列）
+
+    Args:
+        header: Scopus CSV表头
+
+    Returns:
+        接受 csv.reader 行（列表）并返回记录字典的函数
+    """
+    # 验证必要字段
+    required_fields = {'Authors', 'Title', 'Year'}
+    missing_fields = required_fields - set(header)
+    if missing_fields:
+        logger.warning(f"CSV文件缺少推荐字段: {missing_fields}")
+
+    # 表头只解析一次，逐行按列下标取值
+    column_index = {name: i for i, name in enumerate(header)}
+    columns = [(name, column_index[name]) for name in _SCOPUS_COLUMNS if name in column_index]
+    names = [name for name, _ in columns]
+    # itemgetter 在 C 层一次取出全部所需列（至少两列时才返回元组）
+    pick = operator.itemgetter(*(i for _, i in columns)) if len(columns) > 1 else None
+    width = len(header)
+
+    def build_record(row: List[str]) -> Dict:
+        if len(row) >= width:
+            if pick is not None:
+                return dict(zip(names, pick(row)))
+            return {name: row[i] for name, i in columns}
+        # 与 DictReader 一致：缺失的尾部列取 None
+        return {name: row[i] if i < len(row) else None for name, i in columns}
+
+    return build_record
+
+
+def _wrap_greedy(pieces: List[str], max_width: int) -> List[str]:
+    """
+    贪心换行：片段以单个空格相连，超过 max_width 时另起一行（超长片段单独成行）
+
+    只累计长度、每行 join 一次，不为每个片段拼接试探字符串
+    """
+    lines: List[str] = []
+    current: List[str] = []
+    current_len = 0
+    for piece in pieces:
+        candidate_len = current_len + (1 if current_len else 0) + len(piece)
+        if candidate_len <= max_width:
+            if current_len:
+                current.append(piece)
+            else:
+                current = [piece]
+            current_len = candidate_len
+        else:
+            if current_len:
+                lines.append(' '.join(current))
+            current = [piece]
+            current_len = len(piece)
+
+    # 添加最后一行
+    if current_len:
+        lines.append(' '.join(current))
+    return lines
+
+
+def _compile_word_replacements(replacements: Dict[str, str], ignore_case: bool = False):
+    """
+    把整词替换表编译为一个交替正则（长词优先），一次扫描完成全部替换。
+
+    Returns:
+        (正则, 查找表)；替换表为空时正则为 None。忽略大小写时查找表的键为小写，同键保留先出现的规则
+    """
+    lookup: Dict[str, str] = {}
+    for old, new in replacements.items():
+        lookup.setdefault(old.lower() if ignore_case else old, new)
+    if not replacements:
+        return None, lookup
+    pattern = re.compile(
+        r'\b(?:' + '|'.join(re.escape(old) for old in sorted(replacements, key=len, reverse=True)) + r')\b',
+        re.IGNORECASE if ignore_case else 0,
+    )
+    return pattern, lookup
+
+
+def _apply_word_replacements(pattern: Optional[re.Pattern], lookup: Dict[str, str], text: str) -> str:
+    """执行 _compile_word_replacements 生成的替换"""
+    if pattern is None:
+        return text
+    if pattern.flags & re.IGNORECASE:
+        return pattern.sub(lambda m: lookup.get(m.group(0).lower(), m.group(0)), text)
+    return pattern.sub(lambda m: lookup[m.group(0)], text)
+
+
+_PRIMARY_INSTITUTION_RE = _compile_substring_alternation(_PRIMARY_INSTITUTION_KEYWORDS)
+_SECONDARY_INSTITUTION_RE = _compile_substring_alternation(_SECONDARY_INSTITUTION_KEYWORDS)
+# 任一层级关键词（含 School/College）均说明该部分不是地理信息
+_INSTITUTION_LEVEL_RE = _compile_substring_alternation(
+    _PRIMARY_INSTITUTION_KEYWORDS + _SECONDARY_INSTITUTION_KEYWORDS + ['College', 'School']
+)
+
+# extract_primary_institutions 的关键词表各编译为一个交替式：每段文本一次扫描即可判定
+_C3_PRIMARY_RE = _compile_substring_alternation(_C3_PRIMARY_KEYWORDS)
+_C3_SECONDARY_INDICATOR_RE = _compile_substring_alternation(_C3_SECONDARY_INDICATORS)
+_C3_ADDRESS_RE = _compile_substring_alternation(_C3_ADDRESS_INDICATORS)
+_C3_DISCIPLINE_ONLY_RE = _compile_substring_alternation(_C3_DISCIPLINE_ONLY_PATTERNS)
+_C3_FACILITY_RE = _compile_substring_alternation(_C3_FACILITY_INDICATORS)
+
+# 机构名 / 摘要清洗用的预编译正则（逐条记录调用，避免反复查 re 缓存）
+_WHITESPACE_RE = re.compile(r'\s+')
+_REPEATED_COMMA_RE = re.compile(r',\s*,')
+_PREPOSITION_RE = re.compile(r'\s+(?:of|for|the|in|at|on)\s+', re.IGNORECASE)
+_AND_RE = re.compile(r'\s+and\s+', re.IGNORECASE)
+
+# C3 机构名尾部的部门/中心后缀（这些不应该出现在C3字段中）
+_C3_DEPARTMENT_SUFFIX_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\s+Canc(?:er)?\s+Ctr$',  # Cancer Center
+    r'\s+Canc(?:er)?\s+Cent(?:er|re)$',
+    r'\s+Med(?:ical)?\s+Cent(?:er|re)$',  # Medical Center (但保留前面的机构名)
+    r'\s+Res(?:earch)?\s+Cent(?:er|re)$',
+    r'\s+Dept\.?$',
+    r'\s+Dept\s+\w+$',  # Dept Med, Dept Oncol等
+    r',?\s+Ltd\.?$',  # Ltd., Ltd
+    r',?\s+Inc\.?$',  # Inc., Inc
+    r',?\s+Co\.?$',   # Co., Co
+))
+
+# C3 机构名中的常见意大利语表达
+_C3_NAME_REPLACEMENTS_RE, _C3_NAME_REPLACEMENTS = _compile_word_replacements({
+    'Università degli Studi di': 'University of',
+    'Università di': 'University of',
+    'Università': 'University',
+    'Ospedale': 'Hospital',
+    'Istituto': 'Institute',
+    'Fondazione IRCCS': 'IRCCS Fondazione',
+}, ignore_case=True)
+
+# C3 缩写还原（大小写敏感，整词匹配）
+_C3_EXPANSIONS_RE, _C3_EXPANSIONS = _compile_word_replacements({
+    'Univ': 'University',
+    'Hosp': 'Hospital',
+    'Inst': 'Institute',
+    'Ctr': 'Center',
+    'Sch': 'School',
+    'Dept': 'Department',
+    'Fac': 'Faculty',
+    'Res': 'Research',
+    'Innovat': 'Innovation',
+    'Chem': 'Chemistry',
+    'Phys': 'Physics',
+    'Engn': 'Engineering',
+    'Biomed': 'Biomedical',
+    'Med': 'Medicine',
+    'Mfg': 'Manufacturing',
+    'Sci': 'Science',
+    'Syst': 'Systems',
+    'Hlth': 'Health',
+    'Publ': 'Public',
+    'Clin': 'Clinic',
+})
+_HYPHENATED_NAME_RE = re.compile(r'\b([A-Z][a-z]{1,4})-([A-Z][a-z]{1,4})\b')
+
+# 查找键归一化：NFKD 无法分解的字母先手工折叠，再去掉非字母数字字符
+_ASCII_FOLD_TABLE = str.maketrans({
+    'ı': 'i', 'İ': 'I', 'Ł': 'L', 'ł': 'l', 'Ø': 'O', 'ø': 'o',
+    'Đ': 'D', 'đ': 'd', 'Æ': 'AE', 'æ': 'ae', 'Œ': 'OE', 'œ': 'oe',
+    'ß': 'ss',
+})
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]')
+
+# 摘要章节标题（INTRODUCTION:The）与比例写法（F: M ratio）
+_ABSTRACT_SECTION_RE = re.compile(r'([A-Z]+):([A-Z])')
+_ABSTRACT_RATIO_RE = re.compile(r'([A-Z]): ([A-Z]) ratio')
+
+# 原始 Scopus 地址中的 C3 信号片段：需含机构标志词，且不能以二级单位或邮箱开头
+_RAW_C3_MARKER_RE = _compile_substring_alternation((
+    'univ', 'university', 'college', 'school', 'hospital', 'hosp', 'institute', 'inst',
+    'center', 'centre', 'ctr', 'academy', 'foundation', 'system', 'company', 'corp', 'corporation'
+))
+_RAW_C3_BLOCKED_PREFIXES = (
+    'email:',
+    'department', 'dept', 'division', 'faculty', 'section', 'unit', 'laboratory', 'lab',
+    'program', 'programme', 'office', 'ward', 'group', 'branch'
+)
+
+# extract_primary_institutions：按分号切分作者机构条目
+_AFFILIATION_ENTRY_SPLIT_RE = re.compile(r'\s*;\s*')
+
+# 期刊名（SO / J9）格式化
+_SPACED_AND_RE = re.compile(r'\s+AND\s+')
+_COLON_SPACE_RE = re.compile(r':\s+')
+_AND_WORD_RE = re.compile(r'\bAND\b')
+
 
 class ScopusToWosConverter:
     """Scopus CSV到WOS纯文本格式转换器"""
 
-    # 期刊名缩写映射表（常见期刊）
-    JOURNAL_ABBREV = {
+    # 期刊名缩写映射表（常见期刊，只读；实例统一通过 self.journal_abbrev 查找）
+    JOURNAL_ABBREV = MappingProxyType({
         "American Journal of Gastroenterology": "AM J GASTROENTEROL",
         "Modern Pathology": "MODERN PATHOL",
         "Nature Reviews Disease Primers": "NAT REV DIS PRIMERS",
@@ -105,7 +501,7 @@ class ScopusToWosConverter:
         "Journal of Clinical Pathology": "J CLIN PATHOL",
         "World Journal of Gastrointestinal Oncology": "WORLD J GASTRO ONCOL",
         "Annals of Oncology": "ANN ONCOL",
-    }
+    })
 
     # 月份映射
     MONTH_ABBREV = {
@@ -116,7 +512,8 @@ class ScopusToWosConverter:
         'September': 'SEP', 'October': 'OCT', 'November': 'NOV', 'December': 'DEC'
     }
 
-    def __init__(self, csv_file: str, output_file: str, config_dir: str = "config", reference_wos_file: Optional[str] = None):
+    def __init__(self, csv_file: str, output_file: str, config_dir: str = "config", reference_wos_file: Optional[str] = None,
+                 records: Optional[List[Dict]] = None):
         """
         初始化转换器
 
@@ -124,6 +521,7 @@ class ScopusToWosConverter:
             csv_file: Scopus CSV文件路径
             output_file: 输出WOS文件路径
             config_dir: 配置文件目录（默认为config）
+            records: 可选，已按 scopus_record_builder() 解析好的 csv_file 记录，提供时不再读取CSV
 
         Raises:
             FileNotFoundError: 输入文件不存在
@@ -133,22 +531,21 @@ class ScopusToWosConverter:
         if not csv_file.endswith('.csv'):
             raise ValueError(f"输入文件必须是CSV格式，当前文件: {csv_file}")
 
-        if not os.path.exists(csv_file):
+        # 一次 stat 同时确认存在且为普通文件；不再预先打开文件，编码等错误在实际读取时报告
+        try:
+            file_stat = os.stat(csv_file)
+        except FileNotFoundError:
             raise FileNotFoundError(f"输入文件不存在: {csv_file}")
+        if not stat.S_ISREG(file_stat.st_mode):
+            raise ValueError(f"输入路径不是普通文件: {csv_file}")
 
-        # 检查文件是否可读
-        try:
-            with open(csv_file, 'r', encoding='utf-8-sig') as f:
-                f.read(1)
-        except PermissionError:
+        if not os.access(csv_file, os.R_OK):
             raise PermissionError(f"无权限读取文件: {csv_file}")
-        except UnicodeDecodeError:
-            raise ValueError(f"文件编码错误，请确保文件为UTF-8格式: {csv_file}")
 
         self.csv_file = csv_file
+        self.preloaded_records = records
         self.output_file = output_file
         self.config_dir = str(resolve_project_path(config_dir))
-        self.records = []
         self.reference_wos_file = reference_wos_file if reference_wos_file and os.path.exists(reference_wos_file) else None
         self.reference_journal_map: Dict[str, Dict[str, str]] = {}
         self.reference_author_map: Dict[str, Dict[str, str]] = {}
@@ -164,9 +561,26 @@ class ScopusToWosConverter:
         self.reference_c3_supplement_map: Dict[str, List[str]] = {}
         self.reference_c3_pool: List[str] = []
 
+        # 导出日期（DA 字段），convert() 开始时刷新
+        self.export_date = datetime.now().strftime('%Y-%m-%d')
+
         # 加载配置文件
         self.journal_abbrev = self._load_journal_abbrev()
+        self.journal_abbrev_lookup = {
+            self._normalize_lookup_key(name): abbrev
+            for name, abbrev in self.journal_abbrev.items()
+        }
         self.institution_config = self._load_institution_config()
+        self.independent_institutions_lc = tuple(
+            name.lower()
+            for key in ('independent_colleges', 'independent_schools')
+            for name in self.institution_config.get(key, [])
+        )
+        # 机构缩写规则合并为一个交替正则（长词优先），一次扫描完成全部替换
+        self.institution_abbrev_re, self.institution_abbrev_lookup = _compile_word_replacements(
+            self.institution_config['abbreviations'], ignore_case=True
+        )
+        self._install_memoized_transforms()
 
         # 加载作者数据库
         self.author_db = self._load_author_database()
@@ -176,6 +590,28 @@ class ScopusToWosConverter:
         if self.author_db:
             logger.info(f"已加载作者数据库: {len(self.author_db.authors)} 位作者")
 
+    _MEMOIZED_TRANSFORMS = (
+        'format_institution_address', '_convert_single_reference', '_normalize_lookup_key',
+        '_split_author_list', 'abbreviate_institution', 'clean_institution_name',
+        '_institution_similarity_tokens',
+    )
+
+    def _install_memoized_transforms(self):
+        """机构与参考文献字符串在语料中大量重复：对只依赖输入字符串与已加载配置的变换按实例记忆化"""
+        for method_name in self._MEMOIZED_TRANSFORMS:
+            setattr(self, method_name, functools.lru_cache(maxsize=100_000)(getattr(type(self), method_name).__get__(self)))
+
+    def __getstate__(self):
+        # 记忆化包装不可序列化（多进程转换需要 pickle 转换器），在子进程中重新安装
+        state = self.__dict__.copy()
+        for method_name in self._MEMOIZED_TRANSFORMS:
+            state.pop(method_name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._install_memoized_transforms()
+
     def _load_author_database(self):
         """加载作者数据库"""
         try:
@@ -196,7 +632,7 @@ class ScopusToWosConverter:
         config_file = os.path.join(self.config_dir, "journal_abbrev.json")
 
         # 默认缩写（备用）
-        default_abbrev = self.JOURNAL_ABBREV.copy()
+        default_abbrev = dict(self.JOURNAL_ABBREV)
 
         if os.path.exists(config_file):
             try:
@@ -281,34 +717,35 @@ class ScopusToWosConverter:
 
         return default_config
 
-    def read_scopus_csv(self) -> List[Dict]:
+    def iter_scopus_csv(self) -> Iterator[Dict]:
         """
-        读取Scopus CSV文件
+        逐行读取Scopus CSV文件（跳过空行）
 
-        Returns:
-            List[Dict]: 记录列表
+        Yields:
+            Dict: 单条记录
 
         Raises:
             ValueError: CSV格式错误或缺少必要字段
         """
-        records = []
-        try:
-            with open(self.csv_file, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-
-                # 验证必要字段
-                required_fields = {'Authors', 'Title', 'Year'}
-                if reader.fieldnames:
-                    missing_fields = required_fields - set(reader.fieldnames)
-                    if missing_fields:
-                        logger.warning(f"CSV文件缺少推荐字段: {missing_fields}")
-
-                for row_num, row in enumerate(reader, start=2):  # 从第2行开始（第1行是表头）
-                    if any(row.values()):  # 跳过空行
-                        records.append(row)
+        if self.preloaded_records is not None:
+            # 调用方已解析好的记录（如工作流年份过滤时顺带生成），不再重新读取CSV
+            yield from self.preloaded_records
+            return
 
-            logger.info(f"成功读取 {len(records)} 条记录")
-            return records
+        try:
+            _raise_csv_field_size_limit()
+            with open(self.csv_file, 'r', encoding='utf-8-sig', newline='', buffering=1 << 20) as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if not header:
+                    return
+
+                build_record = scopus_record_builder(header)
+                for row in reader:
+                    # 跳过空行：首列非空即可判定，只有首列为空时才扫描整行
+                    if not row or not (row[0] or any(row)):
+                        continue
+                    yield build_record(row)
 
         except FileNotFoundError:
             logger.error(f"文件不存在: {self.csv_file}")
@@ -323,6 +760,20 @@ class ScopusToWosConverter:
             logger.error(f"读取文件时发生未知错误: {e}")
             raise
 
+    def read_scopus_csv(self) -> List[Dict]:
+        """
+        读取Scopus CSV文件
+
+        Returns:
+            List[Dict]: 记录列表
+
+        Raises:
+            ValueError: CSV格式错误或缺少必要字段
+        """
+        records = list(self.iter_scopus_csv())
+        logger.info(f"成功读取 {len(records)} 条记录")
+        return records
+
     def format_multiline_field(self, tag: str, content: str, max_width: int = None, separator: str = None) -> str:
         """
         格式化WOS字段
@@ -348,52 +799,20 @@ class ScopusToWosConverter:
         # 如果指定了separator（如C3的分号），则按separator分割而不是空格
         if separator:
             segments = [seg.strip() for seg in content.split(separator)]
-            lines = []
-            current_line = ""
-
-            for i, segment in enumerate(segments):
-                # 添加separator（除了最后一个）
-                segment_with_sep = segment + (separator if i < len(segments) - 1 else '')
-                test_line = current_line + (" " if current_line else "") + segment_with_sep
-
-                if len(test_line) <= max_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        lines.append(current_line)
-                    current_line = segment_with_sep
-
-            # 添加最后一行
-            if current_line:
-                lines.append(current_line)
+            last_index = len(segments) - 1
+            # 添加separator（除了最后一个）
+            pieces = [segment + separator if i < last_index else segment for i, segment in enumerate(segments)]
         else:
             # 原有的按空格分割逻辑
-            words = content.split()
-            lines = []
-            current_line = ""
-
-            for word in words:
-                test_line = current_line + (" " if current_line else "") + word
-                if len(test_line) <= max_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        lines.append(current_line)
-                    current_line = word
+            pieces = content.split()
 
-            # 添加最后一行
-            if current_line:
-                lines.append(current_line)
+        lines = _wrap_greedy(pieces, max_width)
 
         # 格式化输出：第一行不缩进，其余行3空格缩进
         if not lines:
             return ''
 
-        result = f"{tag} {lines[0]}"
-        for line in lines[1:]:
-            result += f"\n   {line}"
-
-        return result
+        return f"{tag} " + _CONTINUATION_SEPARATOR.join(lines)
 
     def convert_authors(self, authors_str: str) -> List[str]:
         """
@@ -405,26 +824,27 @@ class ScopusToWosConverter:
         if not authors_str:
             return []
 
-        # 按分号分割
-        authors = [a.strip() for a in authors_str.split(';')]
-
         # 处理缩写：移除点号和空格
         # "M.V." -> "MV", "M. V." -> "MV", "G.R." -> "GR"
         converted = []
-        for author in authors:
+        for author in self._split_author_list(authors_str):
             # 分割姓和名
             parts = author.split(',')
             if len(parts) >= 2:
                 last_name = parts[0].strip()
                 initials = parts[1].strip()
                 # 移除所有点号和空格：M.V. -> MV, G. R. -> GR
-                initials = initials.replace('.', '').replace(' ', '')
+                initials = initials.translate(_INITIALS_STRIP_TABLE)
                 converted.append(f"{last_name}, {initials}")
             else:
                 converted.append(author)
 
         return converted
 
+    def _split_author_list(self, authors_str: str) -> tuple:
+        """按分号拆分作者列表并去除首尾空白（Authors 与 Author full names 共用，按实例记忆化）"""
+        return tuple(author.strip() for author in authors_str.split(';'))
+
     def fix_compound_lastname(self, author_name: str) -> str:
         """
         修复复合姓氏问题
@@ -442,14 +862,6 @@ class ScopusToWosConverter:
         if ',' not in author_name:
             return author_name
 
-        # 姓氏粒子列表（需要大小写敏感匹配）
-        name_particles = [
-            'Abu', 'Al', 'El', 'Ibn', 'bin',  # 阿拉伯语
-            'van', 'van der', 'van den', 'von', 'von der',  # 荷兰语/德语
-            'de', 'del', 'della', 'di', 'da',  # 西班牙语/意大利语
-            'Mc', 'Mac',  # 爱尔兰语
-        ]
-
         parts = author_name.split(',', 1)
         lastname = parts[0].strip()
         firstname = parts[1].strip()
@@ -461,17 +873,16 @@ class ScopusToWosConverter:
             last_word = firstname_parts[-1]
 
             # 检查是否匹配任何姓氏粒子
-            for particle in name_particles:
-                if last_word == particle:
-                    # 发现姓氏粒子，需要重组
-                    new_lastname = last_word + ' ' + lastname
-                    new_firstname = ' '.join(firstname_parts[:-1])
+            if last_word in _NAME_PARTICLES:
+                # 发现姓氏粒子，需要重组
+                new_lastname = last_word + ' ' + lastname
+                new_firstname = ' '.join(firstname_parts[:-1])
 
-                    # 使用logging模块记录（如果logger存在）
-                    if hasattr(self, 'logger'):
-                        self.logger.debug(f"修复复合姓氏: '{author_name}' -> '{new_lastname}, {new_firstname}'")
+                # 使用logging模块记录（如果logger存在）
+                if hasattr(self, 'logger'):
+                    self.logger.debug(f"修复复合姓氏: '{author_name}' -> '{new_lastname}, {new_firstname}'")
 
-                    return f"{new_lastname}, {new_firstname}"
+                return f"{new_lastname}, {new_firstname}"
 
         # 没有发现问题，返回原样
         return author_name
@@ -483,12 +894,8 @@ class ScopusToWosConverter:
 
         author_clean = re.sub(r'\s*\([^)]*\)', '', author).strip()
 
-        degree_suffixes = [
-            r',?\s*M\.?D\.?$', r',?\s*Ph\.?D\.?$', r',?\s*Dr\.?$',
-            r',?\s*Prof\.?$', r',?\s*M\.?S\.?$', r',?\s*B\.?S\.?$'
-        ]
-        for suffix_pattern in degree_suffixes:
-            author_clean = re.sub(suffix_pattern, '', author_clean, flags=re.IGNORECASE)
+        for suffix_pattern in _DEGREE_SUFFIX_PATTERNS:
+            author_clean = suffix_pattern.sub('', author_clean)
 
         author_clean = author_clean.rstrip('. ').strip()
 
@@ -507,11 +914,7 @@ class ScopusToWosConverter:
         if not full_names_str:
             return []
 
-        parsed_names = []
-        for raw_author in full_names_str.split(';'):
-            parsed_names.append(self._clean_author_full_name(raw_author.strip()))
-
-        return parsed_names
+        return [self._clean_author_full_name(raw_author) for raw_author in self._split_author_list(full_names_str)]
 
     def _extract_given_name_tokens(self, author_name: str) -> List[str]:
         if not author_name or ',' not in author_name:
@@ -594,20 +997,15 @@ class ScopusToWosConverter:
         if not text:
             return ''
 
-        special_map = str.maketrans({
-            'ı': 'i', 'İ': 'I', 'Ł': 'L', 'ł': 'l', 'Ø': 'O', 'ø': 'o',
-            'Đ': 'D', 'đ': 'd', 'Æ': 'AE', 'æ': 'ae', 'Œ': 'OE', 'œ': 'oe',
-            'ß': 'ss',
-        })
-        text = text.translate(special_map)
+        text = text.translate(_ASCII_FOLD_TABLE)
         return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
 
     def _normalize_lookup_key(self, text: str) -> str:
         if not text:
             return ''
         text = self._ascii_fold(text).lower().replace('&', ' and ')
-        text = re.sub(r'[^a-z0-9\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _NON_ALNUM_RE.sub(' ', text)
+        text = _WHITESPACE_RE.sub(' ', text).strip()
         return text
 
     def _normalize_person_lookup_key(self, text: str) -> str:
@@ -675,20 +1073,6 @@ class ScopusToWosConverter:
         return normalized_parts
 
     def _split_affiliations_by_country(self, remaining_parts: List[str]) -> List[str]:
-        countries = {
-            self._normalize_lookup_key(country)
-            for country in [
-                'USA', 'United States', 'United Kingdom', 'England', 'Scotland', 'Wales',
-                'China', 'Peoples R China', 'Japan', 'Germany', 'France', 'Italy', 'Spain',
-                'Canada', 'Australia', 'India', 'South Korea', 'Brazil', 'Russia',
-                'Netherlands', 'Switzerland', 'Sweden', 'Belgium', 'Austria', 'Poland',
-                'Israel', 'Palestine', 'Argentina', 'Mexico', 'Turkey', 'Turkiye',
-                'South Africa', 'Singapore', 'Taiwan', 'Hong Kong', 'Ireland', 'Denmark',
-                'Norway', 'Finland', 'Greece', 'Portugal', 'Czech Republic', 'Hungary',
-                'Romania', 'Chile', 'Colombia', 'Peru', 'Iran', 'Iraq', 'Egypt', 'Thailand'
-            ]
-        }
-
         institutions: List[str] = []
         current_parts: List[str] = []
         for part in remaining_parts:
@@ -698,14 +1082,14 @@ class ScopusToWosConverter:
 
             current_parts.append(cleaned_part)
             normalized_part = self._normalize_lookup_key(cleaned_part.rstrip('.'))
-            if normalized_part in countries and len(current_parts) >= 2:
+            if normalized_part in _AFFILIATION_SPLIT_COUNTRIES and len(current_parts) >= 2:
                 candidate = ', '.join(current_parts).strip(' .,;')
-                if candidate and self._normalize_lookup_key(candidate) not in countries:
+                if candidate and self._normalize_lookup_key(candidate) not in _AFFILIATION_SPLIT_COUNTRIES:
                     institutions.append(candidate)
                 current_parts = []
 
         trailing = ', '.join(current_parts).strip(' .,;')
-        if trailing and self._normalize_lookup_key(trailing) not in countries:
+        if trailing and self._normalize_lookup_key(trailing) not in _AFFILIATION_SPLIT_COUNTRIES:
             institutions.append(trailing)
 
         return institutions or [', '.join(remaining_parts).strip(' .,;')]
@@ -1403,9 +1787,10 @@ class ScopusToWosConverter:
                 f"参考WOS通用校准已建立: 重复对 {matched_pairs} 组, 期刊映射 {len(reference_journal_map)} 条, 作者映射 {len(reference_author_map)} 条, 机构映射 {len(reference_affiliation_map)} 条, 作者-机构映射 {len(reference_author_affiliation_map)} 条, RP映射 {len(reference_reprint_map)} 条, C3映射 {len(self.reference_c3_map)} 条, C3行映射 {len(self.reference_c3_address_map)} 条, C3直恢复 {len(self.reference_c3_raw_recovery_map)} 条, C3伴随恢复 {len(self.reference_c3_companion_map)} 条"
             )
 
-    def _institution_similarity_tokens(self, text: str) -> List[str]:
+    def _institution_similarity_tokens(self, text: str) -> tuple:
+        """机构相似度比较用的归一化词元（校准阶段对同一批机构名反复调用，按实例记忆化，返回不可变元组）"""
         if not text:
-            return []
+            return ()
 
         stopwords = {'of', 'the', 'and', 'for', 'at', 'in', 'de', 'di', 'da'}
         synonyms = {
@@ -1491,7 +1876,7 @@ class ScopusToWosConverter:
             token = synonyms.get(token, token)
             if token and token not in stopwords:
                 tokens.append(token)
-        return tokens
+        return tuple(tokens)
 
     def _institution_similarity(self, left: str, right: str) -> float:
         left_tokens = set(self._institution_similarity_tokens(left))
@@ -1759,24 +2144,16 @@ class ScopusToWosConverter:
         if not text:
             return []
 
-        marker_tokens = (
-            'univ', 'university', 'college', 'school', 'hospital', 'hosp', 'institute', 'inst',
-            'center', 'centre', 'ctr', 'academy', 'foundation', 'system', 'company', 'corp', 'corporation'
-        )
-        blocked_prefixes = (
-            'department', 'dept', 'division', 'faculty', 'section', 'unit', 'laboratory', 'lab',
-            'program', 'programme', 'office', 'ward', 'group', 'branch'
-        )
-
         candidates: List[str] = []
         seen = set()
         for part in [segment.strip().strip(' .;') for segment in text.split(',') if segment.strip().strip(' .;')]:
-            folded = self._ascii_fold(part).lower()
-            if len(part) < 6 or folded.startswith('email:'):
+            # 先做长度判断，过短的片段无需折叠
+            if len(part) < 6:
                 continue
-            if any(folded.startswith(prefix) for prefix in blocked_prefixes):
+            folded = self._ascii_fold(part).lower()
+            if folded.startswith(_RAW_C3_BLOCKED_PREFIXES):
                 continue
-            if not any(marker in folded for marker in marker_tokens):
+            if not _RAW_C3_MARKER_RE.search(folded):
                 continue
             if self._is_address_like_c3_name(part):
                 continue
@@ -2612,9 +2989,10 @@ class ScopusToWosConverter:
             return reference['SO']
 
         formatted = source_title.upper().replace('&AMP;', '&')
-        formatted = re.sub(r'\s+AND\s+', ' & ', formatted)
-        formatted = re.sub(r':\s+', '-', formatted)
-        formatted = re.sub(r'\s+', ' ', formatted).strip()
+        formatted = _SPACED_AND_RE.sub(' & ', formatted)
+        if ':' in formatted:
+            formatted = _COLON_SPACE_RE.sub('-', formatted)
+        formatted = _WHITESPACE_RE.sub(' ', formatted).strip()
         return formatted
 
     def _format_ji_abbreviation(self, source_title: str, abbreviated_source_title: str) -> str:
@@ -2644,9 +3022,9 @@ class ScopusToWosConverter:
             j9 = abbreviated_source_title.upper()
             j9 = j9.replace('&AMP;', '&')
             j9 = j9.replace(':', ' ')
-            j9 = re.sub(r'\.', '', j9)
-            j9 = re.sub(r'\bAND\b', '&', j9)
-            j9 = re.sub(r'\s+', ' ', j9).strip()
+            j9 = j9.replace('.', '')
+            j9 = _AND_WORD_RE.sub('&', j9)
+            j9 = _WHITESPACE_RE.sub(' ', j9).strip()
             return j9
 
         if source_title:
@@ -2660,14 +3038,12 @@ class ScopusToWosConverter:
         if not words:
             return '', ''
 
-        suffixes = {'jr', 'jnr', 'sr', 'ii', 'iii', 'iv'}
-        surname_particles = {'al', 'el', 'de', 'del', 'della', 'da', 'di', 'van', 'von', 'bin', 'ibn', 'abu', 'ben'}
-        filtered = [word for word in words if word.lower() not in suffixes]
+        filtered = [word for word in words if word.lower() not in _CORRESPONDENCE_NAME_SUFFIXES]
         if not filtered:
             return '', ''
 
         surname_tokens = [filtered[-1]]
-        if len(filtered) >= 2 and filtered[-2].lower() in surname_particles:
+        if len(filtered) >= 2 and filtered[-2].lower() in _CORRESPONDENCE_SURNAME_PARTICLES:
             surname_tokens = filtered[-2:]
 
         given_tokens = filtered[:-len(surname_tokens)]
@@ -2969,9 +3345,7 @@ class ScopusToWosConverter:
                 if reference_address:
                     address = reference_address
                 else:
-                    address = self.reorder_institution_parts(address)
-                    address = self.abbreviate_institution(address)
-                    address = self.standardize_country(address)
+                    address = self.format_institution_address(address)
                     address = re.sub(
                         r',\s*(\d{4,6})(?:-\d{4})?\s*,\s*(USA|Peoples R China|Germany|France|Thailand|Japan|South Korea|England|Turkiye|Russia|Brazil|India|Italy|Spain|Canada|Australia)$',
                         r', \1 \2',
@@ -3286,7 +3660,7 @@ class ScopusToWosConverter:
         journal = ref_data.get('journal', '')
 
         # 尝试缩写期刊名
-        journal_abbrev = self.JOURNAL_ABBREV.get(journal, journal.upper())
+        journal_abbrev = self._lookup_journal_abbrev(journal) or journal.upper()
 
         volume = ref_data.get('volume', '')
         page = ref_data.get('page', '')
@@ -3310,13 +3684,27 @@ class ScopusToWosConverter:
         converted_refs = []
         for ref in refs:
             if ref:
-                ref_data = self.parse_reference(ref)
-                wos_ref = self.format_reference_wos(ref_data)
+                wos_ref = self._convert_single_reference(ref)
                 if wos_ref:
                     converted_refs.append(wos_ref)
 
         return converted_refs
 
+    def _convert_single_reference(self, ref: str) -> str:
+        """解析并格式化单条参考文献"""
+        return self.format_reference_wos(self.parse_reference(ref))
+
+    def _lookup_journal_abbrev(self, journal_name: str) -> str:
+        """按期刊全名查找已加载的缩写，精确匹配失败时按规范化键（大小写、&/and、标点）匹配。"""
+        if not journal_name:
+            return ''
+
+        mapped = self.journal_abbrev.get(journal_name)
+        if mapped:
+            return mapped
+
+        return self.journal_abbrev_lookup.get(self._normalize_lookup_key(journal_name), '')
+
     def abbreviate_journal(self, journal_name: str) -> str:
         """
         期刊名缩写
@@ -3324,8 +3712,9 @@ class ScopusToWosConverter:
         首先查找映射表，如果没有则使用规则生成
         """
         # 查找映射表
-        if journal_name in self.JOURNAL_ABBREV:
-            return self.JOURNAL_ABBREV[journal_name]
+        mapped = self._lookup_journal_abbrev(journal_name)
+        if mapped:
+            return mapped
 
         # 使用规则生成缩写
         # 1. 移除常见词
@@ -3386,9 +3775,7 @@ class ScopusToWosConverter:
                     mapped_institutions = [reference_institution] if reference_institution else []
 
                 if not mapped_institutions:
-                    inst_reordered = self.reorder_institution_parts(raw_affiliation)
-                    inst_short = self.abbreviate_institution(inst_reordered)
-                    mapped_institutions = [self.standardize_country(inst_short)]
+                    mapped_institutions = [self.format_institution_address(raw_affiliation)]
 
                 raw_key = self._normalize_lookup_key(raw_affiliation)
                 shared_author_count = raw_affiliation_counts.get(raw_key, 1)
@@ -3404,14 +3791,12 @@ class ScopusToWosConverter:
                     inst_standard = institution.rstrip('.')
                     if not inst_standard.strip(' .,;'):
                         continue
-                    author_institutions.append((author_full, inst_standard))
+                    author_institutions.append((_intern_short(author_full), _intern_short(inst_standard)))
 
-        institution_to_authors = {}
+        # dict 作为有序集合：保持作者首次出现顺序，同时避免列表成员检查的 O(k) 开销
+        institution_to_authors: Dict[str, Dict[str, None]] = defaultdict(dict)
         for author_full, institution in author_institutions:
-            if institution not in institution_to_authors:
-                institution_to_authors[institution] = []
-            if author_full not in institution_to_authors[institution]:
-                institution_to_authors[institution].append(author_full)
+            institution_to_authors[institution][author_full] = None
 
         converted = []
         for institution, authors in institution_to_authors.items():
@@ -3420,6 +3805,10 @@ class ScopusToWosConverter:
 
         return converted
 
+    def format_institution_address(self, institution: str) -> str:
+        """把 Scopus 原始机构地址整理为 WOS 风格：重排层级 → 缩写 → 标准化国家名"""
+        return self.standardize_country(self.abbreviate_institution(self.reorder_institution_parts(institution)))
+
     def standardize_country(self, institution: str) -> str:
         """
         标准化国家名称为WOS格式
@@ -3437,33 +3826,15 @@ class ScopusToWosConverter:
         Returns:
             标准化后的机构字符串
         """
-        # 国家名称映射表（Scopus → WOS标准）
-        country_mapping = {
-            'United States': 'USA',
-            'United Kingdom': 'England',  # 默认England，除非明确是Scotland等
-            'P. R. China': 'Peoples R China',
-            'PR China': 'Peoples R China',
-            'China': 'Peoples R China',
-            'South Korea': 'South Korea',
-            'Korea': 'South Korea',
-            'Turkey': 'Turkiye',
-            'Russia': 'Russia',
-            'Iran': 'Iran',
-            'Vietnam': 'Vietnam',
-            'Czech Republic': 'Czech Republic',
-            'Taiwan': 'Taiwan',
-        }
-
         parts = [p.strip() for p in institution.split(',')]
         if not parts:
             return institution
 
         last_part = re.sub(r'\s+', ' ', parts[-1]).strip()
 
-        for scopus_name, wos_name in sorted(country_mapping.items(), key=lambda item: len(item[0]), reverse=True):
-            if last_part.lower() == scopus_name.lower():
-                parts[-1] = wos_name
-                break
+        wos_name = _WOS_COUNTRY_MAPPING.get(last_part.lower())
+        if wos_name is not None:
+            parts[-1] = wos_name
 
         return ', '.join(parts)
 
@@ -3567,31 +3938,17 @@ class ScopusToWosConverter:
         name_lower = name.lower()
 
         # 1. 检查是否在白名单中
-        for independent in self.institution_config.get('independent_colleges', []):
-            if independent.lower() in name_lower:
-                return True
-
-        for independent in self.institution_config.get('independent_schools', []):
-            if independent.lower() in name_lower:
-                return True
+        if any(independent in name_lower for independent in self.independent_institutions_lc):
+            return True
 
-        # 2. 检查是否已有University（上下文判断）
-        has_university = any('university' in p.lower() or 'università' in p.lower() or 'universit' in p.lower()
-                            for p in all_parts if p != name)
-        if has_university:
+        # 2. 检查是否已有University（上下文判断；'universit' 同时覆盖 University / Università）
+        other_parts_lower = ' '.join(p for p in all_parts if p != name).lower()
+        if 'universit' in other_parts_lower:
             return False  # 有University则College/School是二级机构
 
         # 3. 检查是否是专业学院（Medical, Pharmacy等）
-        professional_indicators = [
-            'medical', 'medicine', 'pharmacy', 'law', 'business',
-            'engineering', 'public health', 'hygiene', 'economics',
-            'tropical', 'veterinary', 'dental', 'nursing'
-        ]
-
-        if 'school' in name_lower:
-            for indicator in professional_indicators:
-                if indicator in name_lower:
-                    return True  # School of Medicine这种通常是独立机构
+        if 'school' in name_lower and any(indicator in name_lower for indicator in _PROFESSIONAL_SCHOOL_INDICATORS):
+            return True  # School of Medicine这种通常是独立机构
 
         # 4. College of XX（学院名称）通常是二级机构，除非特别知名
         if 'college of' in name_lower:
@@ -3628,27 +3985,6 @@ class ScopusToWosConverter:
         if len(parts) < 2:
             return institution
 
-        # 一级机构关键词（明确的）
-        primary_keywords = [
-            'University', 'Università', 'Universität', 'Universit', 'Univ',
-            'Hospital', 'Ospedale', 'Hosp',
-            'Institute', 'Istituto', 'Institut',
-            'Foundation', 'Fondazione', 'Fdn',
-            'IRCCS', 'Policlinico', 'Clinic',
-            'Center', 'Centre', 'Centro', 'Academy', 'Accademia'
-        ]
-
-        # 二级单位关键词（明确的）
-        secondary_keywords = [
-            'Department', 'Dipartimento', 'Dept',
-            'Division', 'Divisione', 'Div',
-            'Faculty', 'Facolta', 'Fac',
-            'Unit', 'Unità',
-            'Laboratory', 'Laboratorio', 'Lab',
-            'Service', 'Servizio',
-            'Section', 'Sezione'
-        ]
-
         # 分类各部分
         primary_parts = []
         secondary_parts = []
@@ -3659,13 +3995,9 @@ class ScopusToWosConverter:
             last_part = parts[-1]
             second_last = parts[-2] if len(parts) >= 2 else None
 
-            # 检查是否是地理信息
-            is_last_geo = not any(kw.lower() in last_part.lower() for kw in primary_keywords + secondary_keywords)
-            is_last_geo = is_last_geo and 'college' not in last_part.lower() and 'school' not in last_part.lower()
-
-            is_second_last_geo = (second_last and
-                                 not any(kw.lower() in second_last.lower() for kw in primary_keywords + secondary_keywords) and
-                                 'college' not in second_last.lower() and 'school' not in second_last.lower())
+            # 检查是否是地理信息（不含任何机构层级关键词）
+            is_last_geo = not _INSTITUTION_LEVEL_RE.search(last_part.lower())
+            is_second_last_geo = bool(second_last) and not _INSTITUTION_LEVEL_RE.search(second_last.lower())
 
             if is_last_geo:
                 geo_parts.append(last_part)
@@ -3680,13 +4012,13 @@ class ScopusToWosConverter:
             part_lower = part.lower()
 
             # 检查是否包含明确的二级单位关键词
-            is_secondary = any(kw.lower() in part_lower for kw in secondary_keywords)
+            is_secondary = _SECONDARY_INSTITUTION_RE.search(part_lower) is not None
             if is_secondary:
                 secondary_parts.append(part)
                 continue
 
             # 检查是否包含一级机构关键词
-            is_primary = any(kw.lower() in part_lower for kw in primary_keywords)
+            is_primary = _PRIMARY_INSTITUTION_RE.search(part_lower) is not None
 
             # 特殊处理：School和College需要智能判断
             has_school = 'school' in part_lower
@@ -3719,56 +4051,33 @@ class ScopusToWosConverter:
         "School of Medicine" -> "Sch Med"
         """
         # 使用配置文件中的缩写规则
-        abbrev_map = self.institution_config['abbreviations']
-
-        result = institution
-        for full, abbrev in abbrev_map.items():
-            result = re.sub(r'\b' + re.escape(full) + r'\b', abbrev, result, flags=re.IGNORECASE)
+        result = _apply_word_replacements(self.institution_abbrev_re, self.institution_abbrev_lookup, institution)
 
         # 移除常见介词和冠词（WOS风格）
-        prepositions = ['of', 'for', 'the', 'in', 'at', 'on']
-        for prep in prepositions:
-            # 只移除单独的介词（前后有空格的），不移除单词中间的部分
-            result = re.sub(r'\s+' + re.escape(prep) + r'\s+', ' ', result, flags=re.IGNORECASE)
+        # 只移除单独的介词（前后有空格的），不移除单词中间的部分；
+        # 相邻介词（"of the"）共用中间的空格，需重复替换直到不再变化
+        while True:
+            stripped = _PREPOSITION_RE.sub(' ', result)
+            if stripped == result:
+                break
+            result = stripped
 
         # 特殊处理 "and" -> "&"
-        result = re.sub(r'\s+and\s+', ' & ', result, flags=re.IGNORECASE)
+        result = _AND_RE.sub(' & ', result)
 
         # 清理多余空格
-        result = re.sub(r'\s+', ' ', result).strip()
-        result = re.sub(r',\s*,', ',', result)  # 移除连续逗号
-        # 清理逗号前后多余空格
-        result = re.sub(r'\s*,\s*', ', ', result)
+        result = _WHITESPACE_RE.sub(' ', result).strip()
+        if ',,' in result or ', ,' in result:
+            result = _REPEATED_COMMA_RE.sub(',', result)  # 移除连续逗号
+        # 清理逗号前后多余空格（整体已 strip，首尾无空白，split/strip 与 \s*,\s* 等价）
+        if ',' in result:
+            result = ', '.join(part.strip() for part in result.split(','))
 
         return result
 
 
     def _expand_c3_abbreviations(self, name: str) -> str:
-        replacements = {
-            'Univ': 'University',
-            'Hosp': 'Hospital',
-            'Inst': 'Institute',
-            'Ctr': 'Center',
-            'Sch': 'School',
-            'Dept': 'Department',
-            'Fac': 'Faculty',
-            'Res': 'Research',
-            'Innovat': 'Innovation',
-            'Chem': 'Chemistry',
-            'Phys': 'Physics',
-            'Engn': 'Engineering',
-            'Biomed': 'Biomedical',
-            'Med': 'Medicine',
-            'Mfg': 'Manufacturing',
-            'Sci': 'Science',
-            'Syst': 'Systems',
-            'Hlth': 'Health',
-            'Publ': 'Public',
-            'Clin': 'Clinic',
-        }
-        expanded = name.strip().rstrip('.')
-        for short, full in replacements.items():
-            expanded = re.sub(rf'\b{re.escape(short)}\b', full, expanded)
+        expanded = _apply_word_replacements(_C3_EXPANSIONS_RE, _C3_EXPANSIONS, name.strip().rstrip('.'))
         expanded = re.sub(r'\bCo\s+Ltd\b', 'Company, Limited', expanded, flags=re.IGNORECASE)
         expanded = re.sub(r'\bCorp\b', 'Corporation', expanded, flags=re.IGNORECASE)
         expanded = re.sub(r'\s+', ' ', expanded).strip(' ,;')
@@ -4115,91 +4424,19 @@ class ScopusToWosConverter:
         if not affil_str:
             return []
 
-        # 一级机构的关键词（明确的）
-        primary_keywords = [
-            'University', 'Università', 'Universität', 'Universi',  # 大学
-            'Hospital', 'Ospedale', 'Clinic', 'Medical Center',     # 医院
-            'Institute', 'Istituto', 'Institut',                    # 研究所
-            'Academy', 'Accademia',                                 # 科学院
-            'Foundation', 'Fondazione', 'IRCCS',                    # 基金会/研究机构
-            'Corporation', 'Company', 'Ltd',                        # 企业
-            'Ministry', 'Government',                               # 政府机构
-        ]
-
-        # 二级单位关键词（需要过滤掉）
-        # 匹配策略：
-        # 1. "xxx of" 形式：精确匹配开头
-        # 2. 单词形式（dept, faculty等）：匹配任意位置或开头
-        secondary_keywords_strict = [
-            # 严格匹配开头的模式（"of"形式）
-            'department of', 'dept of', 'dept.',
-            'division of', 'div of',
-            'section of', 'unit of',
-            'laboratory of', 'lab of',
-            'center for', 'centre for',
-            'school of', 'faculty of', 'college of',
-            'group of', 'branch of',
-        ]
-
-        # 宽松匹配的二级单位标识（匹配任意位置）
-        secondary_indicators = [
-            'dept ', ' dept', 'dept.', 'dept,',  # dept作为单词
-            'department',  # department作为单词
-            'faculty ',  # faculty作为单词（注意空格，避免匹配Faculty of XX）
-            'facoltà', 'faculdade', 'fac ',  # 意大利语/葡萄牙语/西班牙语学院
-            'graduate school',  # 研究生院
-            'u.o.', 'uo ', 'uoc ',  # 意大利语部门缩写（Unità Operativa）
-            ' unit', ' group', ' programme', ' program',  # 单元、小组、项目
-            ' branch', ' ward', ' office',  # 分支、病区、办公室
-            'oncologia ', 'anatomia ', 'epidemiologia ',  # 意大利语学科部门
-            'departamento de', 'dipartimento di',  # 西班牙语/意大利语部门
-            'sch ', ' sch',  # school的缩写（如"sch pharm", "tongji sch"）
-            'school med', 'school pharm', 'school engn',  # 学院+专业缩写组合
-            'faculty med', 'faculty pharm', 'faculty phys',  # 学院+专业缩写组合
-            'college engn',  # 学院+专业缩写组合
-            ' med iii', ' med ii', ' med i',  # 内科三科、二科、一科（部门编号）
-            'internal med',  # 内科（部门）
-        ]
+        # 按分号分割每个作者的机构（分隔符两侧空白由正则一并去除）
+        author_affils = _AFFILIATION_ENTRY_SPLIT_RE.split(affil_str.strip())
 
-        # 地址信息关键词
-        address_indicators = [
-            'ave', 'avenue', 'blvd', 'boulevard', 'rd', 'road',
-            'st ', 'street', 'dr ', 'drive', 'lane', 'way'
-        ]
+        # 以小写名称为键的有序字典：去重并保持首次出现顺序
+        primary_institutions: Dict[str, str] = {}
+        # 已判定为一级机构的原始片段：再次出现时结果必然重复，跳过清洗与全部过滤
+        accepted_parts: Set[str] = set()
 
-        # 单个学科词（没有机构关键词时应该过滤）
-        discipline_only_patterns = [
-            'microbiology', 'immunology', 'oncology', 'pathology',
-            'pharmacology', 'physiology', 'biochemistry', 'biology',
-            'chemistry', 'physics', 'engineering', 'development',
-            'pulmonary', 'cardiology', 'neurology', 'dermatology',
-            'venereology', 'allergology', 'translational',
-            'biotechnological', 'pharmaceutical', 'biomedical',
-            'therapeutics', 'genomics', 'immunotherapy', 'biophysical',
-            'thermodynamics', 'interface', 'medicinal', 'regulatory',
-            'zoology', 'transplantation', 'infectious diseases',
-            'pneumology', 'surgical', 'experimental', 'clinical',
-            ' sci', ' biol', ' chem',  # 缩写形式（带空格避免误匹配）
-        ]
-
-        # 设施类关键词（应该被过滤）
-        facility_indicators = [
-            'facility', 'core', 'platform', 'service',
-        ]
-
-        # 按分号分割每个作者的机构
-        author_affils = [a.strip() for a in affil_str.split(';')]
-
-        primary_institutions = []
-        seen_primary_institutions = set()
-
-        def add_primary_institution(clean_name: str):
-            if not clean_name:
-                return
-            key = clean_name.lower()
-            if key not in seen_primary_institutions:
-                seen_primary_institutions.add(key)
-                primary_institutions.append(clean_name)
+        def add_primary_institution(part: str):
+            accepted_parts.add(part)
+            clean_name = self.clean_institution_name(part)
+            if clean_name:
+                primary_institutions.setdefault(clean_name.lower(), clean_name)
 
         for affil in author_affils:
             if not affil:
@@ -4216,29 +4453,19 @@ class ScopusToWosConverter:
             # 遍历每个机构部分
             for part in institution_parts:
                 part = part.strip()
+                if part in accepted_parts:
+                    continue
                 part_lower = part.lower()
 
                 # === 第0层：检查白名单（优先级最高）===
 
                 # 首先检查是否在independent_schools或independent_colleges白名单中
                 # 如果在白名单中，直接认定为一级机构，跳过所有过滤
-                is_whitelisted = False
-                for independent in self.institution_config.get('independent_schools', []):
-                    if independent.lower() in part_lower:
-                        is_whitelisted = True
-                        break
-
-                if not is_whitelisted:
-                    for independent in self.institution_config.get('independent_colleges', []):
-                        if independent.lower() in part_lower:
-                            is_whitelisted = True
-                            break
+                is_whitelisted = any(independent in part_lower for independent in self.independent_institutions_lc)
 
                 if is_whitelisted:
                     # 在白名单中，直接添加为一级机构
-                    clean_name = self.clean_institution_name(part)
-                    if clean_name:
-                        add_primary_institution(clean_name)
+                    add_primary_institution(part)
                     continue  # 跳过后续所有过滤
 
                 # === 第1层过滤：明显无效的内容 ===
@@ -4262,11 +4489,7 @@ class ScopusToWosConverter:
                 # === 第2层过滤：地址信息 ===
 
                 # 检查是否包含街道地址
-                is_address = False
-                for addr_ind in address_indicators:
-                    if addr_ind in part_lower:
-                        is_address = True
-                        break
+                is_address = _C3_ADDRESS_RE.search(part_lower) is not None
 
                 # 检查是否是纯数字开头的地址（如"2103 cornell rd"）
                 if part[0].isdigit():
@@ -4277,65 +4500,39 @@ class ScopusToWosConverter:
 
                 # === 第3层过滤：二级单位（严格匹配开头）===
 
-                is_secondary = False
-                for sec_keyword in secondary_keywords_strict:
-                    if part_lower.startswith(sec_keyword):
-                        is_secondary = True
-                        break
-
-                if is_secondary:
+                if part_lower.startswith(_C3_SECONDARY_PREFIXES):
                     continue
 
                 # === 第4层过滤：二级单位（宽松匹配任意位置）===
 
-                for sec_ind in secondary_indicators:
-                    if sec_ind in part_lower:
-                        is_secondary = True
-                        break
-
-                if is_secondary:
+                if _C3_SECONDARY_INDICATOR_RE.search(part_lower):
                     continue
 
                 # === 第5层过滤：不完整的附属医院 ===
 
                 # "the xxx affiliated hosp"如果没有大学名称，则过滤
                 if 'affiliated' in part_lower and 'hosp' in part_lower:
-                    has_university = any(kw.lower() in part_lower for kw in ['university', 'univ', 'università'])
+                    has_university = 'univ' in part_lower  # 同时覆盖 university / università
                     if not has_university:
                         continue  # 不完整的附属医院
 
                 # === 第6层过滤：设施类（facility/core/service等）===
 
-                is_facility = False
-                for fac_ind in facility_indicators:
-                    if fac_ind in part_lower:
-                        # facility等通常是支持性设施，不是一级机构
-                        is_facility = True
-                        break
-
-                if is_facility:
+                # facility等通常是支持性设施，不是一级机构
+                if _C3_FACILITY_RE.search(part_lower):
                     continue
 
                 # === 第7层过滤：单个学科词 ===
 
+                # 检查是否包含一级机构关键词
+                is_primary = _C3_PRIMARY_RE.search(part_lower) is not None
+
                 # 检查是否只包含学科词，没有机构关键词
-                is_discipline_only = False
-                for disc in discipline_only_patterns:
-                    if disc in part_lower:
-                        # 如果包含学科词，检查是否也包含机构关键词
-                        has_institution = any(kw.lower() in part_lower for kw in primary_keywords)
-                        if not has_institution:
-                            is_discipline_only = True
-                            break
-
-                if is_discipline_only:
+                if not is_primary and _C3_DISCIPLINE_ONLY_RE.search(part_lower):
                     continue
 
                 # === 第8层：识别一级机构 ===
 
-                # 检查是否包含一级机构关键词
-                is_primary = any(kw.lower() in part_lower for kw in primary_keywords)
-
                 # 特殊处理：College和School需要智能判断
                 has_college = 'college' in part_lower
                 has_school = 'school' in part_lower
@@ -4349,11 +4546,9 @@ class ScopusToWosConverter:
 
                 if is_primary:
                     # 清理机构名称
-                    clean_name = self.clean_institution_name(part)
-                    if clean_name:
-                        add_primary_institution(clean_name)
+                    add_primary_institution(part)
 
-        return primary_institutions
+        return list(primary_institutions.values())
 
     def clean_institution_name(self, name: str) -> str:
         """
@@ -4365,44 +4560,22 @@ class ScopusToWosConverter:
         "Sun Yat-Sen Univ Canc Ctr" -> "Sun Yat Sen University"
         """
         # 移除多余空格
-        name = re.sub(r'\s+', ' ', name).strip()
+        name = _WHITESPACE_RE.sub(' ', name).strip()
 
         # 移除尾部的部门/中心后缀（这些不应该出现在C3字段中）
-        department_suffixes = [
-            r'\s+Canc(?:er)?\s+Ctr$',  # Cancer Center
-            r'\s+Canc(?:er)?\s+Cent(?:er|re)$',
-            r'\s+Med(?:ical)?\s+Cent(?:er|re)$',  # Medical Center (但保留前面的机构名)
-            r'\s+Res(?:earch)?\s+Cent(?:er|re)$',
-            r'\s+Dept\.?$',
-            r'\s+Dept\s+\w+$',  # Dept Med, Dept Oncol等
-            r',?\s+Ltd\.?$',  # Ltd., Ltd
-            r',?\s+Inc\.?$',  # Inc., Inc
-            r',?\s+Co\.?$',   # Co., Co
-        ]
-
-        for suffix_pattern in department_suffixes:
-            name = re.sub(suffix_pattern, '', name, flags=re.IGNORECASE)
+        for suffix_re in _C3_DEPARTMENT_SUFFIX_RES:
+            name = suffix_re.sub('', name)
 
         # 标准化常见表达
-        replacements = {
-            'Università degli Studi di': 'University of',
-            'Università di': 'University of',
-            'Università': 'University',
-            'Ospedale': 'Hospital',
-            'Istituto': 'Institute',
-            'Fondazione IRCCS': 'IRCCS Fondazione',
-        }
-
-        for old, new in replacements.items():
-            name = re.sub(r'\b' + re.escape(old) + r'\b', new, name, flags=re.IGNORECASE)
+        name = _apply_word_replacements(_C3_NAME_REPLACEMENTS_RE, _C3_NAME_REPLACEMENTS, name)
 
         # 标准化人名中的连字符（Sun Yat-Sen -> Sun Yat Sen）
         # 但保留复合词中的连字符（如Clermont-Ferrand）
         # 策略：如果连字符两边都是大写字母开头的短词（2-5字母），则替换为空格
-        name = re.sub(r'\b([A-Z][a-z]{1,4})-([A-Z][a-z]{1,4})\b', r'\1 \2', name)
+        name = _HYPHENATED_NAME_RE.sub(r'\1 \2', name)
 
         # 清理多余空格
-        name = re.sub(r'\s+', ' ', name).strip()
+        name = _WHITESPACE_RE.sub(' ', name).strip()
 
         # 最终检查：如果清理后太短（< 5字符），可能是无效的
         if len(name) < 5:
@@ -4439,15 +4612,12 @@ class ScopusToWosConverter:
             fallback_abbrev = fallback_abbreviated_authors[index] if index < len(fallback_abbreviated_authors) else ''
             abbreviated_authors.append(self._format_author_abbreviation(full_name, fallback_abbrev))
 
+        # 多值字段整块拼接：续行以 "\n   " 连接，一次 join 代替逐行 append
         if abbreviated_authors:
-            wos_lines.append(f"AU {abbreviated_authors[0]}")
-            for author in abbreviated_authors[1:]:
-                wos_lines.append(f"   {author}")
+            wos_lines.append("AU " + _CONTINUATION_SEPARATOR.join(abbreviated_authors))
 
         if full_names:
-            wos_lines.append(f"AF {full_names[0]}")
-            for name in full_names[1:]:
-                wos_lines.append(f"   {name}")
+            wos_lines.append("AF " + _CONTINUATION_SEPARATOR.join(full_names))
 
         # TI - Title
         title = scopus_record.get('Title', '')
@@ -4487,11 +4657,16 @@ class ScopusToWosConverter:
             # 修复Scopus摘要格式：在章节标题后添加空格
             # INTRODUCTION:The -> INTRODUCTION: The
             # METHODS:Prospective -> METHODS: Prospective
-            abstract_fixed = re.sub(r'([A-Z]+):([A-Z])', r'\1: \2', abstract)
+            # 两条规则都以冒号为锚点，不含冒号的摘要直接跳过正则
+            abstract_fixed = abstract
+            if ':' in abstract_fixed:
+                abstract_fixed = _ABSTRACT_SECTION_RE.sub(r'\1: \2', abstract_fixed)
+
+                # WOS格式细节修复：
+                # 1. "F: M ratio" -> "F:M ratio"（比例中的冒号不要空格）
+                if ' ratio' in abstract_fixed:
+                    abstract_fixed = _ABSTRACT_RATIO_RE.sub(r'\1:\2 ratio', abstract_fixed)
 
-            # WOS格式细节修复：
-            # 1. "F: M ratio" -> "F:M ratio"（比例中的冒号不要空格）
-            abstract_fixed = re.sub(r'([A-Z]): ([A-Z]) ratio', r'\1:\2 ratio', abstract_fixed)
             # 2. "±" -> "+/-"（特殊符号转换）
             abstract_fixed = abstract_fixed.replace('±', '+/-')
 
@@ -4510,9 +4685,7 @@ class ScopusToWosConverter:
         affils = self._collapse_redundant_c1_lines(affils, full_names=full_names)
 
         if affils:
-            wos_lines.append(f"C1 {affils[0]}")
-            for affil in affils[1:]:
-                wos_lines.append(f"   {affil}")
+            wos_lines.append("C1 " + _CONTINUATION_SEPARATOR.join(affils))
 
         # C3 - Organization Enhanced
         # 直接基于最终 C1 推导，避免 C1/C3 语义分裂，并借助校准映射尽量贴近 WOS 的组织增强风格。
@@ -4537,9 +4710,7 @@ class ScopusToWosConverter:
         # CR - Cited References
         references = self.convert_references(scopus_record.get('References', ''))
         if references:
-            wos_lines.append(f"CR {references[0]}")
-            for ref in references[1:]:
-                wos_lines.append(f"   {ref}")
+            wos_lines.append("CR " + _CONTINUATION_SEPARATOR.join(references))
 
         # NR - Number of References
         if references:
@@ -4634,19 +4805,46 @@ class ScopusToWosConverter:
         if pmid:
             wos_lines.append(f"PM {pmid}")
 
-        # DA - Date of Export
-        today = datetime.now().strftime('%Y-%m-%d')
-        wos_lines.append(f"DA {today}")
+        # DA - Date of Export（每次 convert() 开始时计算一次）
+        wos_lines.append(f"DA {self.export_date}")
 
         # ER - End of Record
         wos_lines.append("ER")
 
         return '\n'.join(wos_lines)
 
-    def convert(self):
+    def _convert_record_safely(self, record: Dict) -> tuple[str, Optional[str], Optional[str]]:
+        """转换单条记录并捕获异常，返回 (标题, WOS文本, 错误信息)；标题仅在写日志时截短。"""
+        title = record.get('Title', 'N/A')
+        try:
+            return title, self.convert_record(record), None
+        except Exception as e:
+            return title, None, str(e)
+
+    def _iter_converted_records(self, records: Iterator[Dict], workers: int) -> Iterator[tuple[str, Optional[str], Optional[str]]]:
+        """按输入顺序产出转换结果；workers > 1 时使用进程池并行转换。"""
+        if workers <= 1:
+            for record in records:
+                yield self._convert_record_safely(record)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_convert_worker, initargs=(self,)) as executor:
+            # executor.map 会一次性提交全部任务，这里按窗口分批提交，保持流式读取的内存上限；
+            # map 保持输入顺序，输出文件与串行转换完全一致
+            window = _PARALLEL_CHUNKSIZE * workers * 4
+            while True:
+                batch = list(itertools.islice(records, window))
+                if not batch:
+                    break
+                yield from executor.map(_convert_record_in_worker, batch, chunksize=_PARALLEL_CHUNKSIZE)
+
+    def convert(self, workers: int = 1):
         """
         执行转换
 
+        Args:
+            workers: 并行转换的进程数（默认1，即串行；0 表示使用全部CPU核心）
+
         Raises:
             IOError: 写入文件失败
         """
@@ -4654,59 +4852,78 @@ class ScopusToWosConverter:
         logger.info("开始转换 Scopus CSV → WOS 纯文本格式")
         logger.info("="*60)
 
-        # 读取Scopus CSV
-        self.records = self.read_scopus_csv()
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        self.export_date = datetime.now().strftime('%Y-%m-%d')
 
-        if not self.records:
-            logger.warning("没有找到任何记录，终止转换")
-            return
+        # 有参考WOS时，校准需要完整的 Scopus 记录集合；否则逐行流式转换，不整体驻留内存
+        total: Optional[int] = None
+        if self.reference_wos_file:
+            records = self.read_scopus_csv()
+            total = len(records)
 
-        # 以整份 WOS 语料建立通用校准映射（期刊 / 作者），而不是逐条借用重复记录字段
-        self._build_reference_calibration(self.records)
+            # 以整份 WOS 语料建立通用校准映射（期刊 / 作者），而不是逐条借用重复记录字段
+            self._build_reference_calibration(records)
+            records = iter(records)
+        else:
+            records = self.iter_scopus_csv()
 
-        # 转换每条记录
-        wos_content = []
+        first_record = next(records, None)
+        if first_record is None:
+            logger.warning("没有找到任何记录，终止转换")
+            return
 
-        # WOS文件头（无空行分隔）
-        wos_content.append("FN Clarivate Analytics Web of Science")
-        wos_content.append("VR 1.0")
+        if total is not None:
+            logger.info(f"开始转换 {total} 条记录...")
+        else:
+            logger.info("开始逐条转换记录...")
 
-        total = len(self.records)
-        logger.info(f"开始转换 {total} 条记录...")
+        # 逐条写入文件（包含UTF-8 BOM，与WOS格式完全一致）
+        # 先写同目录下的临时文件，全部成功后再替换：读取CSV中途出错时不会留下截断的输出文件
+        tmp_path = f"{self.output_file}.tmp"
+        converted_count = 0
+        try:
+            with open(tmp_path, 'w', encoding='utf-8-sig', buffering=1 << 20) as f:
+                write = f.write  # 热循环内避免重复属性查找
 
-        # 转换每条记录
-        for i, record in enumerate(self.records, 1):
-            title = record.get('Title', 'N/A')
-            title_short = title[:50] + "..." if len(title) > 50 else title
+                # WOS文件头（无空行分隔）
+                write("FN Clarivate Analytics Web of Science\nVR 1.0")
 
-            # 进度显示（每10%或每100条显示一次）
-            if i % max(1, total // 10) == 0 or i % 100 == 0 or i == total:
-                progress = (i / total) * 100
-                logger.info(f"进度: {progress:.1f}% ({i}/{total}) - {title_short}")
+                # 进度显示间隔：小数据集每10%一次，大数据集约每1%一次（至少间隔100条），总量未知时每100条
+                if total is not None:
+                    log_every = min(max(1, total // 10), max(100, total // 100))
+                else:
+                    log_every = 100
+
+                converted_records = self._iter_converted_records(itertools.chain((first_record,), records), workers)
+                for i, (title, wos_record, error) in enumerate(converted_records, 1):
+                    converted_count = i
+
+                    if i % log_every == 0 or i == total:
+                        if total is not None:
+                            progress = (i / total) * 100
+                            logger.info(f"进度: {progress:.1f}% ({i}/{total}) - {_shorten_title(title)}")
+                        else:
+                            logger.info(f"进度: {i} 条 - {_shorten_title(title)}")
+
+                    if error is not None:
+                        logger.error(f"转换第 {i} 条记录时出错: {error}")
+                        logger.error(f"问题记录: {_shorten_title(title)}")
+                        # 继续处理下一条
+                        continue
 
-            try:
-                wos_record = self.convert_record(record)
-                # 在记录前添加空行（除了第一条记录）
-                if i > 1:
-                    wos_content.append("")  # 空行
-                wos_content.append(wos_record)
-            except Exception as e:
-                logger.error(f"转换第 {i} 条记录时出错: {e}")
-                logger.error(f"问题记录: {title_short}")
-                # 继续处理下一条
+                    # 在记录前添加空行（除了第一条记录）
+                    write("\n\n" if i > 1 else "\n")
+                    write(wos_record)
 
-        # WOS文件尾（前面加空行）
-        wos_content.append("")  # 空行
-        wos_content.append("EF")
+                # WOS文件尾（前面加空行）
+                write("\n\nEF")
+            os.replace(tmp_path, self.output_file)
 
-        # 写入文件（用单个换行符连接，包含UTF-8 BOM，与WOS格式完全一致）
-        try:
-            with open(self.output_file, 'w', encoding='utf-8-sig') as f:
-                f.write('\n'.join(wos_content))
             logger.info("="*60)
             logger.info(f"转换完成！")
             logger.info(f"输出文件: {self.output_file}")
-            logger.info(f"共转换 {len(self.records)} 条记录")
+            logger.info(f"共转换 {converted_count} 条记录")
             logger.info("="*60)
         except IOError as e:
             logger.error(f"写入文件失败: {e}")
@@ -4714,6 +4931,27 @@ class ScopusToWosConverter:
         except Exception as e:
             logger.error(f"写入文件时发生未知错误: {e}")
             raise
+        finally:
+            # 成功时临时文件已被替换；失败时删除不完整的临时文件
+            Path(tmp_path).unlink(missing_ok=True)
+
+
+def _shorten_title(title: str) -> str:
+    """日志中显示的标题摘要（最多50字符）"""
+    return title[:50] + "..." if len(title) > 50 else title
+
+
+# 多进程转换时每个工作进程持有的转换器副本
+_worker_converter: Optional[ScopusToWosConverter] = None
+
+
+def _init_convert_worker(converter: ScopusToWosConverter):
+    global _worker_converter
+    _worker_converter = converter
+
+
+def _convert_record_in_worker(record: Dict) -> tuple[str, Optional[str], Optional[str]]:
+    return _worker_converter._convert_record_safely(record)
 
 
 def main():
@@ -4732,6 +4970,8 @@ def main():
                        help='输出WOS文件路径（默认: scopus_converted_to_wos.txt）')
     parser.add_argument('--config-dir', default='config',
                        help='配置文件目录（默认: config）')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='并行转换的进程数（默认: 1，即串行；0 表示使用全部CPU核心）')
     parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                        default='INFO', help='日志级别（默认: INFO）')
 
@@ -4754,7 +4994,7 @@ def main():
             args.output_file,
             args.config_dir
         )
-        converter.convert()
+        converter.convert(workers=args.workers)
 
         logger.info("")
         logger.info("转换完成！现在可以将输出文件导入文献计量学分析工具。")
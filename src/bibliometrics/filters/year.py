@@ -20,7 +20,7 @@ import sys
 import argparse
 import logging
 from collections import Counter
-from typing import List, Dict, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,10 +28,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 一条完整记录：从 PT 行开始，到第一个仅含 ER 的行（含换行符）为止
+_RECORD_RE = re.compile(r'^PT .*?^[^\S\n]*ER[^\S\n]*(?:\n|\Z)', re.MULTILINE | re.DOTALL)
+_PY_RE = re.compile(r'^PY[^\S\n]+(\d{4})', re.MULTILINE)
+_YEAR_RANGE_RE = re.compile(r'^(\d{4})-(\d{4})$')
+# 流式解析时每次读取的字符数
+_READ_CHUNK_SIZE = 1 << 20
+
 
 class YearFilter:
     """年份过滤器"""
 
+    __slots__ = ('min_year', 'max_year', 'stats')
+
     def __init__(self, min_year: Optional[int] = None, max_year: Optional[int] = None):
         """
         初始化年份过滤器
@@ -58,53 +67,79 @@ class YearFilter:
         Returns:
             List of records, each record is {'raw_text': str, 'year': str}
         """
-        records = []
-        current_record = []
-        current_year = None
-        in_record = False
-
         logger.info(f"开始解析文件: {input_file}")
 
-        with open(input_file, 'r', encoding='utf-8-sig') as f:
-            for line in f:
-                # 文件头
-                if line.startswith('FN ') or line.startswith('VR '):
-                    continue
-
-                # 记录开始
-                if line.startswith('PT '):
-                    in_record = True
-                    current_record = [line]
-                    current_year = None
-                    continue
-
-                # 记录中
-                if in_record:
-                    current_record.append(line)
-
-                    # 提取年份
-                    if line.startswith('PY '):
-                        year_match = re.match(r'^PY\s+(\d{4})', line)
-                        if year_match:
-                            current_year = year_match.group(1)
-
-                    # 记录结束
-                    if line.strip() == 'ER':
-                        records.append({
-                            'raw_text': ''.join(current_record),
-                            'year': current_year
-                        })
-                        self.stats['total_records'] += 1
-                        if current_year:
-                            self.stats['year_distribution'][current_year] += 1
-
-                        in_record = False
-                        current_record = []
-                        current_year = None
+        records = [
+            {'raw_text': raw_text, 'year': year}
+            for raw_text, year in self._iter_records(input_file)
+        ]
+
+        # 统计在解析结束后一次性汇总（Counter.update 走C层计数）
+        self.stats['total_records'] += len(records)
+        self.stats['year_distribution'].update(record['year'] for record in records if record['year'])
 
         logger.info(f"解析完成，共 {len(records)} 条记录")
         return records
 
+    def _iter_records(self, input_file: str) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        分块读取WOS文件，依次产出 (记录原文, 年份)
+
+        整个 PT...ER 记录由编译好的正则在C层切出；内存中只保留当前块和未完成的记录。
+        """
+        with open(input_file, 'r', encoding='utf-8-sig') as f:
+            buffer = ''
+            while True:
+                chunk = f.read(_READ_CHUNK_SIZE)
+                at_eof = not chunk
+                buffer += chunk
+                consumed = 0
+
+                for match in _RECORD_RE.finditer(buffer):
+                    # 匹配到块末尾时 ER 行可能被截断，留到下一块再判断
+                    if not at_eof and match.end() == len(buffer):
+                        break
+                    raw_text = match.group()
+                    years = _PY_RE.findall(raw_text)
+                    yield raw_text, (years[-1] if years else None)
+                    consumed = match.end()
+
+                if at_eof:
+                    return
+                buffer = buffer[consumed:]
+
+    def _iter_kept_records(self, input_file: str) -> Iterator[str]:
+        """流式解析并过滤，逐条产出保留的记录原文，同时更新统计"""
+        logger.info(f"开始解析文件: {input_file}")
+
+        keep_by_year: Dict[Optional[str], bool] = {}
+        total = 0
+        kept = 0
+        year_distribution = self.stats['year_distribution']
+        filtered_years = self.stats['filtered_years']
+
+        for raw_text, year in self._iter_records(input_file):
+            total += 1
+            if year:
+                year_distribution[year] += 1
+
+            # 年份取值很少，每个不同年份只判断一次
+            keep = keep_by_year.get(year)
+            if keep is None:
+                keep = keep_by_year[year] = self.should_keep_record(year)
+
+            if keep:
+                kept += 1
+                yield raw_text
+            elif year:
+                filtered_years[year] += 1
+
+        self.stats['total_records'] += total
+        self.stats['filtered_records'] += total - kept
+
+        logger.info(f"解析完成，共 {total} 条记录")
+        logger.info(f"过滤完成，保留 {kept}/{total} 条记录")
+
     def should_keep_record(self, year: Optional[str]) -> bool:
         """
         判断是否保留该记录
@@ -145,34 +180,35 @@ class YearFilter:
             保留的记录文本列表
         """
         filtered_records = []
+        filtered_years = []
+
+        # 年份取值很少，每个不同年份只判断一次
+        keep_by_year = {year: self.should_keep_record(year) for year in {record['year'] for record in records}}
 
         for record in records:
             year = record['year']
 
-            if self.should_keep_record(year):
+            if keep_by_year[year]:
                 filtered_records.append(record['raw_text'])
             else:
-                self.stats['filtered_records'] += 1
-                if year:
-                    self.stats['filtered_years'][year] += 1
+                filtered_years.append(year)
+
+        self.stats['filtered_records'] += len(filtered_years)
+        self.stats['filtered_years'].update(year for year in filtered_years if year)
 
         logger.info(f"过滤完成，保留 {len(filtered_records)}/{len(records)} 条记录")
         return filtered_records
 
-    def write_filtered_file(self, output_file: str, filtered_records: List[str]):
+    def write_filtered_file(self, output_file: str, filtered_records: Iterable[str]):
         """写入过滤后的文件"""
         logger.info(f"写入文件: {output_file}")
 
-        with open(output_file, 'w', encoding='utf-8-sig') as f:
+        with open(output_file, 'w', encoding='utf-8-sig', buffering=1 << 20) as f:
             # 写入文件头
-            f.write('FN Clarivate Analytics Web of Science\n')
-            f.write('VR 1.0\n')
-            f.write('\n')
+            f.write('FN Clarivate Analytics Web of Science\nVR 1.0\n\n')
 
-            # 写入记录
-            for record_text in filtered_records:
-                f.write(record_text)
-                f.write('\n')
+            # 写入记录（大缓冲区 + writelines 批量写出）
+            f.writelines(record_text + '\n' for record_text in filtered_records)
 
             # 写入文件尾
             f.write('EF\n')
@@ -245,14 +281,8 @@ class YearFilter:
         logger.info("开始年份过滤")
         logger.info("="*60)
 
-        # 解析文件
-        records = self.parse_wos_file(input_file)
-
-        # 过滤记录
-        filtered_records = self.filter_records(records)
-
-        # 写入文件
-        self.write_filtered_file(output_file, filtered_records)
+        # 解析、过滤、写入一次流式完成，不在内存中保留整个文件
+        self.write_filtered_file(output_file, self._iter_kept_records(input_file))
 
         # 生成报告
         if report_file:
@@ -272,6 +302,19 @@ class YearFilter:
                 logger.info(f"  {year}: {count} 篇")
 
 
+def filter_wos_file(input_file: str, output_file: str, min_year: Optional[int], max_year: Optional[int],
+                    report_file: Optional[str] = None) -> Dict:
+    """
+    按年份过滤WOS文件并返回统计信息（模块级函数，可在子进程中执行）
+
+    Returns:
+        YearFilter.stats 的副本
+    """
+    year_filter = YearFilter(min_year=min_year, max_year=max_year)
+    year_filter.filter_file(input_file, output_file, report_file)
+    return dict(year_filter.stats)
+
+
 def parse_year_range(year_range: str) -> Tuple[int, int]:
     """
     解析年份范围字符串
@@ -282,7 +325,7 @@ def parse_year_range(year_range: str) -> Tuple[int, int]:
     Returns:
         (min_year, max_year)
     """
-    match = re.match(r'^(\d{4})-(\d{4})$', year_range)
+    match = _YEAR_RANGE_RE.match(year_range)
     if not match:
         raise ValueError(f"年份范围格式错误: {year_range}，应为 YYYY-YYYY 格式（如 2015-2024）")
 
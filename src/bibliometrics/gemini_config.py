@@ -11,6 +11,7 @@ Gemini API配置模块
 
 import os
 import json
+import functools
 import logging
 from pathlib import Path
 from typing import Optional
@@ -27,9 +28,32 @@ PLACEHOLDER_API_KEYS = {
 }
 
 
+@functools.lru_cache(maxsize=1)
+def _env_defaults() -> dict:
+    """读取并解析 GEMINI_* 环境变量（进程内只解析一次；环境变量变更后可调用 cache_clear()）"""
+    return {
+        'api_key': os.getenv('GEMINI_API_KEY'),
+        'api_url': os.getenv('GEMINI_API_URL', 'https://gptload.drmeng.top/proxy/bibliometrics/v1beta'),
+        'model': os.getenv('GEMINI_MODEL', 'gemini-2.5-flash-lite'),
+        'max_tokens': int(os.getenv('GEMINI_MAX_TOKENS', '5000')),  # 增加到5000
+        'temperature': float(os.getenv('GEMINI_TEMPERATURE', '0.1')),
+        'timeout': int(os.getenv('GEMINI_TIMEOUT', '60')),  # 增加超时时间
+        'max_retries': int(os.getenv('GEMINI_MAX_RETRIES', '3')),
+        'retry_delay': int(os.getenv('GEMINI_RETRY_DELAY', '5')),  # 秒
+        'requests_per_minute': int(os.getenv('GEMINI_REQUESTS_PER_MINUTE', '40')),  # 每1.5秒一次
+    }
+
+
 class GeminiConfig:
     """Gemini API配置管理"""
 
+    __slots__ = (
+        'api_key', 'api_url', 'model',
+        'max_tokens', 'temperature', 'timeout',
+        'max_retries', 'retry_delay', 'requests_per_minute',
+        'enabled', 'enable_caching', 'fallback_to_rules',
+    )
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -45,18 +69,22 @@ class GeminiConfig:
             model: 模型名称
         """
         # 优先使用传入的参数，其次使用环境变量，最后使用默认值
-        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
-        self.api_url = api_url or os.getenv('GEMINI_API_URL', 'https://gptload.drmeng.top/proxy/bibliometrics/v1beta')
-        self.model = model or os.getenv('GEMINI_MODEL', 'gemini-2.5-flash-lite')
+        env = _env_defaults()
+        self.api_key = api_key or env['api_key']
+        self.api_url = api_url or env['api_url']
+        self.model = model or env['model']
 
         # API配置
-        self.max_tokens = int(os.getenv('GEMINI_MAX_TOKENS', '5000'))  # 增加到5000
-        self.temperature = float(os.getenv('GEMINI_TEMPERATURE', '0.1'))
-        self.timeout = int(os.getenv('GEMINI_TIMEOUT', '60'))  # 增加超时时间
+        self.max_tokens = env['max_tokens']
+        self.temperature = env['temperature']
+        self.timeout = env['timeout']
 
         # 重试配置
-        self.max_retries = int(os.getenv('GEMINI_MAX_RETRIES', '3'))
-        self.retry_delay = int(os.getenv('GEMINI_RETRY_DELAY', '5'))  # 秒
+        self.max_retries = env['max_retries']
+        self.retry_delay = env['retry_delay']
+
+        # 速率限制（每分钟最多请求数，遇到429时自动降速）
+        self.requests_per_minute = env['requests_per_minute']
 
         # 功能开关
         self.enabled = self._has_real_api_key(self.api_key)
@@ -142,24 +142,26 @@ class RecordMatcher:
         return ''
 
     @staticmethod
-    def is_duplicate(record1: Dict, record2: Dict) -> bool:
-        """
-        判断两条记录是否重复
+    def match_key(record: Dict) -> Tuple[str, str, str, str]:
+        """提取查重用的 (DOI, 标准化标题, 年份, 第一作者)，每条记录只需计算一次"""
+        return (
+            record.get('DI', '').strip().lower(),
+            RecordMatcher.normalize_title(record.get('TI', '')),
+            record.get('PY', ''),
+            RecordMatcher.get_first_author(record),
+        )
+
+    @staticmethod
+    def keys_match(key1: Tuple[str, str, str, str], key2: Tuple[str, str, str, str]) -> bool:
+        """按 match_key() 的结果判断两条记录是否重复（规则见 is_duplicate）"""
+        doi1, title1, year1, author1 = key1
+        doi2, title2, year2, author2 = key2
 
-        策略：
-        1. DOI匹配（最准确）
-        2. 标题 + 年份 + 第一作者
-        """
         # 策略1：DOI匹配
-        doi1 = record1.get('DI', '').strip().lower()
-        doi2 = record2.get('DI', '').strip().lower()
         if doi1 and doi2 and doi1 == doi2:
             return True
 
         # 策略2：标题 + 年份 + 第一作者
-        title1 = RecordMatcher.normalize_title(record1.get('TI', ''))
-        title2 = RecordMatcher.normalize_title(record2.get('TI', ''))
-
         if not title1 or not title2:
             return False
 
@@ -174,21 +176,27 @@ class RecordMatcher:
             return False
 
         # 年份匹配
-        year1 = record1.get('PY', '')
-        year2 = record2.get('PY', '')
         if year1 != year2:
             return False
 
         # 第一作者匹配（如果有）
-        author1 = RecordMatcher.get_first_author(record1)
-        author2 = RecordMatcher.get_first_author(record2)
-
         if author1 and author2:
             return author1 == author2
         else:
             # 没有作者信息，仅凭标题+年份判断
             return True
 
+    @staticmethod
+    def is_duplicate(record1: Dict, record2: Dict) -> bool:
+        """
+        判断两条记录是否重复
+
+        策略：
+        1. DOI匹配（最准确）
+        2. 标题 + 年份 + 第一作者
+        """
+        return RecordMatcher.keys_match(RecordMatcher.match_key(record1), RecordMatcher.match_key(record2))
+
 
 class WOSStandardExtractor:
     """从WOS记录中提取标准格式"""
@@ -591,6 +599,8 @@ class MergeDeduplicateTool:
         self.wos_records = []
         self.scopus_records = []
         self.final_records = []
+        # run() 中识别出的 (WOS索引, Scopus索引) 重复对，供调用方复用，无需再次扫描
+        self.duplicate_pairs: List[Tuple[int, int]] = []
 
         self.stats = {
             'wos_count': 0,
@@ -634,7 +644,7 @@ class MergeDeduplicateTool:
 
         # 步骤3：识别Scopus中与WOS重复的记录
         logger.info("步骤 3/5: 识别WOS-Scopus重复记录...")
-        wos_scopus_pairs = self.find_wos_scopus_duplicates()
+        wos_scopus_pairs = self.duplicate_pairs = self.find_wos_scopus_duplicates()
 
         self.stats['scopus_duplicates'] = len(wos_scopus_pairs)
         self.stats['scopus_unique'] = self.stats['scopus_count'] - self.stats['scopus_duplicates']
@@ -678,24 +688,49 @@ class MergeDeduplicateTool:
         pairs = []
         scopus_matched = set()  # 已匹配的Scopus索引
 
+        # 每条Scopus记录的查重键只算一次，并按 DOI、年份建索引：
+        # 重复必然 DOI 相同或年份相同，只需检查这两类候选，不再逐对比较全部记录
+        scopus_keys = [self.matcher.match_key(record) for record in self.scopus_records]
+        scopus_by_doi = defaultdict(list)
+        scopus_by_year = defaultdict(list)
+        for scopus_idx, (doi, _, year, _) in enumerate(scopus_keys):
+            if doi:
+                scopus_by_doi[doi].append(scopus_idx)
+            scopus_by_year[year].append(scopus_idx)
+
         for wos_idx, wos_record in enumerate(self.wos_records):
-            for scopus_idx, scopus_record in enumerate(self.scopus_records):
-                if scopus_idx in scopus_matched:
-                    continue
-
-                if self.matcher.is_duplicate(wos_record, scopus_record):
-                    pairs.append((wos_idx, scopus_idx))
-                    scopus_matched.add(scopus_idx)
-
-                    # 记录详情
-                    title = wos_record.get('TI', 'N/A')[:60]
-                    self.stats['duplicate_details'].append({
-                        'title': title,
-                        'wos_idx': wos_idx,
-                        'scopus_idx': scopus_idx
-                    })
-
-                    break  # 找到匹配，继续下一个WOS记录
+            wos_key = self.matcher.match_key(wos_record)
+            doi, title, year, _ = wos_key
+
+            # 与逐个比较时一致：取索引最小的未匹配重复记录
+            match_idx = None
+            if doi:
+                for scopus_idx in scopus_by_doi.get(doi, ()):
+                    if scopus_idx not in scopus_matched:
+                        match_idx = scopus_idx
+                        break
+
+            if title:
+                for scopus_idx in scopus_by_year.get(year, ()):
+                    if match_idx is not None and scopus_idx >= match_idx:
+                        break
+                    if scopus_idx in scopus_matched:
+                        continue
+                    if self.matcher.keys_match(wos_key, scopus_keys[scopus_idx]):
+                        match_idx = scopus_idx
+                        break
+
+            if match_idx is not None:
+                pairs.append((wos_idx, match_idx))
+                scopus_matched.add(match_idx)
+
+                # 记录详情
+                title = wos_record.get('TI', 'N/A')[:60]
+                self.stats['duplicate_details'].append({
+                    'title': title,
+                    'wos_idx': wos_idx,
+                    'scopus_idx': match_idx
+                })
 
         return pairs
 
@@ -19,11 +19,15 @@
 版本：v5.1.0 (Stable Release)
 """
 
+import io
 import os
 import sys
 import time
 import logging
+import threading
 import argparse
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional
 
@@ -36,13 +40,63 @@ logger = logging.getLogger(__name__)
 
 # 导入各个模块
 from ..converters.batch import EnhancedConverterBatchV2
+from ..converters.scopus import scopus_record_builder
 from ..standardizers.enrichment import InstitutionEnricherV2
 from ..gemini_config import GeminiConfig
 from .merge import MergeDeduplicateTool
 from ..filters.language import LanguageFilter
 from ..analysis.records import RecordAnalyzer
 from ..standardizers.institutions import InstitutionCleaner
-from ..filters.year import YearFilter
+from ..filters.year import filter_wos_file, parse_year_range
+
+# 步骤标题上下的分隔线
+_SEPARATOR = "=" * 80
+
+# WOS 与 Scopus 输入合计超过该大小时，WOS 年份过滤放到子进程中与 Scopus 过滤并行
+_PARALLEL_YEAR_FILTER_MIN_BYTES = 64 << 20
+
+
+def _log_header(title: str):
+    """输出步骤标题（分隔线、标题、分隔线各为一条日志，每行都带时间和级别前缀）"""
+    logger.info(_SEPARATOR)
+    logger.info(title)
+    logger.info(_SEPARATOR)
+
+
+class _DeferredThreadLogs(logging.Filter):
+    """
+    暂存当前线程发往根处理器的日志，退出时按原顺序补发
+
+    与后台线程中的步骤同时运行时，前台步骤的日志排在后台步骤之后，步骤标题和序号不交错
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._thread_id = threading.get_ident()
+        self._records = {}
+        self._handlers = []
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.thread == self._thread_id:
+            # 同一条日志会经过每个处理器的过滤器，按对象只保存一次
+            self._records.setdefault(id(record), record)
+            return False
+        return True
+
+    def __enter__(self):
+        self._handlers = list(logging.getLogger().handlers)
+        for handler in self._handlers:
+            handler.addFilter(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        for handler in self._handlers:
+            handler.removeFilter(self)
+        for record in self._records.values():
+            for handler in self._handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        self._records.clear()
 
 
 def load_generate_all_figures():
@@ -98,6 +152,14 @@ class AIWorkflow:
         self.cleaned_file = self.data_dir / 'Final_Version.txt'
         self.report_file = self.data_dir / 'ai_workflow_report.txt'
 
+        # 步骤2解析出的保留记录，交给步骤3转换
+        self._scopus_filtered_records = None
+
+        # 最终分析文件：优先使用清洗后的文件，否则使用筛选后的文件
+        self.analysis_file = self.cleaned_file if self.enable_cleaning else self.filtered_file
+        # 与 RecordAnalyzer.save_detailed_report() 的命名规则保持一致
+        self.analysis_report_file = str(self.analysis_file).replace('.txt', '_analysis_report.txt')
+
         # 统计信息
         self.stats = {
             'start_time': time.time(),
@@ -114,62 +176,83 @@ class AIWorkflow:
 
     def check_files(self) -> bool:
         """检查必需文件是否存在"""
-        logger.info("=" * 80)
-        logger.info("步骤0: 检查输入文件")
-        logger.info("=" * 80)
+        _log_header("步骤0: 检查输入文件")
 
-        if not self.wos_file.exists():
-            logger.error(f"✗ WOS文件不存在: {self.wos_file}")
+        # 一次 scandir 列出数据目录，代替逐个 exists()；DirEntry 同时带回文件大小
+        try:
+            with os.scandir(self.data_dir) as it:
+                entries = {entry.name: entry for entry in it}
+        except OSError as e:
+            logger.error(f"✗ 无法读取数据目录: {self.data_dir} ({e})")
             return False
 
-        if not self.scopus_file.exists():
-            logger.error(f"✗ Scopus文件不存在: {self.scopus_file}")
-            return False
+        sizes = {}
+        for label, path in (('WOS', self.wos_file), ('Scopus', self.scopus_file)):
+            entry = entries.get(path.name)
+            if entry is None:
+                logger.error(f"✗ {label}文件不存在: {path}")
+                return False
+            sizes[label] = entry.stat().st_size
 
-        logger.info(f"✓ WOS文件: {self.wos_file}")
-        logger.info(f"✓ Scopus文件: {self.scopus_file}")
+        logger.info(f"✓ WOS文件: {self.wos_file} ({sizes['WOS'] / 1024 / 1024:.1f} MB)")
+        logger.info(f"✓ Scopus文件: {self.scopus_file} ({sizes['Scopus'] / 1024 / 1024:.1f} MB)")
         logger.info("")
 
         return True
 
-    def step1_filter_wos_by_year(self) -> bool:
-        """步骤1: 年份范围过滤WOS数据（如果启用）"""
-        logger.info("=" * 80)
-        logger.info("步骤1: 年份范围过滤WOS数据")
-        logger.info("=" * 80)
-
+    def _submit_wos_year_filter(self) -> Optional[Future]:
+        """输入较大时在子进程中提前启动WOS年份过滤，返回 Future；否则返回 None（由步骤1直接执行）"""
         try:
-            # 解析年份范围
-            import re
-            match = re.match(r'^(\d{4})-(\d{4})$', self.year_range)
-            if not match:
-                raise ValueError(f"年份范围格式错误: {self.year_range}，应为 YYYY-YYYY 格式（如 2015-2024）")
+            input_size = self.wos_file.stat().st_size + self.scopus_file.stat().st_size
+            min_year, max_year = parse_year_range(self.year_range)
+        except (OSError, ValueError):
+            # 年份范围错误交给步骤1报告
+            return None
+
+        if input_size < _PARALLEL_YEAR_FILTER_MIN_BYTES:
+            return None
+
+        report_file = str(self.wos_year_filtered).replace('.txt', '_year_filter_report.txt')
+        executor = ProcessPoolExecutor(max_workers=1)
+        future = executor.submit(filter_wos_file, str(self.wos_file), str(self.wos_year_filtered),
+                                 min_year, max_year, report_file)
+        # 不等待：任务完成后进程池自动释放
+        executor.shutdown(wait=False)
+        return future
+
+    def step1_filter_wos_by_year(self, pending_filter: Optional[Future] = None) -> bool:
+        """步骤1: 年份范围过滤WOS数据（如果启用）
 
-            min_year = int(match.group(1))
-            max_year = int(match.group(2))
+        Args:
+            pending_filter: 已在子进程中启动的过滤任务（见 _submit_wos_year_filter），为 None 时在本进程执行
+        """
+        _log_header("步骤1: 年份范围过滤WOS数据")
 
-            if min_year > max_year:
-                raise ValueError(f"最小年份 ({min_year}) 不能大于最大年份 ({max_year})")
+        try:
+            # 解析年份范围
+            min_year, max_year = parse_year_range(self.year_range)
 
             logger.info(f"年份范围: {min_year}-{max_year}")
 
-            # 创建年份过滤器
-            year_filter = YearFilter(min_year=min_year, max_year=max_year)
-
-            # 生成报告文件名
-            report_file = str(self.wos_year_filtered).replace('.txt', '_year_filter_report.txt')
+            if pending_filter is not None:
+                # 等待子进程中的过滤结果
+                filter_stats = pending_filter.result()
+            else:
+                # 生成报告文件名
+                report_file = str(self.wos_year_filtered).replace('.txt', '_year_filter_report.txt')
 
-            # 执行过滤
-            year_filter.filter_file(str(self.wos_file), str(self.wos_year_filtered), report_file)
+                # 执行过滤
+                filter_stats = filter_wos_file(str(self.wos_file), str(self.wos_year_filtered),
+                                               min_year, max_year, report_file)
 
             # 获取统计信息
             year_stats = {
-                'total_records': year_filter.stats['total_records'],
-                'filtered_records': year_filter.stats['filtered_records'],
-                'kept_records': year_filter.stats['total_records'] - year_filter.stats['filtered_records'],
-                'filter_rate': year_filter.stats['filtered_records'] / year_filter.stats['total_records'] * 100
-                              if year_filter.stats['total_records'] > 0 else 0,
-                'filtered_years': dict(year_filter.stats['filtered_years'])
+                'total_records': filter_stats['total_records'],
+                'filtered_records': filter_stats['filtered_records'],
+                'kept_records': filter_stats['total_records'] - filter_stats['filtered_records'],
+                'filter_rate': filter_stats['filtered_records'] / filter_stats['total_records'] * 100
+                              if filter_stats['total_records'] > 0 else 0,
+                'filtered_years': dict(filter_stats['filtered_years'])
             }
 
             logger.info(f"✓ WOS年份过滤完成: {self.wos_year_filtered}")
@@ -197,52 +280,75 @@ class AIWorkflow:
 
     def step2_filter_scopus_by_year(self) -> bool:
         """步骤2: 年份范围过滤Scopus CSV数据（如果启用）"""
-        logger.info("=" * 80)
-        logger.info("步骤2: 年份范围过滤Scopus数据")
-        logger.info("=" * 80)
+        _log_header("步骤2: 年份范围过滤Scopus数据")
 
         try:
             import csv
-            import re
-            match = re.match(r'^(\d{4})-(\d{4})$', self.year_range)
-            min_year = int(match.group(1))
-            max_year = int(match.group(2))
+            min_year, max_year = parse_year_range(self.year_range)
 
             logger.info(f"年份范围: {min_year}-{max_year}")
 
-            # 读取Scopus CSV
-            filtered_rows = []
-            header = None
+            # 流式读取Scopus CSV，保留的记录按原始文本原样写出：
+            # csv.reader 只用来取年份，不再经 csv.writer 重新加引号/转义
             total_records = 0
-            filtered_records = 0
-            filtered_years = {}
-
-            with open(self.scopus_file, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-                header = reader.fieldnames
-
-                for row in reader:
-                    total_records += 1
-                    year_str = row.get('Year', '')
-
-                    # 检查年份
-                    if year_str and year_str.isdigit():
-                        year = int(year_str)
-                        if min_year <= year <= max_year:
-                            filtered_rows.append(row)
+            filtered_years = Counter()
+            keep_by_year = {}
+            raw_lines = []
+            # 保留的记录同时解析为转换器所需的字典，步骤3直接使用，不再重新读取过滤后的CSV
+            converter_records = []
+            self._scopus_filtered_records = None
+
+            def tap_lines(lines):
+                # 记下 csv.reader 读入的原始行，每产出一条记录后即为该记录的完整文本（含字段内换行）
+                for line in lines:
+                    raw_lines.append(line)
+                    yield line
+
+            # 读写均使用 1 MiB 缓冲，减少大文件的系统调用次数；循环内不做 flush
+            with open(self.scopus_file, 'r', encoding='utf-8-sig', newline='', buffering=1 << 20) as src, \
+                    open(self.scopus_year_filtered, 'w', encoding='utf-8-sig', newline='', buffering=1 << 20) as dst:
+                reader = csv.reader(tap_lines(src))
+                header = next(reader, None)
+
+                if header is not None:
+                    dst.write(''.join(raw_lines))
+                    raw_lines.clear()
+                    width = len(header)
+                    year_index = header.index('Year') if 'Year' in header else None
+                    build_record = scopus_record_builder(header)
+
+                    for row in reader:
+                        record_text = ''.join(raw_lines)
+                        raw_lines.clear()
+
+                        # 与 DictReader 一致：跳过空行；字段多于表头时报错，少于表头的记录原样保留
+                        if not row:
+                            continue
+                        if len(row) > width:
+                            raise ValueError(f"第 {reader.line_num} 行字段数 ({len(row)}) 多于表头 ({width})")
+
+                        total_records += 1
+                        year_str = row[year_index] if year_index is not None and year_index < len(row) else ''
+
+                        # 检查年份（每个不同的年份字符串只判断一次）
+                        keep = keep_by_year.get(year_str)
+                        if keep is None:
+                            # 没有年份信息，保留
+                            keep = keep_by_year[year_str] = (
+                                not (year_str and year_str.isdigit()) or min_year <= int(year_str) <= max_year
+                            )
+
+                        if keep:
+                            # 末条记录可能没有换行符，补上以免与后续内容相连
+                            dst.write(record_text if record_text.endswith(('\n', '\r')) else record_text + '\r\n')
+                            # 全为空字段的行转换器会跳过
+                            if row[0] or any(row):
+                                converter_records.append(build_record(row))
                         else:
-                            filtered_records += 1
-                            filtered_years[year_str] = filtered_years.get(year_str, 0) + 1
-                    else:
-                        # 没有年份信息，保留
-                        filtered_rows.append(row)
-
-            # 写入过滤后的CSV
-            with open(self.scopus_year_filtered, 'w', encoding='utf-8-sig', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=header)
-                writer.writeheader()
-                writer.writerows(filtered_rows)
+                            filtered_years[year_str] += 1
 
+            self._scopus_filtered_records = converter_records
+            filtered_records = sum(filtered_years.values())
             kept_records = total_records - filtered_records
 
             logger.info(f"✓ Scopus年份过滤完成: {self.scopus_year_filtered}")
@@ -257,7 +363,7 @@ class AIWorkflow:
                 'filtered_records': filtered_records,
                 'kept_records': kept_records,
                 'filter_rate': filtered_records / total_records * 100 if total_records > 0 else 0,
-                'filtered_years': filtered_years
+                'filtered_years': dict(filtered_years)
             }
 
             self.stats['steps'].append({
@@ -282,9 +388,7 @@ class AIWorkflow:
 
     def step3_convert_scopus(self) -> bool:
         """步骤3: 转换Scopus到WOS格式（含WOS标准化）"""
-        logger.info("=" * 80)
-        logger.info("步骤3: 转换Scopus到WOS格式（含WOS标准化）")
-        logger.info("=" * 80)
+        _log_header("步骤3: 转换Scopus到WOS格式（含WOS标准化）")
 
         try:
             # 如果启用了年份过滤，使用过滤后的文件；否则使用原始文件
@@ -292,13 +396,18 @@ class AIWorkflow:
 
             reference_wos_file = self.wos_year_filtered if self.year_range else self.wos_file
 
+            # 步骤2已解析出的记录直接交给转换器（仅在年份过滤时有），用完即释放
+            records = self._scopus_filtered_records if self.year_range else None
+            self._scopus_filtered_records = None
+
             converter = EnhancedConverterBatchV2(
                 str(input_file),
                 str(self.scopus_converted),
                 enable_standardization=self.enable_ai,
                 max_workers=20,
                 batch_size=50,
-                reference_wos_file=str(reference_wos_file)
+                reference_wos_file=str(reference_wos_file),
+                records=records
             )
             converter.convert()
 
@@ -329,16 +438,20 @@ class AIWorkflow:
 
     def step4_ai_enrich(self) -> bool:
         """步骤4: AI智能补全机构信息"""
+        # 先删除上次运行留下的文件：它可能是指向转换文件的硬链接，直接覆盖写会改坏转换文件
+        self.scopus_enriched.unlink(missing_ok=True)
+
         if not self.enable_ai:
             logger.info("跳过AI补全步骤（未启用）")
-            # 直接复制文件
-            import shutil
-            shutil.copy(self.scopus_converted, self.scopus_enriched)
+            # 内容与转换文件相同，优先建硬链接，避免整文件复制；不支持时再复制
+            try:
+                os.link(self.scopus_converted, self.scopus_enriched)
+            except OSError:
+                import shutil
+                shutil.copyfile(self.scopus_converted, self.scopus_enriched)
             return True
 
-        logger.info("=" * 80)
-        logger.info("步骤4: AI智能补全机构信息")
-        logger.info("=" * 80)
+        _log_header("步骤4: AI智能补全机构信息")
 
         try:
             # 创建Gemini配置
@@ -360,8 +473,11 @@ class AIWorkflow:
             # 创建补全器
             enricher = InstitutionEnricherV2(config)
 
-            # 补全文件
-            stats = enricher.enrich_file(str(self.scopus_converted), str(self.scopus_enriched))
+            # 补全文件（完成后关闭HTTP会话，释放连接池）
+            try:
+                stats = enricher.enrich_file(str(self.scopus_converted), str(self.scopus_enriched))
+            finally:
+                enricher.close()
 
             logger.info(f"✓ AI补全完成: {self.scopus_enriched}")
             logger.info("")
@@ -391,9 +507,7 @@ class AIWorkflow:
 
     def step5_merge_deduplicate(self) -> bool:
         """步骤5: 合并与去重"""
-        logger.info("=" * 80)
-        logger.info("步骤5: 合并与去重")
-        logger.info("=" * 80)
+        _log_header("步骤5: 合并与去重")
 
         try:
             # 使用AI补全后的文件（如果启用）或原始转换文件
@@ -410,11 +524,11 @@ class AIWorkflow:
 
             tool.run()  # 执行合并去重
 
-            # 获取统计信息
+            # 获取统计信息（重复对已在 run() 中算好，直接读取，不再重复扫描）
             stats = {
                 'wos_count': tool.stats['wos_count'],
                 'scopus_count': tool.stats['scopus_count'],
-                'duplicates': tool.stats['scopus_duplicates'],
+                'duplicates': len(tool.duplicate_pairs),
                 'final_count': tool.stats['final_count']
             }
 
@@ -443,9 +557,7 @@ class AIWorkflow:
 
     def step6_filter_language(self) -> bool:
         """步骤6: 语言筛选"""
-        logger.info("=" * 80)
-        logger.info(f"步骤6: 语言筛选（{self.language}）")
-        logger.info("=" * 80)
+        _log_header(f"步骤6: 语言筛选（{self.language}）")
 
         try:
             filter_tool = LanguageFilter(
@@ -486,9 +598,7 @@ class AIWorkflow:
             logger.info("")
             return True
 
-        logger.info("=" * 80)
-        logger.info("步骤7: 机构名称清洗")
-        logger.info("=" * 80)
+        _log_header("步骤7: 机构名称清洗")
 
         try:
             cleaner = InstitutionCleaner(self.cleaning_config)
@@ -531,28 +641,21 @@ class AIWorkflow:
 
     def step8_analyze(self) -> bool:
         """步骤8: 统计分析（只分析一次，分析最终文件）"""
-        logger.info("=" * 80)
-        logger.info("步骤8: 统计分析")
-        logger.info("=" * 80)
+        _log_header("步骤8: 统计分析")
 
         try:
-            # 确定最终分析文件：优先使用清洗后的文件，否则使用筛选后的文件
-            analysis_file = self.cleaned_file if self.enable_cleaning else self.filtered_file
-
-            analyzer = RecordAnalyzer(str(analysis_file))
+            analyzer = RecordAnalyzer(str(self.analysis_file))
             analyzer.analyze()
 
             # 分析报告文件由 save_detailed_report() 自动生成
-            analysis_report_file = str(analysis_file).replace('.txt', '_analysis_report.txt')
-
-            logger.info(f"✓ 统计分析完成: {analysis_report_file}")
+            logger.info(f"✓ 统计分析完成: {self.analysis_report_file}")
             logger.info("")
 
             self.stats['steps'].append({
                 'step': 8,
                 'name': '统计分析',
                 'status': 'success',
-                'output': analysis_report_file
+                'output': self.analysis_report_file
             })
 
             return True
@@ -569,142 +672,131 @@ class AIWorkflow:
 
     def generate_report(self):
         """生成工作流报告"""
-        logger.info("=" * 80)
-        logger.info("生成工作流报告")
-        logger.info("=" * 80)
+        _log_header("生成工作流报告")
 
         elapsed_time = time.time() - self.stats['start_time']
 
-        report = []
-        report.append("=" * 80)
-        report.append("AI增强工作流完成报告")
-        report.append("=" * 80)
-        report.append("")
-        report.append(f"数据目录: {self.data_dir}")
-        report.append(f"目标语言: {self.language}")
-        report.append(f"AI补全: {'启用' if self.enable_ai else '禁用'}")
-        report.append(f"总耗时: {elapsed_time:.1f}秒")
-        report.append("")
+        # 按段写入缓冲区：固定结构的段落用一个 f-string 模板生成
+        report = io.StringIO()
+        write = report.write
 
-        # 各步骤统计
-        report.append("=" * 80)
-        report.append("处理步骤")
-        report.append("=" * 80)
-        report.append("")
+        write(f"""{_SEPARATOR}
+AI增强工作流完成报告
+{_SEPARATOR}
+
+数据目录: {self.data_dir}
+目标语言: {self.language}
+AI补全: {'启用' if self.enable_ai else '禁用'}
+总耗时: {elapsed_time:.1f}秒
 
+{_SEPARATOR}
+处理步骤
+{_SEPARATOR}
+
+""")
+
+        # 各步骤统计
         for step_info in self.stats['steps']:
-            report.append(f"步骤{step_info['step']}: {step_info['name']}")
-            report.append(f"  状态: {'✓ 成功' if step_info['status'] == 'success' else '✗ 失败'}")
+            write(f"步骤{step_info['step']}: {step_info['name']}\n"
+                  f"  状态: {'✓ 成功' if step_info['status'] == 'success' else '✗ 失败'}\n")
 
             if step_info['status'] == 'success':
-                report.append(f"  输出: {step_info['output']}")
+                write(f"  输出: {step_info['output']}\n")
 
                 # 详细统计
                 if 'enrichment_stats' in step_info:
                     stats = step_info['enrichment_stats']
-                    report.append(f"  补全统计:")
-                    report.append(f"    - 总处理数: {stats['processing']['total_processed']}")
-                    report.append(f"    - 补全成功: {stats['processing']['enriched']}")
-                    report.append(f"    - 补全率: {stats['processing']['enrichment_rate']}")
-                    report.append(f"    - 数据库命中: {stats['session']['db_hits']}")
-                    report.append(f"    - AI调用: {stats['session']['ai_calls']}")
+                    write(f"""  补全统计:
+    - 总处理数: {stats['processing']['total_processed']}
+    - 补全成功: {stats['processing']['enriched']}
+    - 补全率: {stats['processing']['enrichment_rate']}
+    - 数据库命中: {stats['session']['db_hits']}
+    - AI调用: {stats['session']['ai_calls']}
+""")
 
                 if 'merge_stats' in step_info:
                     stats = step_info['merge_stats']
-                    report.append(f"  合并统计:")
-                    report.append(f"    - WOS记录: {stats['wos_count']}")
-                    report.append(f"    - Scopus记录: {stats['scopus_count']}")
-                    report.append(f"    - 重复记录: {stats['duplicates']}")
-                    report.append(f"    - 最终记录: {stats['final_count']}")
+                    write(f"""  合并统计:
+    - WOS记录: {stats['wos_count']}
+    - Scopus记录: {stats['scopus_count']}
+    - 重复记录: {stats['duplicates']}
+    - 最终记录: {stats['final_count']}
+""")
 
                 if 'filter_stats' in step_info:
                     stats = step_info['filter_stats']
-                    report.append(f"  筛选统计:")
-                    report.append(f"    - 输入记录: {stats['total_records']}")
-                    report.append(f"    - 筛选后: {stats['filtered_records']}")
                     filter_rate = (stats['filtered_records'] / stats['total_records'] * 100) if stats['total_records'] else 0.0
-                    report.append(f"    - 筛选率: {filter_rate:.1f}%")
+                    write(f"""  筛选统计:
+    - 输入记录: {stats['total_records']}
+    - 筛选后: {stats['filtered_records']}
+    - 筛选率: {filter_rate:.1f}%
+""")
 
                 if 'cleaning_stats' in step_info:
                     stats = step_info['cleaning_stats']
-                    report.append(f"  清洗统计:")
-                    report.append(f"    - 总机构数（清洗前）: {stats['institutions_before']}")
-                    report.append(f"    - 总机构数（清洗后）: {stats['institutions_after']}")
-                    report.append(f"    - 唯一机构数（清洗前）: {stats['unique_before']}")
-                    report.append(f"    - 唯一机构数（清洗后）: {stats['unique_after']}")
                     reduction_rate = ((1 - stats['unique_after'] / stats['unique_before']) * 100) if stats['unique_before'] else 0.0
-                    report.append(f"    - 减少比例: {reduction_rate:.1f}%")
-                    report.append(f"    - 移除噪音: {stats['removed_noise']}")
-                    report.append(f"    - 合并父子机构: {stats['merged']}")
-                    report.append(f"    - 移除独立部门: {stats['removed_departments']}")
+                    write(f"""  清洗统计:
+    - 总机构数（清洗前）: {stats['institutions_before']}
+    - 总机构数（清洗后）: {stats['institutions_after']}
+    - 唯一机构数（清洗前）: {stats['unique_before']}
+    - 唯一机构数（清洗后）: {stats['unique_after']}
+    - 减少比例: {reduction_rate:.1f}%
+    - 移除噪音: {stats['removed_noise']}
+    - 合并父子机构: {stats['merged']}
+    - 移除独立部门: {stats['removed_departments']}
+""")
 
                 if 'year_stats' in step_info:
                     stats = step_info['year_stats']
-                    report.append(f"  年份过滤统计:")
-                    report.append(f"    - 原始记录: {stats['total_records']}")
-                    report.append(f"    - 保留记录: {stats['kept_records']}")
-                    report.append(f"    - 过滤掉: {stats['filtered_records']}")
-                    report.append(f"    - 过滤率: {stats['filter_rate']:.1f}%")
+                    write(f"""  年份过滤统计:
+    - 原始记录: {stats['total_records']}
+    - 保留记录: {stats['kept_records']}
+    - 过滤掉: {stats['filtered_records']}
+    - 过滤率: {stats['filter_rate']:.1f}%
+""")
                     if stats['filtered_years']:
-                        report.append(f"    - 被过滤的年份:")
-                        for year, count in sorted(stats['filtered_years'].items()):
-                            report.append(f"      {year}: {count} 篇")
+                        write("    - 被过滤的年份:\n")
+                        write(''.join(f"      {year}: {count} 篇\n"
+                                      for year, count in sorted(stats['filtered_years'].items())))
 
             else:
-                report.append(f"  错误: {step_info.get('error', '未知错误')}")
-
-            report.append("")
+                write(f"  错误: {step_info.get('error', '未知错误')}\n")
 
-        # 最终输出文件
-        report.append("=" * 80)
-        report.append("最终输出文件")
-        report.append("=" * 80)
-        report.append("")
-        file_num = 1
+            write("\n")
 
+        # 最终输出文件（编号随启用的步骤变化）
+        output_files = []
         # 如果启用了年份过滤，显示过滤后的原始文件
         if self.year_range:
-            report.append(f"{file_num}. WOS年份过滤后: {self.wos_year_filtered}")
-            file_num += 1
-            report.append(f"{file_num}. Scopus年份过滤后: {self.scopus_year_filtered}")
-            file_num += 1
-
-        report.append(f"{file_num}. 转换后的Scopus数据: {self.scopus_converted}")
-        file_num += 1
+            output_files.append(f"WOS年份过滤后: {self.wos_year_filtered}")
+            output_files.append(f"Scopus年份过滤后: {self.scopus_year_filtered}")
+        output_files.append(f"转换后的Scopus数据: {self.scopus_converted}")
         if self.enable_ai:
-            report.append(f"{file_num}. AI补全后的数据: {self.scopus_enriched}")
-            file_num += 1
-        report.append(f"{file_num}. 合并去重后的数据: {self.merged_file}")
-        file_num += 1
-        report.append(f"{file_num}. {self.language}筛选后的数据: {self.filtered_file}")
-        file_num += 1
+            output_files.append(f"AI补全后的数据: {self.scopus_enriched}")
+        output_files.append(f"合并去重后的数据: {self.merged_file}")
+        output_files.append(f"{self.language}筛选后的数据: {self.filtered_file}")
         if self.enable_cleaning:
-            report.append(f"{file_num}. 机构清洗后的数据: {self.cleaned_file} ⭐ 推荐")
-            file_num += 1
-
-        # 确定最终分析文件
-        final_analysis_file = self.cleaned_file if self.enable_cleaning else self.filtered_file
+            output_files.append(f"机构清洗后的数据: {self.cleaned_file} ⭐ 推荐")
+        output_files.append(f"统计分析报告: {self.analysis_report_file}")
 
-        report.append(f"{file_num}. 统计分析报告: {str(final_analysis_file).replace('.txt', '_analysis_report.txt')}")
-        report.append("")
+        write(f"{_SEPARATOR}\n最终输出文件\n{_SEPARATOR}\n\n")
+        write(''.join(f"{file_num}. {entry}\n" for file_num, entry in enumerate(output_files, 1)))
 
         # 推荐使用
-        report.append("=" * 80)
-        report.append("推荐使用")
-        report.append("=" * 80)
-        report.append("")
-        report.append(f"✓ 用于VOSViewer/CiteSpace分析: {final_analysis_file}")
-        if self.year_range:
-            report.append(f"  （已在源头过滤年份，数据更准确）⭐ 强烈推荐")
-        if self.enable_cleaning:
-            report.append(f"  （已清洗，唯一机构数减少约20%）")
-        report.append(f"✓ 用于论文写作参考: {str(final_analysis_file).replace('.txt', '_analysis_report.txt')}")
-        report.append("")
+        year_note = "  （已在源头过滤年份，数据更准确）⭐ 强烈推荐\n" if self.year_range else ""
+        cleaning_note = "  （已清洗，唯一机构数减少约20%）\n" if self.enable_cleaning else ""
+        write(f"""
+{_SEPARATOR}
+推荐使用
+{_SEPARATOR}
+
+✓ 用于VOSViewer/CiteSpace分析: {self.analysis_file}
+{year_note}{cleaning_note}✓ 用于论文写作参考: {self.analysis_report_file}
+""")
 
         # 写入报告文件
-        report_text = '\n'.join(report)
-        with open(self.report_file, 'w', encoding='utf-8') as f:
-            f.write(report_text)
+        report_text = report.getvalue()
+        Path(self.report_file).write_text(report_text, encoding='utf-8')
 
         logger.info(f"✓ 工作流报告已保存: {self.report_file}")
         logger.info("")
@@ -714,9 +806,7 @@ class AIWorkflow:
 
     def create_project_structure(self) -> bool:
         """创建项目文件夹结构"""
-        logger.info("=" * 80)
-        logger.info("步骤7: 创建项目文件夹结构")
-        logger.info("=" * 80)
+        _log_header("步骤7: 创建项目文件夹结构")
 
         try:
             # 创建主文件夹
@@ -749,9 +839,7 @@ class AIWorkflow:
 
     def step10_generate_document_type_plot(self) -> bool:
         """生成所有图表（文档类型 + 年度发文及引用量）"""
-        logger.info("=" * 80)
-        logger.info("步骤10: 生成所有图表")
-        logger.info("=" * 80)
+        _log_header("步骤10: 生成所有图表")
 
         generate_all_figures = load_generate_all_figures()
         if generate_all_figures is None:
@@ -763,18 +851,17 @@ class AIWorkflow:
             min_year = None
             max_year = None
             if self.year_range:
-                import re
-                match = re.match(r'^(\d{4})-(\d{4})$', self.year_range)
-                if match:
-                    min_year = int(match.group(1))
-                    max_year = int(match.group(2))
+                try:
+                    min_year, max_year = parse_year_range(self.year_range)
+                except ValueError:
+                    pass
 
             # 传递数据目录和年份参数，生成所有图表
             success = generate_all_figures(
                 str(self.data_dir),
                 min_year,
                 max_year,
-                final_file=str(self.cleaned_file if self.enable_cleaning else self.filtered_file),
+                final_file=str(self.analysis_file),
             )
             if success:
                 logger.info("✓ 所有图表生成完成")
@@ -787,9 +874,7 @@ class AIWorkflow:
     def run(self) -> bool:
         """运行完整工作流"""
         logger.info("")
-        logger.info("=" * 80)
-        logger.info("AI增强工作流启动")
-        logger.info("=" * 80)
+        _log_header("AI增强工作流启动")
         logger.info("")
 
         # 计算总步骤数
@@ -803,18 +888,30 @@ class AIWorkflow:
         if not self.check_files():
             return False
 
+        # 步骤1和2互不依赖：输入较大时WOS过滤在子进程中与Scopus过滤并行
+        wos_filter_job = self._submit_wos_year_filter() if self.year_range else None
+
         # 步骤1: 年份范围过滤WOS数据（如果启用）⭐ 最优先
         if self.year_range:
             current_step += 1
             self._update_progress(f"步骤{current_step}/{total_steps}: 年份过滤WOS数据...", current_step / total_steps)
-            if not self.step1_filter_wos_by_year():
+            if wos_filter_job is None and not self.step1_filter_wos_by_year():
                 return False
 
         # 步骤2: 年份范围过滤Scopus数据（如果启用）⭐ 第二优先
         if self.year_range:
             current_step += 1
             self._update_progress(f"步骤{current_step}/{total_steps}: 年份过滤Scopus数据...", current_step / total_steps)
-            if not self.step2_filter_scopus_by_year():
+            scopus_filtered = self.step2_filter_scopus_by_year()
+
+            if wos_filter_job is not None:
+                # 收集子进程中的WOS过滤结果，统计按步骤序号排列
+                wos_filtered = self.step1_filter_wos_by_year(wos_filter_job)
+                self.stats['steps'].sort(key=lambda step: step['step'])
+                if not wos_filtered:
+                    return False
+
+            if not scopus_filtered:
                 return False
 
         # 步骤3: 转换Scopus（使用过滤后的文件）
@@ -854,37 +951,44 @@ class AIWorkflow:
             return False
 
         # 步骤8: 统计分析（只分析一次，分析最终文件）
+        # 分析只读最终文件、写分析报告，与步骤9/10互不依赖：放到后台线程，与图表生成重叠执行；
+        # 步骤9/10的日志先暂存，等分析结束后再补发，日志中仍按步骤8、9、10的顺序出现
         current_step += 1
         self._update_progress(f"步骤{current_step}/{total_steps}: 统计分析...", current_step / total_steps)
-        if not self.step8_analyze():
-            return False
+        with _DeferredThreadLogs(), ThreadPoolExecutor(max_workers=1) as executor:
+            analysis_job = executor.submit(self.step8_analyze)
 
-        # 步骤9: 创建项目文件夹结构
-        current_step += 1
-        self._update_progress(f"步骤{current_step}/{total_steps}: 创建项目结构...", current_step / total_steps)
-        if not self.create_project_structure():
-            return False
+            # 步骤9: 创建项目文件夹结构
+            current_step += 1
+            self._update_progress(f"步骤{current_step}/{total_steps}: 创建项目结构...", current_step / total_steps)
+            if not self.create_project_structure():
+                return False
 
-        # 步骤10: 生成文档类型分析（可选，失败不影响整体流程）
-        current_step += 1
-        if self.enable_plot:
-            self._update_progress(f"步骤{current_step}/{total_steps}: 生成图表...", current_step / total_steps)
-            try:
-                self.step10_generate_document_type_plot()
-            except Exception as e:
-                logger.warning(f"⚠ 文档类型分析跳过: {e}")
-                logger.info("提示: 如需生成图表，请安装 matplotlib: pip3 install matplotlib")
-        else:
-            self._update_progress(f"步骤{current_step}/{total_steps}: 跳过图表生成...", current_step / total_steps)
-            logger.info("跳过图表生成（未启用）")
+            # 步骤10: 生成文档类型分析（可选，失败不影响整体流程）
+            current_step += 1
+            if self.enable_plot:
+                self._update_progress(f"步骤{current_step}/{total_steps}: 生成图表...", current_step / total_steps)
+                try:
+                    self.step10_generate_document_type_plot()
+                except Exception as e:
+                    logger.warning(f"⚠ 文档类型分析跳过: {e}")
+                    logger.info("提示: 如需生成图表，请安装 matplotlib: pip3 install matplotlib")
+            else:
+                self._update_progress(f"步骤{current_step}/{total_steps}: 跳过图表生成...", current_step / total_steps)
+                logger.info("跳过图表生成（未启用）")
+
+            analysis_ok = analysis_job.result()
+
+        # 两个线程各自追加的步骤统计按步骤序号排列
+        self.stats['steps'].sort(key=lambda step: step['step'])
+        if not analysis_ok:
+            return False
 
         # 生成报告
         self.generate_report()
 
         self._update_progress("✓ 处理完成！", 1.0)
-        logger.info("=" * 80)
-        logger.info("✓ 工作流全部完成！")
-        logger.info("=" * 80)
+        _log_header("✓ 工作流全部完成！")
         logger.info("")
 
         return True
@@ -24,6 +24,7 @@ from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from ..gemini_config import GeminiConfig
 from .gemini import GeminiEnricherV2
+from ..utils.wos_records import iter_wos_record_blocks
 
 logging.basicConfig(
     level=logging.INFO,
@@ -66,9 +67,19 @@ class InstitutionEnricherV2:
         Returns:
             (补全后的C1文本, 统计信息)
         """
+        # 第一步：解析所有行，收集需要补全的机构
+        parsed_lines, institutions_to_enrich = self._collect_c1_institutions(scopus_c1_text)
+
+        # 第二步：批量补全所有机构（去重）
+        enrichment_results = self.gemini.enrich_institutions_batch(list(dict.fromkeys(institutions_to_enrich)))
+
+        # 第三步：应用补全结果
+        return self._apply_enrichment(parsed_lines, enrichment_results)
+
+    def _collect_c1_institutions(self, scopus_c1_text: str) -> Tuple[List[Tuple[str, Optional[Dict]]], List[tuple]]:
+        """解析C1字段的每一行，返回 ([(原行, 解析结果)], 需要补全的 (机构, 城市, 国家) 列表)"""
         lines = [line.strip() for line in scopus_c1_text.split('\n') if line.strip()]
 
-        # 第一步：解析所有行，收集需要补全的机构
         parsed_lines = []
         institutions_to_enrich = []
 
@@ -88,11 +99,11 @@ class InstitutionEnricherV2:
                 inst_tuple = (inst_name, parsed['city'], parsed['country'])
                 institutions_to_enrich.append(inst_tuple)
 
-        # 第二步：批量补全所有机构（去重）
-        unique_institutions = list(set(institutions_to_enrich))
-        enrichment_results = self.gemini.enrich_institutions_batch(unique_institutions)
+        return parsed_lines, institutions_to_enrich
 
-        # 第三步：应用补全结果
+    def _apply_enrichment(self, parsed_lines: List[Tuple[str, Optional[Dict]]],
+                          enrichment_results: Dict[tuple, Optional[Dict]]) -> Tuple[str, Dict]:
+        """把补全结果应用到已解析的C1行，返回 (补全后的C1文本, 统计信息)"""
         enriched_lines = []
         line_stats = []
 
@@ -192,7 +203,7 @@ class InstitutionEnricherV2:
         Args:
             input_file: 输入文件路径
             output_file: 输出文件路径
-            save_interval: 每处理多少条记录保存一次数据库
+            save_interval: 每完成多少批AI请求保存一次数据库
 
         Returns:
             统计信息
@@ -207,28 +218,27 @@ class InstitutionEnricherV2:
         records = self._parse_wos_file(content)
         logger.info(f"解析了 {len(records)} 条记录")
 
-        # 补全每条记录的C1字段
-        enriched_records = []
-        for i, record in enumerate(records, 1):
-            logger.info(f"处理记录 {i}/{len(records)}")
-
+        # 先收集整个文件的机构（去重），一次性分批并发补全；逐条记录补全时每次只有一批，无法并发
+        record_lines = {}
+        all_institutions = {}
+        for i, record in enumerate(records):
             if 'C1' in record and 'AU' in record:
-                authors = [a.strip() for a in record['AU'].split('\n') if a.strip()]
-                enriched_c1, line_stats = self.enrich_c1_field(record['C1'], authors)
-                record['C1'] = enriched_c1
+                parsed_lines, institutions = self._collect_c1_institutions(record['C1'])
+                record_lines[i] = parsed_lines
+                all_institutions.update(dict.fromkeys(institutions))
 
-            enriched_records.append(record)
+        logger.info(f"收集完成: {len(record_lines)} 条记录含C1字段, {len(all_institutions)} 个唯一机构")
+        enrichment_results = self.gemini.enrich_institutions_batch(list(all_institutions), save_interval)
 
-            # 定期保存数据库
-            if i % save_interval == 0:
-                self.gemini.db.save_database()
-                logger.info(f"✓ 已保存数据库（进度: {i}/{len(records)}）")
+        # 按记录应用补全结果
+        for i, parsed_lines in record_lines.items():
+            records[i]['C1'], _ = self._apply_enrichment(parsed_lines, enrichment_results)
 
         # 最后保存一次数据库
         self.gemini.db.save_database()
 
         # 写入文件
-        self._write_wos_file(enriched_records, output_file)
+        self._write_wos_file(records, output_file)
 
         logger.info(f"补全完成，已保存到: {output_file}")
 
@@ -237,10 +247,8 @@ class InstitutionEnricherV2:
     def _parse_wos_file(self, content: str) -> List[Dict[str, str]]:
         """解析WOS文件"""
         records = []
-        record_blocks = content.split('\n\nPT ')[1:]
 
-        for block in record_blocks:
-            block = 'PT ' + block
+        for block in iter_wos_record_blocks(content):
             record = self._parse_record(block)
             if record:
                 records.append(record)
@@ -297,6 +305,10 @@ class InstitutionEnricherV2:
 
             f.write('\nEF\n')
 
+    def close(self):
+        """关闭Gemini增强器的HTTP会话，释放连接池"""
+        self.gemini.close()
+
     def get_statistics(self) -> Dict:
         """获取统计信息"""
         gemini_stats = self.gemini.get_statistics()
@@ -381,7 +393,7 @@ def main():
     parser.add_argument('--db-path', default='config/institution_ai_cache.json',
                        help='数据库路径（默认: config/institution_ai_cache.json）')
     parser.add_argument('--save-interval', type=int, default=5,
-                       help='每处理多少条记录保存一次数据库（默认: 5）')
+                       help='每完成多少批AI请求保存一次数据库（默认: 5）')
     parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                        default='INFO', help='日志级别')
 
@@ -426,6 +438,7 @@ def main():
 
     # 补全文件
     stats = enricher.enrich_file(args.input, args.output, args.save_interval)
+    enricher.close()
 
     # 打印统计
     enricher.print_statistics()
@@ -18,13 +18,18 @@ Gemini AI机构信息增强器 v2.0（优化版）
 
 import re
 import json
+import shutil
 import time
 import logging
-import requests
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from ..gemini_config import GeminiConfig
+from ..utils.http import create_session, post_with_retry
+from ..utils.json_io import json_dumps_bytes, json_loads
+from ..utils.keys import make_key_normalizer
 from ..utils.paths import resolve_project_path
+from ..utils.rate_limiter import RateLimiter
 
 logging.basicConfig(
     level=logging.INFO,
@@ -33,6 +38,149 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 每个增强器复用的 HTTP 连接池大小
+_HTTP_POOL_SIZE = 32
+# 批量补全时同时进行的批次数（实际请求速率由令牌桶控制）
+_BATCH_MAX_WORKERS = 20
+
+# 数据库键标准化（小写，去除标点，保留字段分隔符 |）
+_normalize_institution_key = make_key_normalizer(r'[^\w\s|]')
+# 从响应中提取JSON：优先取markdown代码块，其次取最外层花括号
+_JSON_FENCE_RE = re.compile(r'```json\s*(\{.*?\})\s*```', re.DOTALL)
+_JSON_BRACE_RE = re.compile(r'\{.*\}', re.DOTALL)
+# 数据库备份目录中最多保留的备份数
+_BACKUP_KEEP = 5
+
+# 单个机构补全提示词：开头为机构信息，其余（字段说明、格式要求、示例）为固定文本
+_SINGLE_PROMPT_HEAD = """You are an expert in academic institutions and geographic information worldwide.
+
+Task: Complete the missing information for this institution to match Web of Science (WOS) format.
+
+Input:
+- Institution: {institution}
+- City: {city}
+- Country: {country}"""
+_SINGLE_PROMPT_TAIL = """
+
+Please provide the following information in JSON format:
+1. **institution_full_name**: Full standardized name (use WOS-style abbreviations)
+   - Examples: "Univ" not "University", "Inst" not "Institute", "Ctr" not "Center"
+   - Examples: "Med" not "Medical", "Hosp" not "Hospital", "Canc" not "Cancer"
+
+2. **departments**: List of common departments (use WOS-style abbreviations)
+   - For cancer institutes: ["Oncol & Hematol"] or ["Med Oncol"]
+   - For universities: ["Sch Med", "Dept Pathol"]
+   - Keep it concise, 1-3 departments maximum
+
+3. **city**: City name (standardized)
+
+4. **state**: State/Province code or name
+   - For USA: 2-letter state code (FL, CA, NY, NC, etc.)
+   - For China: Province name in English (Hunan, Guangdong, etc.)
+   - For other countries: Province/State name if applicable, otherwise null
+
+5. **zip_code**: ZIP/Postal code (if known)
+   - For USA: 5-digit ZIP code
+   - For China: 6-digit postal code
+   - For other countries: postal code if known
+   - If unknown, use null
+
+6. **country**: Country name (standardized to WOS format)
+   - USA (not United States)
+   - Peoples R China (not China, for mainland China)
+   - England (not UK, for England specifically)
+   - Turkiye (not Turkey)
+
+7. **confidence**: Confidence score (0.0-1.0)
+   - 0.9-1.0: Very confident (well-known institution)
+   - 0.7-0.9: Confident (can infer from context)
+   - 0.5-0.7: Moderate (some uncertainty)
+   - Below 0.5: Low confidence (mostly guessing)
+
+Important guidelines:
+- Use WOS-style abbreviations consistently
+- For US institutions, always try to provide state code and ZIP code
+- For Chinese institutions, provide province and 6-digit postal code
+- If you're not sure about ZIP code, set it to null rather than guessing
+- Be conservative with confidence scores
+
+Output format (JSON only, no explanation):
+{{
+    "institution_full_name": "...",
+    "departments": ["...", "..."],
+    "city": "...",
+    "state": "...",
+    "zip_code": "...",
+    "country": "...",
+    "confidence": 0.95
+}}
+
+Examples:
+
+Example 1 (US Cancer Institute):
+Input: "AdventHealth Cancer Inst", "Orlando", "USA"
+Output:
+{{
+    "institution_full_name": "AdventHlth Canc Inst",
+    "departments": ["Oncol & Hematol"],
+    "city": "Orlando",
+    "state": "FL",
+    "zip_code": "32804",
+    "country": "USA",
+    "confidence": 0.95
+}}
+
+Example 2 (Chinese University):
+Input: "Hunan University of Chinese Medicine", "Changsha", "China"
+Output:
+{{
+    "institution_full_name": "Hunan Univ Chinese Med",
+    "departments": ["Sch Integrated Chinese & Western Med"],
+    "city": "Changsha",
+    "state": "Hunan",
+    "zip_code": "410208",
+    "country": "Peoples R China",
+    "confidence": 0.90
+}}
+
+Example 3 (French University):
+Input: "University of Clermont Auvergne", "Clermont-Ferrand", "France"
+Output:
+{{
+    "institution_full_name": "Univ Clermont Auvergne",
+    "departments": ["Ctr Jean Perrin", "Dept Pathol"],
+    "city": "Clermont Ferrand",
+    "state": null,
+    "zip_code": "63000",
+    "country": "France",
+    "confidence": 0.88
+}}
+
+Now process the input above and return ONLY the JSON output:"""
+
+# 批量补全提示词（{count}/{institutions} 为机构数和机构列表）及机构列表的行格式
+_BATCH_PROMPT = """You are an expert in academic institutions and geographic information worldwide.
+
+Task: Complete the missing information for these {count} institutions to match Web of Science (WOS) format.
+
+Institutions:
+{institutions}
+
+For each institution, provide JSON with:
+- institution_full_name (WOS abbreviations: Univ, Inst, Med, Hosp, Canc, Ctr)
+- departments (1-3 max, WOS abbreviations: Oncol, Dept, Sch)
+- city, state (US: 2-letter code; China: province name), zip_code, country (WOS format)
+- confidence (0.0-1.0)
+
+Output format (JSON array, one object per institution):
+[
+  {{"id": 1, "institution_full_name": "...", "departments": ["..."], "city": "...", "state": "...", "zip_code": "...", "country": "...", "confidence": 0.95}},
+  {{"id": 2, ...}}
+]
+
+Output ONLY the JSON array, no explanation:"""
+_BATCH_PROMPT_LINE = "{}. Institution: {}, City: {}, Country: {}".format
+
 
 class InstitutionDatabase:
     """机构信息数据库（持久化缓存）"""
@@ -51,15 +199,17 @@ class InstitutionDatabase:
             'db_misses': 0,
             'ai_calls': 0
         }
+        # 自上次保存后是否有新增机构；本次会话是否已备份过旧数据库
+        self._dirty = False
+        self._backed_up = False
 
     def _load_database(self) -> Dict:
         """加载数据库"""
         if self.db_path.exists():
             try:
-                with open(self.db_path, 'r', encoding='utf-8') as f:
-                    db = json.load(f)
-                    logger.info(f"✓ 加载了数据库: {len(db.get('institutions', {}))} 个机构")
-                    return db
+                db = json_loads(self.db_path.read_bytes())
+                logger.info(f"✓ 加载了数据库: {len(db.get('institutions', {}))} 个机构")
+                return db
             except Exception as e:
                 logger.warning(f"加载数据库失败: {e}，创建新数据库")
 
@@ -75,27 +225,50 @@ class InstitutionDatabase:
         }
 
     def save_database(self):
-        """保存数据库"""
+        """保存数据库（没有新增机构时跳过，避免缓存命中时反复重写整个文件）"""
+        if not self._dirty and self.db_path.exists():
+            return
+
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
         # 更新元数据
         self.db['metadata']['last_updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
         self.db['metadata']['total_institutions'] = len(self.db['institutions'])
 
-        # 备份旧数据库
-        if self.db_path.exists():
+        # 备份旧数据库（每个会话只在第一次覆盖前备份一次）
+        if not self._backed_up and self.db_path.exists():
             backup_dir = self.db_path.parent / 'ai_cache_backup'
             backup_dir.mkdir(exist_ok=True)
             backup_path = backup_dir / f"cache_{time.strftime('%Y%m%d_%H%M%S')}.json"
-            import shutil
-            shutil.copy(self.db_path, backup_path)
-
-        # 保存新数据库
-        with open(self.db_path, 'w', encoding='utf-8') as f:
-            json.dump(self.db, f, ensure_ascii=False, indent=2)
+            # 数据库总是写临时文件后整体替换、不会原地修改，硬链接即可作为快照（不复制数据）
+            try:
+                os.link(self.db_path, backup_path)
+            except OSError:
+                shutil.copy(self.db_path, backup_path)
+            self._backed_up = True
+            self._prune_backups(backup_dir)
+
+        # 先写临时文件并落盘再替换，中途出错或断电不会留下损坏的数据库
+        tmp_path = self.db_path.with_name(self.db_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(json_dumps_bytes(self.db))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.db_path)
+        self._dirty = False
 
         logger.info(f"✓ 数据库已保存: {self.db_path}")
 
+    @staticmethod
+    def _prune_backups(backup_dir: Path, keep: int = _BACKUP_KEEP):
+        """只保留最新的 keep 个备份（文件名带时间戳，按名称排序即按时间排序）"""
+        backups = sorted(backup_dir.glob('cache_*.json'))
+        for old_backup in backups[:-keep]:
+            try:
+                old_backup.unlink()
+            except OSError as e:
+                logger.warning(f"删除旧备份失败: {old_backup} ({e})")
+
     def get_institution(self, institution: str, city: str, country: str) -> Optional[Dict]:
         """
         从数据库查询机构信息
@@ -108,16 +281,42 @@ class InstitutionDatabase:
         Returns:
             机构信息字典，如果不存在返回None
         """
-        key = self._make_key(institution, city, country)
+        info = self.db['institutions'].get(self._make_key(institution, city, country))
 
-        if key in self.db['institutions']:
+        if info is not None:
             self.stats['db_hits'] += 1
-            logger.info(f"✓ 数据库命中: {institution}")
-            return self.db['institutions'][key]
+            logger.debug(f"✓ 数据库命中: {institution}")
+            return info
 
         self.stats['db_misses'] += 1
         return None
 
+    def lookup_institutions(self, inst_tuples) -> Tuple[Dict[tuple, Dict], Dict[tuple, str]]:
+        """
+        批量查询机构信息（一次遍历，统计计数一次性累加）
+
+        Args:
+            inst_tuples: [(institution, city, country), ...]
+
+        Returns:
+            (命中 {机构: 信息}, 未命中 {机构: 数据库键})
+        """
+        institutions = self.db['institutions']
+        hits = {}
+        misses = {}
+
+        for inst_tuple in inst_tuples:
+            key = self._make_key(*inst_tuple)
+            info = institutions.get(key)
+            if info is not None:
+                hits[inst_tuple] = info
+            else:
+                misses[inst_tuple] = key
+
+        self.stats['db_hits'] += len(hits)
+        self.stats['db_misses'] += len(misses)
+        return hits, misses
+
     def add_institution(self, institution: str, city: str, country: str, info: Dict):
         """
         添加机构信息到数据库
@@ -144,16 +343,14 @@ class InstitutionDatabase:
         self.db['institutions'][key] = info
         self.db['metadata']['total_ai_calls'] += 1
         self.stats['ai_calls'] += 1
+        self._dirty = True
 
-        logger.info(f"✓ 已添加到数据库: {institution}")
+        logger.debug(f"✓ 已添加到数据库: {institution}")
 
-    def _make_key(self, institution: str, city: str, country: str) -> str:
-        """生成数据库键"""
-        # 标准化键（小写，去除标点）
-        key = f"{institution}|{city}|{country}".lower()
-        key = re.sub(r'[^\w\s|]', '', key)
-        key = ' '.join(key.split())
-        return key
+    @staticmethod
+    def _make_key(institution: str, city: str, country: str) -> str:
+        """生成数据库键（小写，去除标点；标准化结果按键文本缓存）"""
+        return _normalize_institution_key(f"{institution}|{city}|{country}")
 
     def get_statistics(self) -> Dict:
         """获取统计信息"""
@@ -173,15 +370,18 @@ class InstitutionDatabase:
 class GeminiEnricherV2:
     """Gemini AI增强器 v2.0（优化版）"""
 
-    def __init__(self, config: GeminiConfig, db_path: str = 'config/institution_ai_cache.json'):
+    def __init__(self, config: GeminiConfig, db_path: str = 'config/institution_ai_cache.json',
+                 max_workers: int = _BATCH_MAX_WORKERS):
         """
         初始化增强器
 
         Args:
             config: Gemini配置
             db_path: 数据库路径
+            max_workers: 批量补全的并发批次数
         """
         self.config = config
+        self.max_workers = max_workers
         self.api_key = config.api_key
         self.api_url = config.api_url
         self.model = config.model
@@ -190,57 +390,86 @@ class GeminiEnricherV2:
         if not config.is_enabled():
             raise ValueError("Gemini API未启用，请检查配置")
 
+        # 所有请求共用一个会话（复用连接池）
+        self._session = create_session(_HTTP_POOL_SIZE, _HTTP_POOL_SIZE)
+        # 所有线程共享的请求限速器（替代每次调用前的固定等待）
+        self._limiter = RateLimiter(config.requests_per_minute)
+
         logger.info(f"✓ Gemini增强器v2.0已初始化")
         logger.info(f"  - 模型: {self.model}")
         logger.info(f"  - Max tokens: {config.max_tokens}")
         logger.info(f"  - 重试次数: {config.max_retries}")
         logger.info(f"  - 数据库: {len(self.db.db['institutions'])} 个机构")
 
-    def enrich_institutions_batch(self, institutions: List[tuple]) -> Dict[tuple, Optional[Dict]]:
+    def enrich_institutions_batch(self, institutions: List[tuple],
+                                  save_interval: Optional[int] = None) -> Dict[tuple, Optional[Dict]]:
         """
         批量补全机构信息（每次请求10个）
 
         Args:
             institutions: [(institution_name, city, country), ...]
+            save_interval: 每完成多少批保存一次数据库（None 表示不在中途保存）
 
         Returns:
             {(institution_name, city, country): result_dict, ...}
         """
-        results = {}
-        to_enrich = []
-
-        # 先检查数据库
-        for inst_tuple in institutions:
-            institution_name, city, country = inst_tuple
-            cached = self.db.get_institution(institution_name, city, country)
-            if cached:
-                results[inst_tuple] = cached
-            else:
-                to_enrich.append(inst_tuple)
+        # 先检查数据库（重复的机构只查一次）
+        results, misses = self.db.lookup_institutions(dict.fromkeys(institutions))
+
+        # 数据库键相同（仅大小写、标点、空白不同）的机构归为一组，每组只请求一次AI
+        # {组内第一个机构: 组内所有机构}
+        to_enrich: Dict[tuple, List[tuple]] = {}
+        key_to_first: Dict[str, tuple] = {}
+        for inst_tuple, key in misses.items():
+            first = key_to_first.setdefault(key, inst_tuple)
+            to_enrich.setdefault(first, []).append(inst_tuple)
+
+        # 命中情况只汇总输出一次（逐条命中日志为debug级别）
+        logger.info(f"数据库命中: {len(results)}/{len(results) + len(misses)} 个机构")
 
         if not to_enrich:
             return results
 
-        # 批量调用AI（每次10个）
+        # 批量调用AI（每次10个），各批次并发请求；结果在当前线程汇总并写入数据库
         batch_size = 10
-        for i in range(0, len(to_enrich), batch_size):
-            batch = to_enrich[i:i + batch_size]
-            logger.info(f"⚡ 批量AI补全: {len(batch)} 个机构 (批次 {i//batch_size + 1}/{(len(to_enrich)-1)//batch_size + 1})")
-
-            batch_results = self._call_ai_batch(batch)
-
-            # 保存到数据库
-            for inst_tuple, result in batch_results.items():
-                institution_name, city, country = inst_tuple
-                if result:
-                    self.db.add_institution(institution_name, city, country, result)
-                    logger.info(f"✓ {institution_name} (置信度: {result.get('confidence', 0):.2f})")
-                results[inst_tuple] = result
+        unique = list(to_enrich)
+        batches = [unique[i:i + batch_size] for i in range(0, len(unique), batch_size)]
+        logger.info(f"⚡ 批量AI补全: {len(unique)} 个机构，共 {len(batches)} 批")
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            future_to_batch = {
+                executor.submit(self._call_ai_batch, batch): batch_no
+                for batch_no, batch in enumerate(batches, 1)
+            }
 
-            # 批次间延迟，避免429错误
-            if i + batch_size < len(to_enrich):
-                logger.info(f"⏸️  批次间延迟2秒...")
-                time.sleep(2.0)
+            done = 0
+            for future in as_completed(future_to_batch):
+                batch_no = future_to_batch[future]
+                batch = batches[batch_no - 1]
+                try:
+                    batch_results = future.result()
+                except Exception as e:
+                    logger.error(f"批次 {batch_no} AI补全失败: {e}")
+                    batch_results = dict.fromkeys(batch)
+
+                logger.info(f"✓ 批次 {batch_no}/{len(batches)} 完成: {len(batch)} 个机构")
+
+                # 保存到数据库
+                for inst_tuple, result in batch_results.items():
+                    institution_name, city, country = inst_tuple
+                    if result:
+                        self.db.add_institution(institution_name, city, country, result)
+                        logger.debug(f"✓ {institution_name} (置信度: {result.get('confidence', 0):.2f})")
+                    for same_inst in to_enrich[inst_tuple]:
+                        results[same_inst] = result
+
+                done += 1
+                if save_interval and done % save_interval == 0:
+                    self.db.save_database()
+                    logger.info(f"✓ 已保存数据库（进度: {done}/{len(batches)} 批）")
+
+        enriched = sum(1 for inst_tuple in unique if results.get(inst_tuple))
+        logger.info(f"✓ 批量AI补全完成: 成功 {enriched}/{len(unique)} 个机构")
 
         return results
 
@@ -332,136 +561,17 @@ class GeminiEnricherV2:
     ) -> str:
         """构建Gemini API的提示词"""
 
-        prompt = f"""You are an expert in academic institutions and geographic information worldwide.
-
-Task: Complete the missing information for this institution to match Web of Science (WOS) format.
-
-Input:
-- Institution: {institution_name}
-- City: {city}
-- Country: {country}"""
+        prompt = _SINGLE_PROMPT_HEAD.format(institution=institution_name, city=city, country=country)
 
         if existing_info:
             prompt += f"\n- Existing departments: {', '.join(existing_info.get('departments', []))}"
 
-        prompt += """
-
-Please provide the following information in JSON format:
-1. **institution_full_name**: Full standardized name (use WOS-style abbreviations)
-   - Examples: "Univ" not "University", "Inst" not "Institute", "Ctr" not "Center"
-   - Examples: "Med" not "Medical", "Hosp" not "Hospital", "Canc" not "Cancer"
-
-2. **departments**: List of common departments (use WOS-style abbreviations)
-   - For cancer institutes: ["Oncol & Hematol"] or ["Med Oncol"]
-   - For universities: ["Sch Med", "Dept Pathol"]
-   - Keep it concise, 1-3 departments maximum
-
-3. **city**: City name (standardized)
-
-4. **state**: State/Province code or name
-   - For USA: 2-letter state code (FL, CA, NY, NC, etc.)
-   - For China: Province name in English (Hunan, Guangdong, etc.)
-   - For other countries: Province/State name if applicable, otherwise null
-
-5. **zip_code**: ZIP/Postal code (if known)
-   - For USA: 5-digit ZIP code
-   - For China: 6-digit postal code
-   - For other countries: postal code if known
-   - If unknown, use null
-
-6. **country**: Country name (standardized to WOS format)
-   - USA (not United States)
-   - Peoples R China (not China, for mainland China)
-   - England (not UK, for England specifically)
-   - Turkiye (not Turkey)
-
-7. **confidence**: Confidence score (0.0-1.0)
-   - 0.9-1.0: Very confident (well-known institution)
-   - 0.7-0.9: Confident (can infer from context)
-   - 0.5-0.7: Moderate (some uncertainty)
-   - Below 0.5: Low confidence (mostly guessing)
-
-Important guidelines:
-- Use WOS-style abbreviations consistently
-- For US institutions, always try to provide state code and ZIP code
-- For Chinese institutions, provide province and 6-digit postal code
-- If you're not sure about ZIP code, set it to null rather than guessing
-- Be conservative with confidence scores
-
-Output format (JSON only, no explanation):
-{{
-    "institution_full_name": "...",
-    "departments": ["...", "..."],
-    "city": "...",
-    "state": "...",
-    "zip_code": "...",
-    "country": "...",
-    "confidence": 0.95
-}}
-
-Examples:
-
-Example 1 (US Cancer Institute):
-Input: "AdventHealth Cancer Inst", "Orlando", "USA"
-Output:
-{{
-    "institution_full_name": "AdventHlth Canc Inst",
-    "departments": ["Oncol & Hematol"],
-    "city": "Orlando",
-    "state": "FL",
-    "zip_code": "32804",
-    "country": "USA",
-    "confidence": 0.95
-}}
-
-Example 2 (Chinese University):
-Input: "Hunan University of Chinese Medicine", "Changsha", "China"
-Output:
-{{
-    "institution_full_name": "Hunan Univ Chinese Med",
-    "departments": ["Sch Integrated Chinese & Western Med"],
-    "city": "Changsha",
-    "state": "Hunan",
-    "zip_code": "410208",
-    "country": "Peoples R China",
-    "confidence": 0.90
-}}
-
-Example 3 (French University):
-Input: "University of Clermont Auvergne", "Clermont-Ferrand", "France"
-Output:
-{{
-    "institution_full_name": "Univ Clermont Auvergne",
-    "departments": ["Ctr Jean Perrin", "Dept Pathol"],
-    "city": "Clermont Ferrand",
-    "state": null,
-    "zip_code": "63000",
-    "country": "France",
-    "confidence": 0.88
-}}
-
-Now process the input above and return ONLY the JSON output:"""
-
-        return prompt
+        return prompt + _SINGLE_PROMPT_TAIL
 
     def _call_gemini_api(self, prompt: str) -> Optional[str]:
-        """
-        调用Gemini API（改进的重试逻辑）
-
-        重试策略：
-        - 前5次：每次间隔5秒（快速重试）
-        - 后7次：每次间隔2分钟（慢速重试，针对429限流）
-        - 总共最多12次重试
-        """
-        # ✅ 速率限制：在API调用前延迟（避免429错误）
-        time.sleep(1.5)
-
+        """调用Gemini API（重试与限速见 utils.http.post_with_retry：Retry-After 或 5秒×5次 + 2分钟×7次）"""
         url = f"{self.api_url}/models/{self.model}:generateContent"
 
-        headers = {
-            'Content-Type': 'application/json',
-        }
-
         data = {
             'contents': [{
                 'parts': [{
@@ -474,97 +584,23 @@ Now process the input above and return ONLY the JSON output:"""
             }
         }
 
-        max_retries = 12  # 总共最多重试12次
-        retry_count = 0
-
-        while retry_count <= max_retries:
-            try:
-                response = requests.post(
-                    url,
-                    headers=headers,
-                    params={'key': self.api_key},
-                    json=data,
-                    timeout=self.config.timeout
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-
-                    # 检查响应结构
-                    if 'candidates' in result and len(result['candidates']) > 0:
-                        candidate = result['candidates'][0]
-                        if 'content' in candidate and 'parts' in candidate['content']:
-                            text = candidate['content']['parts'][0]['text']
-                            return text
-                        else:
-                            logger.error(f"响应格式错误: {result}")
-                            return None
-                    else:
-                        logger.error(f"响应中没有candidates: {result}")
-                        return None
-
-                # API返回错误，需要重试
-                retry_count += 1
-                if retry_count > max_retries:
-                    if response.status_code == 429:
-                        logger.error(f"✗ 429错误重试已达上限（{max_retries}次），放弃")
-                    else:
-                        logger.error(f"✗ API错误重试已达上限（{max_retries}次），放弃")
-                    return None
-
-                # 确定等待时间
-                if retry_count <= 5:
-                    # 前5次：每次间隔5秒
-                    wait_time = 5
-                    logger.warning(f"⚠️ API错误（{response.status_code}），等待{wait_time}秒后重试... (尝试 {retry_count}/{max_retries}，快速重试阶段)")
-                else:
-                    # 后7次：每次间隔2分钟（针对429限流）
-                    wait_time = 120
-                    logger.warning(f"⚠️ API错误（{response.status_code}），等待{wait_time}秒（2分钟）后重试... (尝试 {retry_count}/{max_retries}，慢速重试阶段)")
-
-                if response.status_code != 200:
-                    logger.error(f"Gemini API错误: {response.status_code} - {response.text[:200]}")
-
-                time.sleep(wait_time)
-                logger.info("继续重试...")
-                continue
-
-            except requests.exceptions.Timeout:
-                retry_count += 1
-                if retry_count > max_retries:
-                    logger.error(f"✗ 超时错误重试已达上限（{max_retries}次），放弃")
-                    return None
-
-                # 确定等待时间
-                if retry_count <= 5:
-                    wait_time = 5
-                    logger.warning(f"⚠️ API调用超时（{self.config.timeout}秒），等待{wait_time}秒后重试... (尝试 {retry_count}/{max_retries}，快速重试阶段)")
-                else:
-                    wait_time = 120
-                    logger.warning(f"⚠️ API调用超时（{self.config.timeout}秒），等待{wait_time}秒（2分钟）后重试... (尝试 {retry_count}/{max_retries}，慢速重试阶段)")
-
-                time.sleep(wait_time)
-                continue
-
-            except Exception as e:
-                retry_count += 1
-                if retry_count > max_retries:
-                    logger.error(f"✗ API异常重试已达上限（{max_retries}次），放弃")
-                    return None
-
-                # 确定等待时间
-                if retry_count <= 5:
-                    wait_time = 5
-                    logger.warning(f"⚠️ 调用Gemini API失败: {e}，等待{wait_time}秒后重试... (尝试 {retry_count}/{max_retries}，快速重试阶段)")
-                else:
-                    wait_time = 120
-                    logger.warning(f"⚠️ 调用Gemini API失败: {e}，等待{wait_time}秒（2分钟）后重试... (尝试 {retry_count}/{max_retries}，慢速重试阶段)")
-
-                time.sleep(wait_time)
-                continue
+        result = post_with_retry(self._session, self._limiter, url, data, self.config.timeout,
+                                 params={'key': self.api_key})
+        if result is None:
+            return None
+        return self._extract_response_text(result)
+
+    @staticmethod
+    def _extract_response_text(result: Dict) -> Optional[str]:
+        """从API响应中取出第一个候选的文本"""
+        if 'candidates' in result and len(result['candidates']) > 0:
+            candidate = result['candidates'][0]
+            if 'content' in candidate and 'parts' in candidate['content']:
+                return candidate['content']['parts'][0]['text']
+            logger.error(f"响应格式错误: {result}")
+            return None
 
-        # 不应该到达这里
-        logger.error("✗ API调用失败，已达最大重试次数")
+        logger.error(f"响应中没有candidates: {result}")
         return None
 
     def _parse_response(self, response: str) -> Optional[Dict]:
@@ -572,12 +608,12 @@ Now process the input above and return ONLY the JSON output:"""
 
         try:
             # 提取JSON部分（可能包含在markdown代码块中）
-            json_match = re.search(r'```json\s*(\{.*?\})\s*```', response, re.DOTALL)
+            json_match = _JSON_FENCE_RE.search(response)
             if json_match:
                 json_str = json_match.group(1)
             else:
                 # 尝试直接提取JSON
-                json_match = re.search(r'\{.*\}', response, re.DOTALL)
+                json_match = _JSON_BRACE_RE.search(response)
                 if json_match:
                     json_str = json_match.group(0)
                 else:
@@ -585,7 +621,7 @@ Now process the input above and return ONLY the JSON output:"""
                     return None
 
             # 解析JSON
-            data = json.loads(json_str)
+            data = json_loads(json_str)
 
             # 验证必需字段
             required_fields = ['institution_full_name', 'city', 'country', 'confidence']
@@ -617,36 +653,13 @@ Now process the input above and return ONLY the JSON output:"""
 
     def _call_ai_batch(self, institutions: List[tuple]) -> Dict[tuple, Optional[Dict]]:
         """批量调用AI（一次请求处理10个机构）"""
-        import json
         results = {}
 
-        # 构建批量prompt
-        inst_list = []
-        for i, (inst_name, city, country) in enumerate(institutions, 1):
-            inst_list.append(f"{i}. Institution: {inst_name}, City: {city}, Country: {country}")
-
-        institutions_text = '\n'.join(inst_list)
-
-        prompt = f"""You are an expert in academic institutions and geographic information worldwide.
-
-Task: Complete the missing information for these {len(institutions)} institutions to match Web of Science (WOS) format.
-
-Institutions:
-{institutions_text}
-
-For each institution, provide JSON with:
-- institution_full_name (WOS abbreviations: Univ, Inst, Med, Hosp, Canc, Ctr)
-- departments (1-3 max, WOS abbreviations: Oncol, Dept, Sch)
-- city, state (US: 2-letter code; China: province name), zip_code, country (WOS format)
-- confidence (0.0-1.0)
-
-Output format (JSON array, one object per institution):
-[
-  {{"id": 1, "institution_full_name": "...", "departments": ["..."], "city": "...", "state": "...", "zip_code": "...", "country": "...", "confidence": 0.95}},
-  {{"id": 2, ...}}
-]
-
-Output ONLY the JSON array, no explanation:"""
+        # 构建批量prompt（每行一个机构，序号从1开始）
+        institutions_text = '\n'.join(
+            _BATCH_PROMPT_LINE(i, *inst_tuple) for i, inst_tuple in enumerate(institutions, 1)
+        )
+        prompt = _BATCH_PROMPT.format(count=len(institutions), institutions=institutions_text)
 
         try:
             response = self._call_gemini_api(prompt)
@@ -664,7 +677,7 @@ Output ONLY the JSON array, no explanation:"""
             response = response.strip()
 
             # 解析JSON数组
-            data = json.loads(response)
+            data = json_loads(response)
 
             for item in data:
                 idx = item.get('id', 0) - 1
@@ -682,9 +695,16 @@ Output ONLY the JSON array, no explanation:"""
         except json.JSONDecodeError as e:
             logger.error(f"JSON解析失败: {e}")
             logger.error(f"原始响应: {response[:500] if response else 'None'}")
-            # 失败时返回空结果
-            for inst_tuple in institutions:
-                results[inst_tuple] = None
+            # 失败时（多为输出过长被截断）拆成两半重新请求，只剩一个机构时改用单机构补全，
+            # 不再整批丢弃
+            if len(institutions) > 1:
+                mid = len(institutions) // 2
+                logger.info(f"↻ 拆分批次重试: {len(institutions)} → {mid} + {len(institutions) - mid}")
+                results = self._call_ai_batch(institutions[:mid])
+                results.update(self._call_ai_batch(institutions[mid:]))
+            else:
+                inst_tuple = institutions[0]
+                results[inst_tuple] = self._call_ai_with_retry(*inst_tuple)
         except Exception as e:
             logger.error(f"批量AI调用失败: {e}")
             for inst_tuple in institutions:
@@ -733,6 +753,10 @@ Output ONLY the JSON array, no explanation:"""
 
         return results
 
+    def close(self):
+        """关闭HTTP会话，释放连接池"""
+        self._session.close()
+
     def get_statistics(self) -> Dict:
         """获取统计信息"""
         db_stats = self.db.get_statistics()
@@ -807,6 +831,7 @@ def main():
 
     # 打印统计
     enricher.print_statistics()
+    enricher.close()
 
 
 if __name__ == '__main__':
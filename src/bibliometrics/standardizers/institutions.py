@@ -26,8 +26,12 @@ import json
 import os
 import sys
 import logging
-from typing import Dict, List, Set, Tuple
+import functools
+from typing import Dict, List, Optional, Set, Tuple
+from bisect import bisect_right
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
 
 from ..utils.paths import resolve_project_path
 
@@ -38,12 +42,92 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# 纯数字/符号，以及人名格式 "Lastname, F" / "Lastname FM"（姓 + 逗号或空格 + 1-2个大写字母）
+_DIGITS_SYMBOLS_RE = re.compile(r'^[\d\s\.\-,;]+$')
+_PERSON_NAME_RE = re.compile(r'^[A-Z][a-z]+[,\s]\s*[A-Z]{1,2}$')
+# 部门名中出现这些词时视为隶属于主机构，不作为独立部门移除
+_PARENT_KEYWORDS = ('univ', 'hosp', 'inst', 'acad', 'coll')
+# WOS文件头行
+_HEADER_PREFIXES = ('FN ', 'VR ')
+# 写入WOS文件时的标准字段顺序（字段名 -> 序号）
+_WOS_FIELD_RANK = {field_name: rank for rank, field_name in enumerate((
+    'PT', 'AU', 'AF', 'TI', 'SO', 'LA', 'DT', 'DE', 'ID',
+    'AB', 'C1', 'C3', 'RP', 'EM', 'RI', 'OI', 'FU', 'FX',
+    'CR', 'NR', 'TC', 'Z9', 'U1', 'U2', 'PU', 'PI', 'PA',
+    'SN', 'EI', 'BN', 'J9', 'JI', 'PD', 'PY', 'VL', 'IS',
+    'SI', 'PN', 'SU', 'BP', 'EP', 'AR', 'DI', 'D2', 'PG',
+    'WC', 'SC', 'GA', 'UT', 'PM', 'OA', 'HC', 'HP', 'DA',
+))}
+# 多行字段的续行分隔（换行 + 三个空格缩进）
+_CONTINUATION_SEPARATOR = '\n   '
+# 并行清洗时每个任务包含的C3字段数
+_PARALLEL_CHUNK_RECORDS = 500
+# 不含正则元字符的模式主体（允许 \. 这类转义的标点）
+_LITERAL_PATTERN_BODY_RE = re.compile(r'(?:[^\\.^$*+?{}\[\]|()]|\\[^A-Za-z0-9])*')
+_PATTERN_ESCAPE_RE = re.compile(r'\\(.)')
+
+
+def _split_literal_patterns(patterns: List[str]) -> Tuple[frozenset, Tuple[str, ...], List[str]]:
+    """
+    把规则中的纯文本模式拆出来：^xxx$ 按整串相等判断，^xxx 按前缀判断，
+    其余仍作为正则；返回 (整串集合, 前缀元组, 剩余正则)
+    """
+    literals = set()
+    prefixes = []
+    remaining = []
+    for pattern in patterns:
+        anchored_end = pattern.endswith('$') and not pattern.endswith('\\$')
+        body = pattern[1:-1] if anchored_end else pattern[1:]
+        if pattern.startswith('^') and _LITERAL_PATTERN_BODY_RE.fullmatch(body):
+            literal = _PATTERN_ESCAPE_RE.sub(r'\1', body)
+            if anchored_end:
+                literals.add(literal)
+            else:
+                prefixes.append(literal)
+        else:
+            remaining.append(pattern)
+    return frozenset(literals), tuple(prefixes), remaining
+
+
+def _compile_union(patterns: List[str]):
+    """把规则中的多个正则合并为一个交替模式，一次 match 即可判断是否命中任一模式"""
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+
+
+@functools.lru_cache(maxsize=8)
+def _read_rules_file(config_file: str, mtime_ns: int, size: int) -> Dict:
+    """解析规则JSON；按 (路径, 修改时间, 大小) 缓存，连续运行工作流时不再重复解析"""
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 class InstitutionCleaner:
     """机构名称清洗器"""
 
     def __init__(self, config_file: str = "config/institution_cleaning_rules_ultimate.json"):
         self.config_file = str(resolve_project_path(config_file))
         self.rules = self._load_rules()
+        # 噪音/部门模式大多是纯文本，用集合与前缀元组判断，只把真正的正则合并编译
+        self._noise_literals, self._noise_prefixes, noise_patterns = _split_literal_patterns(
+            self.rules.get('noise_patterns', []))
+        self._noise_re = _compile_union(noise_patterns)
+        self._department_literals, self._department_prefixes, department_patterns = _split_literal_patterns(
+            self.rules.get('department_patterns', []))
+        self._department_re = _compile_union(department_patterns)
+        # 标准化规则与合并规则合成一张表，一次查找；同名时以标准化规则为准（与原先的查找顺序一致）
+        merge_rules = self.rules.get('merge_rules', {})
+        standardization_rules = self.rules.get('standardization_rules', {})
+        self._name_map: Dict[str, str] = {**merge_rules, **standardization_rules}
+        overlap = len(merge_rules) + len(standardization_rules) - len(self._name_map)
+        if overlap:
+            logger.debug(f"  - 标准化规则与合并规则重叠 {overlap} 条，以标准化规则为准")
+        self._parent_child: Dict[str, str] = self.rules.get('parent_child_mapping', {})
+        # 公司后缀去掉 '$' 与首尾空格后按配置顺序保存
+        self._suffixes: Tuple[str, ...] = tuple(
+            suffix.replace('$', '').strip() for suffix in self.rules.get('company_suffixes_to_remove', [])
+        )
 
         # 统计信息
         self.stats = {
@@ -66,18 +150,22 @@ class InstitutionCleaner:
             'departments_removed': Counter()
         }
 
+        # 机构名 -> (清洗结果, 需累加的统计项, 需记录的清洗详情)；同一名称只完整处理一次
+        self._clean_cache: Dict[str, Tuple[Optional[str], Tuple[str, ...], Tuple[Tuple[str, str], ...]]] = {}
+
     def _load_rules(self) -> Dict:
         """加载清洗规则"""
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    rules = json.load(f)
-                    logger.info(f"✓ 加载清洗规则: {self.config_file}")
-                    logger.info(f"  - 噪音模式: {len(rules.get('noise_patterns', []))}")
-                    logger.info(f"  - 标准化规则: {len(rules.get('standardization_rules', {}))}")
-                    logger.info(f"  - 父子机构映射: {len(rules.get('parent_child_mapping', {}))}")
-                    logger.info(f"  - 合并规则: {len(rules.get('merge_rules', {}))}")
-                    return rules
+                # 规则只读，多个清洗器可共享缓存中的同一份解析结果
+                stat_result = os.stat(self.config_file)
+                rules = _read_rules_file(self.config_file, stat_result.st_mtime_ns, stat_result.st_size)
+                logger.info(f"✓ 加载清洗规则: {self.config_file}")
+                logger.info(f"  - 噪音模式: {len(rules.get('noise_patterns', []))}")
+                logger.info(f"  - 标准化规则: {len(rules.get('standardization_rules', {}))}")
+                logger.info(f"  - 父子机构映射: {len(rules.get('parent_child_mapping', {}))}")
+                logger.info(f"  - 合并规则: {len(rules.get('merge_rules', {}))}")
+                return rules
             except Exception as e:
                 logger.warning(f"加载规则失败: {e}，使用默认规则")
 
@@ -90,95 +178,97 @@ class InstitutionCleaner:
             'merge_rules': {}
         }
 
-    def is_noise(self, institution: str) -> bool:
-        """判断是否为噪音数据"""
-        inst_lower = institution.lower().strip()
+    def is_noise(self, institution: str, inst_lower: Optional[str] = None) -> bool:
+        """判断是否为噪音数据（inst_lower 为已算好的小写去空格名称，可省略）"""
+        if inst_lower is None:
+            inst_lower = institution.lower().strip()
 
         # 检查噪音模式
-        for pattern in self.rules.get('noise_patterns', []):
-            if re.match(pattern, inst_lower):
-                return True
+        if (inst_lower in self._noise_literals or inst_lower.startswith(self._noise_prefixes)
+                or (self._noise_re is not None and self._noise_re.match(inst_lower))):
+            return True
 
         # 太短的机构名（少于3个字符）
         if len(inst_lower) < 3:
             return True
 
         # 纯数字或纯符号
-        if re.match(r'^[\d\s\.\-,;]+$', inst_lower):
+        if _DIGITS_SYMBOLS_RE.match(inst_lower):
             return True
 
         # ⚠️ 关键修复：过滤人名格式
-        # 人名格式: "Lastname, F" 或 "Lastname, FM" (姓 + 逗号 + 1-2个大写字母)
-        if re.match(r'^[A-Z][a-z]+,\s*[A-Z]{1,2}$', institution.strip()):
-            return True
-
-        # 人名格式: "Lastname F" 或 "Lastname FM" (姓 + 空格 + 1-2个大写字母)
-        if re.match(r'^[A-Z][a-z]+\s+[A-Z]{1,2}$', institution.strip()):
+        # 人名格式: "Lastname, F" / "Lastname, FM" 或 "Lastname F" / "Lastname FM"
+        if _PERSON_NAME_RE.match(institution.strip()):
             return True
 
         return False
 
-    def is_department(self, institution: str) -> bool:
-        """判断是否为独立的部门/二级机构"""
-        inst_lower = institution.lower().strip()
+    def is_department(self, institution: str, inst_lower: Optional[str] = None) -> bool:
+        """判断是否为独立的部门/二级机构（inst_lower 同 is_noise）"""
+        if inst_lower is None:
+            inst_lower = institution.lower().strip()
 
-        # 检查部门模式
-        for pattern in self.rules.get('department_patterns', []):
-            if re.match(pattern, inst_lower):
-                # 如果没有包含大学/医院等主机构名称，则认为是独立部门
-                if not any(keyword in inst_lower for keyword in ['univ', 'hosp', 'inst', 'acad', 'coll']):
-                    return True
+        # 检查部门模式；如果没有包含大学/医院等主机构名称，则认为是独立部门
+        if (inst_lower in self._department_literals or inst_lower.startswith(self._department_prefixes)
+                or (self._department_re is not None and self._department_re.match(inst_lower))):
+            return not any(keyword in inst_lower for keyword in _PARENT_KEYWORDS)
 
         return False
 
     def standardize_name(self, institution: str) -> str:
         """标准化机构名称"""
-        inst_lower = institution.lower().strip()
-
-        # 应用标准化规则
-        standardization_rules = self.rules.get('standardization_rules', {})
-        if inst_lower in standardization_rules:
-            standardized = standardization_rules[inst_lower]
-            if standardized != inst_lower:
-                self.cleaning_log['standardized'][f"{institution} → {standardized}"] += 1
-            return standardized
-
-        # 应用合并规则
-        merge_rules = self.rules.get('merge_rules', {})
-        if inst_lower in merge_rules:
-            merged = merge_rules[inst_lower]
-            if merged != inst_lower:
-                self.cleaning_log['standardized'][f"{institution} → {merged}"] += 1
-            return merged
-
-        return institution
+        standardized, log_item = self._standardize_name(institution)
+        if log_item:
+            self.cleaning_log['standardized'][log_item] += 1
+        return standardized
+
+    def _standardize_name(self, institution: str, inst_lower: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """标准化机构名称，返回 (结果, 清洗详情条目或None)，不修改统计"""
+        if inst_lower is None:
+            inst_lower = institution.lower().strip()
+
+        # 应用标准化规则与合并规则
+        standardized = self._name_map.get(inst_lower)
+        if standardized is None:
+            return institution, None
+        if standardized != inst_lower:
+            return standardized, f"{institution} → {standardized}"
+        return standardized, None
 
     def merge_parent_child(self, institution: str) -> str:
         """合并父机构与子机构"""
-        inst_lower = institution.lower().strip()
+        parent, log_item = self._merge_parent_child(institution)
+        if log_item:
+            self.cleaning_log['merged'][log_item] += 1
+        return parent
+
+    def _merge_parent_child(self, institution: str, inst_lower: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """合并父机构与子机构，返回 (结果或None表示删除, 清洗详情条目或None)，不修改统计"""
+        if inst_lower is None:
+            inst_lower = institution.lower().strip()
 
         # 应用父子机构映射
-        parent_child_mapping = self.rules.get('parent_child_mapping', {})
-        if inst_lower in parent_child_mapping:
-            parent = parent_child_mapping[inst_lower]
+        parent = self._parent_child.get(inst_lower)
+        if parent is not None:
             if parent == "REMOVE":
-                return None  # 标记为删除
+                return None, None  # 标记为删除
             if parent != inst_lower:
-                self.cleaning_log['merged'][f"{institution} → {parent}"] += 1
-            return parent
+                return parent, f"{institution} → {parent}"
+            return parent, None
 
-        return institution
+        return institution, None
 
-    def remove_company_suffix(self, institution: str) -> str:
+    def remove_company_suffix(self, institution: str, inst_lower: Optional[str] = None) -> str:
         """移除公司后缀（AG, Inc, LLC等）"""
-        inst_lower = institution.lower()
+        if inst_lower is None:
+            inst_lower = institution.lower()
 
-        # 获取公司后缀列表
-        suffixes = self.rules.get('company_suffixes_to_remove', [])
+        # 绝大多数名称没有公司后缀：一次 endswith(元组) 在C层判断全部后缀，未命中直接返回
+        if not inst_lower.endswith(self._suffixes):
+            return institution
 
-        for suffix in suffixes:
-            # 使用正则表达式匹配后缀
-            pattern = suffix.replace('$', '').strip()
+        # 命中时按配置顺序找第一个匹配的后缀（不是最长后缀）
+        for pattern in self._suffixes:
             if inst_lower.endswith(pattern):
                 # 移除后缀，保留核心名称
                 inst = institution[:-(len(pattern))]
@@ -187,66 +277,67 @@ class InstitutionCleaner:
         return institution
 
     def clean_institution(self, institution: str) -> str:
-        """清洗单个机构名称"""
+        """清洗单个机构名称（结果按原始名称缓存，重复出现时只累加统计）"""
+        cached = self._clean_cache.get(institution)
+        if cached is None:
+            cached = self._clean_cache[institution] = self._clean_institution_uncached(institution)
+
+        result, stat_keys, log_items = cached
+        for stat_key in stat_keys:
+            self.stats[stat_key] += 1
+        for log_name, log_item in log_items:
+            self.cleaning_log[log_name][log_item] += 1
+        return result
+
+    def _clean_institution_uncached(self, institution: str):
+        """清洗单个机构名称，返回 (结果, 统计项, 清洗详情)，不修改统计"""
         if not institution or not institution.strip():
-            return None
+            return None, (), ()
 
-        # 1. 去除首尾空格
+        # 1. 去除首尾空格；小写形式只在名称变化时重新计算，各步骤共用
         inst = institution.strip()
+        inst_lower = inst.lower()
 
         # 2. 检查是否为噪音
-        if self.is_noise(inst):
-            self.stats['removed_noise'] += 1
-            self.cleaning_log['noise_removed'][inst] += 1
-            return None
+        if self.is_noise(inst, inst_lower):
+            return None, ('removed_noise',), (('noise_removed', inst),)
 
         # 3. 检查是否为独立部门
-        if self.is_department(inst):
-            self.stats['removed_departments'] += 1
-            self.cleaning_log['departments_removed'][inst] += 1
-            return None
+        if self.is_department(inst, inst_lower):
+            return None, ('removed_departments',), (('departments_removed', inst),)
+
+        stat_keys = []
+        log_items = []
 
         # 4. 移除公司后缀
-        inst = self.remove_company_suffix(inst)
+        stripped = self.remove_company_suffix(inst, inst_lower)
+        if stripped is not inst:
+            inst, inst_lower = stripped, stripped.lower().strip()
 
         # 5. 标准化名称
-        inst = self.standardize_name(inst)
-        if inst:
-            self.stats['standardized'] += 1
+        standardized, log_item = self._standardize_name(inst, inst_lower)
+        if log_item:
+            log_items.append(('standardized', log_item))
+        if standardized:
+            stat_keys.append('standardized')
+        if standardized is not inst:
+            inst, inst_lower = standardized, standardized.lower().strip()
 
         # 6. 合并父子机构
-        inst = self.merge_parent_child(inst)
+        inst, log_item = self._merge_parent_child(inst, inst_lower)
+        if log_item:
+            log_items.append(('merged', log_item))
         if inst is None:
-            self.stats['merged_parent_child'] += 1
-            return None
-
-        return inst
-
-    def find_parent_institution(self, institution: str, all_institutions: List[str]) -> str:
-        """在同一记录的机构列表中查找父机构"""
-        inst_lower = institution.lower()
-
-        # 检查是否有其他机构包含当前机构（可能是父机构）
-        for other_inst in all_institutions:
-            other_lower = other_inst.lower()
-            if other_lower == inst_lower:
-                continue
-
-            # 如果当前机构名包含在另一个机构中，且另一个机构更短
-            # 说明另一个机构可能是父机构
-            # 例如：Harvard University 包含在 Harvard Medical School 中
-            # 但 Harvard University 更短，所以是父机构
-            if inst_lower in other_lower and len(inst_lower) < len(other_lower):
-                # 检查是否是真正的父子关系（不是偶然包含）
-                # 例如：Harvard University 和 Harvard Medical School 是父子
-                # 但 University 和 Harvard University 不是
-                if len(other_lower) - len(inst_lower) > 5:  # 至少相差5个字符
-                    return institution  # 当前机构是父机构，保留
+            stat_keys.append('merged_parent_child')
 
-        return institution
+        return inst, tuple(stat_keys), tuple(log_items)
 
     def smart_merge_institutions(self, institutions: List[str]) -> List[str]:
         """智能合并机构列表中的父子关系"""
+        return [inst for inst, _ in self._smart_merge_pairs(institutions)]
+
+    def _smart_merge_pairs(self, institutions: List[str]) -> List[Tuple[str, str]]:
+        """同 smart_merge_institutions，但返回 (机构名, 小写名)，供去重直接复用小写结果"""
         if not institutions:
             return []
 
@@ -261,57 +352,69 @@ class InstitutionCleaner:
             return []
 
         # 2. 查找父子关系并合并
-        # 构建机构的小写版本映射
-        inst_map = {inst.lower(): inst for inst in cleaned}
+        # 如果other包含inst，且other更长（至少多5个字符），说明inst可能是父机构，保留inst，移除other
+        # 例如：inst="Harvard University", other="Harvard Medical School"
+        # 所有机构名（小写）拼成一个字符串，用 str.find 一次扫描出包含inst的其它机构，
+        # 不再两两比较；命中按原列表顺序出现，合并日志的记录顺序不变
+        lowered = [inst.lower() for inst in cleaned]
+        joined = '\x00'.join(lowered)
+        starts = list(accumulate((len(inst_lower) + 1 for inst_lower in lowered[:-1]), initial=0))
         to_remove = set()
 
-        for inst in cleaned:
-            inst_lower = inst.lower()
-
-            # 检查是否有父机构存在
-            for other_inst in cleaned:
-                other_lower = other_inst.lower()
-
-                if inst_lower == other_lower:
+        for inst, inst_lower in zip(cleaned, lowered):
+            pos = joined.find(inst_lower)
+            while pos != -1:
+                j = bisect_right(starts, pos) - 1
+                other_lower = lowered[j]
+                end = starts[j] + len(other_lower)
+                if pos + len(inst_lower) > end:
+                    # 跨越分隔符的匹配不算，继续向后找
+                    pos = joined.find(inst_lower, pos + 1)
                     continue
 
-                # 如果other包含inst，且other更长，说明inst可能是父机构
-                # 例如：inst="Harvard University", other="Harvard Medical School"
-                if inst_lower in other_lower and len(other_lower) > len(inst_lower) + 5:
-                    # inst是父机构，保留inst，移除other
+                if other_lower != inst_lower and len(other_lower) > len(inst_lower) + 5:
                     to_remove.add(other_lower)
-                    self.cleaning_log['merged'][f"{other_inst} → {inst}"] += 1
+                    self.cleaning_log['merged'][f"{cleaned[j]} → {inst}"] += 1
+
+                # 每个其它机构只判断一次，直接跳到下一个机构
+                pos = joined.find(inst_lower, end + 1)
 
         # 3. 移除子机构，保留父机构
-        result = []
-        for inst in cleaned:
-            if inst.lower() not in to_remove:
-                result.append(inst)
+        return [(inst, inst_lower) for inst, inst_lower in zip(cleaned, lowered) if inst_lower not in to_remove]
 
-        return result
+    def clean_c3_field(self, c3_field: str, unique_before: Optional[Set[str]] = None,
+                       unique_after: Optional[Set[str]] = None) -> str:
+        """
+        清洗C3字段（机构列表）- 重点是合并和去重
 
-    def clean_c3_field(self, c3_field: str) -> str:
-        """清洗C3字段（机构列表）- 重点是合并和去重"""
+        Args:
+            unique_before: 传入时把清洗前的机构名（小写）加入该集合
+            unique_after: 传入时把清洗后的机构名（小写）加入该集合
+        """
         if not c3_field:
             return ""
 
         # 分割机构
         institutions = [inst.strip() for inst in c3_field.split(';') if inst.strip()]
         self.stats['total_institutions_before'] += len(institutions)
+        if unique_before is not None:
+            unique_before.update(inst.lower() for inst in institutions)
 
         # 智能合并（包含父子关系处理）
-        merged_institutions = self.smart_merge_institutions(institutions)
+        merged_institutions = self._smart_merge_pairs(institutions)
 
-        # 去重（保持顺序，不区分大小写）
-        seen = set()
-        unique_institutions = []
-        for inst in merged_institutions:
-            inst_lower = inst.lower()
-            if inst_lower not in seen:
-                seen.add(inst_lower)
-                unique_institutions.append(inst)
+        # 去重（保持顺序，不区分大小写，同名保留第一次出现的写法）
+        unique = {}
+        for inst, inst_lower in merged_institutions:
+            unique.setdefault(inst_lower, inst)
+        unique_institutions = list(unique.values())
 
         self.stats['total_institutions_after'] += len(unique_institutions)
+        if unique_after is not None:
+            # 与按 ';' 切分输出字段再 strip 的结果一致，直接复用去重时的小写名
+            unique_after.update(
+                part for part in (piece.strip() for inst_lower in unique for piece in inst_lower.split(';')) if part
+            )
 
         # 重新组合
         return '; '.join(unique_institutions) if unique_institutions else ""
@@ -333,18 +436,25 @@ class InstitutionCleaner:
         current_value = []
         record_raw_lines = []
 
+        # 每行只 strip 一次，字段行判断与续行追加都用局部绑定，语义与逐行解析一致
+        append_record = records.append
+        # 相同的字段值（PT/LA/DT、重复的机构列表等）共享同一个字符串对象，减少整文件记录的内存占用
+        intern_value = {}.setdefault
         for line in content.split('\n'):
             # 跳过文件头
-            if line.startswith('FN ') or line.startswith('VR '):
+            if line.startswith(_HEADER_PREFIXES):
                 continue
 
+            stripped = line.strip()
+
             # 记录结束
-            if line.strip() == 'ER':
+            if stripped == 'ER':
                 if current_field:
-                    current_record[current_field] = '\n'.join(current_value)
+                    value = '\n'.join(current_value)
+                    current_record[current_field] = intern_value(value, value)
 
                 if current_record:
-                    records.append({
+                    append_record({
                         'fields': current_record,
                         'raw_lines': record_raw_lines
                     })
@@ -356,83 +466,92 @@ class InstitutionCleaner:
                 continue
 
             # 文件结束
-            if line.strip() == 'EF':
+            if stripped == 'EF':
                 break
 
             # 空行
-            if not line.strip():
+            if not stripped:
                 if current_field:
                     record_raw_lines.append(line)
                 continue
 
             # 新字段（以两个字母开头 + 空格）
-            if len(line) >= 3 and line[2] == ' ' and line[:2].isupper():
+            if line[2:3] == ' ' and line[:2].isupper():
                 # 保存上一个字段
                 if current_field:
-                    current_record[current_field] = '\n'.join(current_value)
+                    value = '\n'.join(current_value)
+                    current_record[current_field] = intern_value(value, value)
 
                 # 开始新字段
                 current_field = line[:2]
                 current_value = [line[3:]]
                 record_raw_lines.append(line)
 
-            # 续行（以3个空格开头）
-            elif line.startswith('   ') and current_field:
-                current_value.append(line[3:])
+            # 续行（以3个空格开头）或其他情况，都追加到当前字段
+            elif current_field:
+                current_value.append(line[3:] if line.startswith('   ') else line)
                 record_raw_lines.append(line)
 
-            else:
-                # 其他情况，添加到当前字段
-                if current_field:
-                    current_value.append(line)
-                    record_raw_lines.append(line)
-
         self.stats['total_records'] = len(records)
         logger.info(f"解析完成，共 {len(records)} 条记录")
 
         return records
 
-    def clean_records(self, records: List[Dict]) -> List[Dict]:
-        """清洗所有记录"""
+    def clean_records(self, records: List[Dict], workers: int = 1) -> List[Dict]:
+        """
+        清洗所有记录
+
+        Args:
+            workers: 并行清洗的进程数（默认1，即串行；0 表示使用全部CPU核心）
+        """
         logger.info("开始清洗机构名称...")
 
-        cleaned_records = []
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+
         unique_institutions_before = set()
         unique_institutions_after = set()
 
-        for i, record in enumerate(records, 1):
-            if i % 100 == 0:
-                logger.info(f"进度: {i}/{len(records)}")
-
-            fields = record['fields']
-
-            # 清洗C3字段
-            if 'C3' in fields:
-                original_c3 = fields['C3']
+        c3_fields = [record['fields'] for record in records if 'C3' in record['fields']]
+        if workers > 1 and len(c3_fields) > _PARALLEL_CHUNK_RECORDS:
+            # 各进程清洗一段记录并返回本段的统计与清洗详情，按段顺序合并，
+            # Counter 的插入顺序与串行一致，报告中的排序不变
+            chunks = [
+                [fields['C3'] for fields in c3_fields[start:start + _PARALLEL_CHUNK_RECORDS]]
+                for start in range(0, len(c3_fields), _PARALLEL_CHUNK_RECORDS)
+            ]
+            done = 0
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_clean_worker, initargs=(self,)) as executor:
+                for cleaned_chunk, stats, cleaning_log, before, after in executor.map(_clean_c3_chunk_in_worker, chunks):
+                    for fields, cleaned_c3 in zip(c3_fields[done:done + len(cleaned_chunk)], cleaned_chunk):
+                        fields['C3'] = cleaned_c3
+                    done += len(cleaned_chunk)
+                    logger.info(f"进度: {done}/{len(c3_fields)}")
+
+                    for key, value in stats.items():
+                        self.stats[key] += value
+                    for log_name, counter in cleaning_log.items():
+                        self.cleaning_log[log_name].update(counter)
+                    unique_institutions_before |= before
+                    unique_institutions_after |= after
+        else:
+            for i, record in enumerate(records, 1):
+                if i % 100 == 0:
+                    logger.info(f"进度: {i}/{len(records)}")
 
-                # 统计清洗前的唯一机构
-                for inst in original_c3.split(';'):
-                    inst = inst.strip().lower()
-                    if inst:
-                        unique_institutions_before.add(inst)
-
-                # 清洗
-                cleaned_c3 = self.clean_c3_field(original_c3)
-                fields['C3'] = cleaned_c3
-
-                # 统计清洗后的唯一机构
-                for inst in cleaned_c3.split(';'):
-                    inst = inst.strip().lower()
-                    if inst:
-                        unique_institutions_after.add(inst)
+                fields = record['fields']
 
-            cleaned_records.append(record)
+                # 清洗C3字段，同时统计清洗前后的唯一机构
+                if 'C3' in fields:
+                    fields['C3'] = self.clean_c3_field(
+                        fields['C3'], unique_institutions_before, unique_institutions_after
+                    )
 
         self.stats['unique_before'] = len(unique_institutions_before)
         self.stats['unique_after'] = len(unique_institutions_after)
 
         logger.info("清洗完成！")
-        return cleaned_records
+        return list(records)
 
     def write_wos_file(self, records: List[Dict], output_file: str):
         """写入WOS文件"""
@@ -443,37 +562,21 @@ class InstitutionCleaner:
             f.write(self.file_header)
             f.write('\n')
 
-            # 写入每条记录
+            # 写入每条记录：每条记录拼成一个字符串后只写一次；
+            # 已知字段按WOS标准顺序在前，其他字段按原顺序在后（sorted 稳定）
+            field_rank = _WOS_FIELD_RANK.get
+            unknown_rank = len(_WOS_FIELD_RANK)
+            rank_key = lambda field_name: field_rank(field_name, unknown_rank)
             for record in records:
                 fields = record['fields']
-
-                # 按照WOS标准顺序写入字段
-                field_order = ['PT', 'AU', 'AF', 'TI', 'SO', 'LA', 'DT', 'DE', 'ID',
-                              'AB', 'C1', 'C3', 'RP', 'EM', 'RI', 'OI', 'FU', 'FX',
-                              'CR', 'NR', 'TC', 'Z9', 'U1', 'U2', 'PU', 'PI', 'PA',
-                              'SN', 'EI', 'BN', 'J9', 'JI', 'PD', 'PY', 'VL', 'IS',
-                              'SI', 'PN', 'SU', 'BP', 'EP', 'AR', 'DI', 'D2', 'PG',
-                              'WC', 'SC', 'GA', 'UT', 'PM', 'OA', 'HC', 'HP', 'DA']
-
-                # 写入已知顺序的字段
-                for field_name in field_order:
-                    if field_name in fields:
-                        value = fields[field_name]
-                        lines = value.split('\n')
-                        f.write(f"{field_name} {lines[0]}\n")
-                        for line in lines[1:]:
-                            f.write(f"   {line}\n")
-
-                # 写入其他字段
-                for field_name, value in fields.items():
-                    if field_name not in field_order:
-                        lines = value.split('\n')
-                        f.write(f"{field_name} {lines[0]}\n")
-                        for line in lines[1:]:
-                            f.write(f"   {line}\n")
+                parts = []
+                for field_name in sorted(fields, key=rank_key):
+                    value = fields[field_name].replace('\n', _CONTINUATION_SEPARATOR)
+                    parts.append(f"{field_name} {value}\n")
 
                 # 记录结束标记
-                f.write("ER\n\n")
+                parts.append("ER\n\n")
+                f.write(''.join(parts))
 
             # 文件结束标记
             f.write("EF\n")
@@ -567,8 +670,8 @@ class InstitutionCleaner:
         logger.info(f"移除独立部门:            {self.stats['removed_departments']}")
         logger.info("=" * 80)
 
-    def run(self, input_file: str, output_file: str):
-        """运行清洗流程"""
+    def run(self, input_file: str, output_file: str, workers: int = 1):
+        """运行清洗流程（workers 为并行清洗的进程数，默认串行）"""
         self.input_file = input_file
 
         logger.info("")
@@ -581,7 +684,7 @@ class InstitutionCleaner:
         records = self.parse_wos_file(input_file)
 
         # 2. 清洗记录
-        cleaned_records = self.clean_records(records)
+        cleaned_records = self.clean_records(records, workers=workers)
 
         # 3. 写入文件
         self.write_wos_file(cleaned_records, output_file)
@@ -601,6 +704,26 @@ class InstitutionCleaner:
         logger.info("")
 
 
+_worker_cleaner: Optional[InstitutionCleaner] = None
+
+
+def _init_clean_worker(cleaner: InstitutionCleaner):
+    global _worker_cleaner
+    _worker_cleaner = cleaner
+
+
+def _clean_c3_chunk_in_worker(c3_values: List[str]):
+    """清洗一段C3字段，返回 (清洗结果, 本段统计, 本段清洗详情, 清洗前唯一机构, 清洗后唯一机构)"""
+    cleaner = _worker_cleaner
+    # 统计只反映本段，由主进程累加；名称缓存保留，跨段复用
+    cleaner.stats = dict.fromkeys(cleaner.stats, 0)
+    cleaner.cleaning_log = {log_name: Counter() for log_name in cleaner.cleaning_log}
+    unique_before: Set[str] = set()
+    unique_after: Set[str] = set()
+    cleaned = [cleaner.clean_c3_field(c3, unique_before, unique_after) for c3 in c3_values]
+    return cleaned, cleaner.stats, cleaner.cleaning_log, unique_before, unique_after
+
+
 def main():
     """命令行工具"""
     import argparse
@@ -636,6 +759,8 @@ def main():
     parser.add_argument('output_file', help='输出WOS文件路径')
     parser.add_argument('--config', default='config/institution_cleaning_rules_ultimate.json',
                        help='清洗规则配置文件（默认: config/institution_cleaning_rules_ultimate.json）')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='并行清洗的进程数（默认: 1，即串行；0 表示使用全部CPU核心）')
     parser.add_argument('--log-level', default='INFO',
                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                        help='日志级别（默认: INFO）')
@@ -652,7 +777,7 @@ def main():
 
     # 运行清洗
     cleaner = InstitutionCleaner(args.config)
-    cleaner.run(args.input_file, args.output_file)
+    cleaner.run(args.input_file, args.output_file, workers=args.workers)
 
 
 if __name__ == '__main__':
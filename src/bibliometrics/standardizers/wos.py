@@ -17,15 +17,17 @@ WOS格式标准化器（批量并发版）
 """
 
 import re
-import json
 import time
 import logging
-import requests
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from ..gemini_config import GeminiConfig
+from ..utils.http import create_session, post_with_retry
+from ..utils.json_io import json_dumps_bytes, json_loads
+from ..utils.keys import make_key_normalizer
 from ..utils.paths import resolve_project_path
+from ..utils.rate_limiter import RateLimiter
 
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +36,92 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 每个名称的输出token上限（单个名称的标准结果只有几个token，批量请求按条数放大）
+_OUTPUT_TOKENS_PER_ITEM = 40
+# 批量请求返回的带序号的行（"12. Penault-Llorca, FM"、"3) \"J CLIN ONCOL\""），一次匹配取出序号和去引号的结果
+_NUMBERED_LINE_RE = re.compile(r'^\s*(\d+)\s*[.)]\s*["\']?(.*?)["\']?\s*$')
+
+# WOS 国家名词表（C1 地址末尾使用的写法），命中的名称直接采用，不再调用AI
+_WOS_COUNTRIES = (
+    'Afghanistan', 'Albania', 'Algeria', 'Andorra', 'Angola', 'Antigua & Barbu', 'Argentina',
+    'Armenia', 'Australia', 'Austria', 'Azerbaijan', 'Bahamas', 'Bahrain', 'Bangladesh',
+    'Barbados', 'Belarus', 'Belgium', 'Belize', 'Benin', 'Bermuda', 'Bhutan', 'Bolivia',
+    'Bosnia & Herceg', 'Botswana', 'Brazil', 'Brunei', 'Bulgaria', 'Burkina Faso', 'Burundi',
+    'Cambodia', 'Cameroon', 'Canada', 'Cape Verde', 'Cent Afr Republ', 'Chad', 'Chile',
+    'Colombia', 'Comoros', 'Costa Rica', 'Cote Ivoire', 'Croatia', 'Cuba', 'Cyprus',
+    'Czech Republic', 'Dem Rep Congo', 'Denmark', 'Djibouti', 'Dominica', 'Dominican Rep',
+    'Ecuador', 'Egypt', 'El Salvador', 'England', 'Equat Guinea', 'Eritrea', 'Estonia',
+    'Eswatini', 'Ethiopia', 'Fiji', 'Finland', 'France', 'Gabon', 'Gambia', 'Georgia',
+    'Germany', 'Ghana', 'Greece', 'Greenland', 'Grenada', 'Guatemala', 'Guinea',
+    'Guinea Bissau', 'Guyana', 'Haiti', 'Honduras', 'Hong Kong', 'Hungary', 'Iceland',
+    'India', 'Indonesia', 'Iran', 'Iraq', 'Ireland', 'Israel', 'Italy', 'Jamaica', 'Japan',
+    'Jordan', 'Kazakhstan', 'Kenya', 'Kosovo', 'Kuwait', 'Kyrgyzstan', 'Laos', 'Latvia',
+    'Lebanon', 'Lesotho', 'Liberia', 'Libya', 'Liechtenstein', 'Lithuania', 'Luxembourg',
+    'Madagascar', 'Malawi', 'Malaysia', 'Maldives', 'Mali', 'Malta', 'Mauritania',
+    'Mauritius', 'Mexico', 'Moldova', 'Monaco', 'Mongolia', 'Montenegro', 'Morocco',
+    'Mozambique', 'Myanmar', 'Namibia', 'Nepal', 'Netherlands', 'New Zealand', 'Nicaragua',
+    'Niger', 'Nigeria', 'North Ireland', 'North Korea', 'North Macedonia', 'Norway', 'Oman',
+    'Pakistan', 'Palestine', 'Panama', 'Papua N Guinea', 'Paraguay', 'Peoples R China',
+    'Peru', 'Philippines', 'Poland', 'Portugal', 'Puerto Rico', 'Qatar', 'Rep Congo',
+    'Romania', 'Russia', 'Rwanda', 'Samoa', 'San Marino', 'Sao Tome & Prin', 'Saudi Arabia',
+    'Scotland', 'Senegal', 'Serbia', 'Seychelles', 'Sierra Leone', 'Singapore', 'Slovakia',
+    'Slovenia', 'Somalia', 'South Africa', 'South Korea', 'South Sudan', 'Spain',
+    'Sri Lanka', 'St Kitts & Nevi', 'St Lucia', 'St Vincent', 'Sudan', 'Suriname', 'Sweden',
+    'Switzerland', 'Syria', 'Taiwan', 'Tajikistan', 'Tanzania', 'Thailand', 'Togo', 'Tonga',
+    'Trinidad Tobago', 'Tunisia', 'Turkiye', 'Turkmenistan', 'U Arab Emirates', 'Uganda',
+    'Ukraine', 'Uruguay', 'USA', 'Uzbekistan', 'Vanuatu', 'Venezuela', 'Vietnam', 'Wales',
+    'Yemen', 'Zambia', 'Zimbabwe',
+)
+# 常见的非WOS写法 → WOS国家名（United Kingdom 与转换器一致默认为 England）
+_WOS_COUNTRY_VARIANTS = {
+    'United States': 'USA',
+    'United States of America': 'USA',
+    'U.S.A.': 'USA',
+    'China': 'Peoples R China',
+    'PR China': 'Peoples R China',
+    'P. R. China': 'Peoples R China',
+    "People's Republic of China": 'Peoples R China',
+    'United Kingdom': 'England',
+    'Northern Ireland': 'North Ireland',
+    'Korea': 'South Korea',
+    'Republic of Korea': 'South Korea',
+    "Democratic People's Republic of Korea": 'North Korea',
+    'Turkey': 'Turkiye',
+    'Russian Federation': 'Russia',
+    'Viet Nam': 'Vietnam',
+    'Czechia': 'Czech Republic',
+    'Islamic Republic of Iran': 'Iran',
+    'United Arab Emirates': 'U Arab Emirates',
+    'Bosnia and Herzegovina': 'Bosnia & Herceg',
+    'Trinidad and Tobago': 'Trinidad Tobago',
+    'Papua New Guinea': 'Papua N Guinea',
+    "Cote d'Ivoire": 'Cote Ivoire',
+    'Ivory Coast': 'Cote Ivoire',
+    'Democratic Republic of the Congo': 'Dem Rep Congo',
+    'Congo': 'Rep Congo',
+    'Republic of the Congo': 'Rep Congo',
+    'Central African Republic': 'Cent Afr Republ',
+    'Dominican Republic': 'Dominican Rep',
+    'Equatorial Guinea': 'Equat Guinea',
+    'Guinea-Bissau': 'Guinea Bissau',
+    'Macedonia': 'North Macedonia',
+    'Brunei Darussalam': 'Brunei',
+    'Lao PDR': 'Laos',
+    'Syrian Arab Republic': 'Syria',
+    'Republic of Moldova': 'Moldova',
+    'United Republic of Tanzania': 'Tanzania',
+    'Swaziland': 'Eswatini',
+    'Cabo Verde': 'Cape Verde',
+    'Burma': 'Myanmar',
+    'State of Palestine': 'Palestine',
+    'The Netherlands': 'Netherlands',
+    'Antigua and Barbuda': 'Antigua & Barbu',
+    'Sao Tome and Principe': 'Sao Tome & Prin',
+    'Saint Kitts and Nevis': 'St Kitts & Nevi',
+    'Saint Lucia': 'St Lucia',
+    'Saint Vincent and the Grenadines': 'St Vincent',
+}
+
 
 class WOSStandardDatabase:
     """WOS标准格式数据库"""
@@ -45,10 +133,10 @@ class WOSStandardDatabase:
     def _load_database(self) -> Dict:
         if self.db_path.exists():
             try:
-                with open(self.db_path, 'r', encoding='utf-8') as f:
-                    db = json.load(f)
-                    logger.info(f"✓ 加载WOS标准数据库: {len(db.get('authors', {}))} 作者, {len(db.get('countries', {}))} 国家, {len(db.get('journals', {}))} 期刊")
-                    return db
+                # 优先用 orjson 解析（可选依赖，未安装时使用标准库 json）
+                db = json_loads(self.db_path.read_bytes())
+                logger.info(f"✓ 加载WOS标准数据库: {len(db.get('authors', {}))} 作者, {len(db.get('countries', {}))} 国家, {len(db.get('journals', {}))} 期刊")
+                return db
             except Exception as e:
                 logger.warning(f"加载数据库失败: {e}")
 
@@ -68,8 +156,8 @@ class WOSStandardDatabase:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.db['metadata']['last_updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
 
-        with open(self.db_path, 'w', encoding='utf-8') as f:
-            json.dump(self.db, f, ensure_ascii=False, indent=2)
+        # 格式同 json.dump(..., ensure_ascii=False, indent=2)，安装了 orjson 时由其序列化
+        self.db_path.write_bytes(json_dumps_bytes(self.db))
 
         logger.info(f"✓ WOS标准数据库已保存")
 
@@ -118,12 +206,27 @@ class WOSStandardDatabase:
         for original, wos_abbrev in mappings.items():
             self.add_journal(original, wos_abbrev)
 
-    def _normalize_key(self, text: str) -> str:
-        """标准化键（小写，去除标点）"""
-        key = text.lower().strip()
-        key = re.sub(r'[^\w\s-]', '', key)
-        key = ' '.join(key.split())
-        return key
+    # 标准化键（小写，去除标点，保留连字符；结果按参数缓存）
+    _normalize_key = staticmethod(make_key_normalizer(r'[^\w\s-]'))
+
+
+# 本地国家名表：键与数据库键的标准化方式一致（小写、去标点）
+_WOS_COUNTRY_TABLE = {
+    WOSStandardDatabase._normalize_key(name): wos_name
+    for name, wos_name in [*((country, country) for country in _WOS_COUNTRIES), *_WOS_COUNTRY_VARIANTS.items()]
+}
+
+
+def _parse_numbered_response(response: str, items: List[str]) -> Dict[str, str]:
+    """按行首序号把批量请求的返回行对应回输入名称（忽略无序号、越界或空结果的行）"""
+    results = {}
+    for line in response.splitlines():
+        match = _NUMBERED_LINE_RE.match(line)
+        if match and match.group(2):
+            index = int(match.group(1)) - 1
+            if 0 <= index < len(items):
+                results[items[index]] = match.group(2)
+    return results
 
 
 class WOSStandardizerBatch:
@@ -135,7 +238,8 @@ class WOSStandardizerBatch:
         self.db = WOSStandardDatabase(db_path)
         self.max_workers = max_workers  # 并发线程数（降低到5，避免429错误）
         self.batch_size = batch_size    # 每批处理数量（降低到20）
-        self.request_delay = 1.5  # 每次请求间隔（秒）
+        # 所有线程共享的请求限速器（替代每次调用前的固定等待和批次间的固定延迟）
+        self._limiter = RateLimiter(config.requests_per_minute)
         self.stats = {
             'author_hits': 0,
             'author_misses': 0,
@@ -146,178 +250,124 @@ class WOSStandardizerBatch:
             'api_calls': 0
         }
 
+        # 所有线程共用一个会话（复用连接池）
+        self._session = create_session(max_workers, max_workers * 2)
+
     def standardize_authors_batch(self, author_names: List[str]) -> Dict[str, str]:
         """批量标准化作者名"""
-        # 去重
-        unique_authors = list(set(author_names))
-
-        # 检查数据库，分离已缓存和未缓存的
-        cached = {}
-        to_process = []
-
-        for author in unique_authors:
-            cached_result = self.db.get_author(author)
-            if cached_result:
-                cached[author] = cached_result
-                self.stats['author_hits'] += 1
-            else:
-                to_process.append(author)
-                self.stats['author_misses'] += 1
-
-        logger.info(f"作者标准化: 缓存命中 {len(cached)}, 需要AI处理 {len(to_process)}")
-
-        # 批量调用AI处理未缓存的
-        if to_process:
-            ai_results = self._batch_ai_standardize_authors(to_process)
-            # 保存到数据库
-            self.db.add_authors_batch(ai_results)
-            cached.update(ai_results)
-
-        return cached
+        return self._standardize_batch(author_names, 'author', '作者', self.db.get_author,
+                                       self.db.add_authors_batch, self._batch_ai_standardize_authors)
 
     def standardize_countries_batch(self, country_names: List[str]) -> Dict[str, str]:
-        """批量标准化国家名"""
-        # 去重
-        unique_countries = list(set(country_names))
+        """批量标准化国家名（先查本地国家名表，WOS国家名是封闭集合）"""
+        return self._standardize_batch(country_names, 'country', '国家', self.db.get_country,
+                                       self.db.add_countries_batch, self._batch_ai_standardize_countries,
+                                       lookup_local=self._lookup_country_table)
 
-        # 检查数据库
-        cached = {}
-        to_process = []
-
-        for country in unique_countries:
-            cached_result = self.db.get_country(country)
-            if cached_result:
-                cached[country] = cached_result
-                self.stats['country_hits'] += 1
-            else:
-                to_process.append(country)
-                self.stats['country_misses'] += 1
-
-        logger.info(f"国家标准化: 缓存命中 {len(cached)}, 需要AI处理 {len(to_process)}")
-
-        # 批量调用AI
+    def standardize_journals_batch(self, journal_names: List[str]) -> Dict[str, str]:
+        """批量标准化期刊名"""
+        return self._standardize_batch(journal_names, 'journal', '期刊', self.db.get_journal,
+                                       self.db.add_journals_batch, self._batch_ai_standardize_journals)
+
+    def _standardize_batch(self, names: List[str], stat_prefix: str, label: str,
+                           get_cached: Callable[[str], Optional[str]],
+                           add_batch: Callable[[Dict[str, str]], None],
+                           ai_standardize: Callable[[List[str]], Dict[str, str]],
+                           lookup_local: Optional[Callable[[str], Optional[str]]] = None) -> Dict[str, str]:
+        """三类名称共用的批量流程：去重 → 本地表（可选）→ 数据库缓存 → AI处理未命中的并写回数据库"""
+        local = {}
+        if lookup_local is not None:
+            local, names = self._split_cached(names, lookup_local)
+        # 去重（保持首次出现顺序）并检查数据库，分离已缓存和未缓存的
+        cached, to_process = self._split_cached(names, get_cached)
+        self.stats[f'{stat_prefix}_hits'] += len(local) + len(cached)
+        self.stats[f'{stat_prefix}_misses'] += len(to_process)
+
+        local_summary = f"本地表命中 {len(local)}, " if lookup_local is not None else ''
+        logger.info(f"{label}标准化: {local_summary}缓存命中 {len(cached)}, 需要AI处理 {len(to_process)}")
+        cached.update(local)
+
+        # 批量调用AI处理未缓存的，并保存到数据库
         if to_process:
-            ai_results = self._batch_ai_standardize_countries(to_process)
-            self.db.add_countries_batch(ai_results)
+            ai_results = ai_standardize(to_process)
+            add_batch(ai_results)
             cached.update(ai_results)
 
         return cached
 
-    def standardize_journals_batch(self, journal_names: List[str]) -> Dict[str, str]:
-        """批量标准化期刊名"""
-        # 去重
-        unique_journals = list(set(journal_names))
-
-        # 检查数据库
+    @staticmethod
+    def _split_cached(names: List[str], get_cached: Callable[[str], Optional[str]]):
+        """一次遍历去重后的名称，返回 (已缓存 {名称: 标准结果}, 需要AI处理的名称列表)"""
         cached = {}
         to_process = []
-
-        for journal in unique_journals:
-            cached_result = self.db.get_journal(journal)
+        for name in dict.fromkeys(names):
+            cached_result = get_cached(name)
             if cached_result:
-                cached[journal] = cached_result
-                self.stats['journal_hits'] += 1
+                cached[name] = cached_result
             else:
-                to_process.append(journal)
-                self.stats['journal_misses'] += 1
+                to_process.append(name)
+        return cached, to_process
 
-        logger.info(f"期刊标准化: 缓存命中 {len(cached)}, 需要AI处理 {len(to_process)}")
-
-        # 批量调用AI
-        if to_process:
-            ai_results = self._batch_ai_standardize_journals(to_process)
-            self.db.add_journals_batch(ai_results)
-            cached.update(ai_results)
-
-        return cached
+    @staticmethod
+    def _lookup_country_table(country_name: str) -> Optional[str]:
+        """在本地WOS国家名表中查找国家名"""
+        return _WOS_COUNTRY_TABLE.get(WOSStandardDatabase._normalize_key(country_name))
 
     def _batch_ai_standardize_authors(self, authors: List[str]) -> Dict[str, str]:
-        """批量AI标准化作者名（并发）"""
-        results = {}
-
-        # 分批处理
-        for i in range(0, len(authors), self.batch_size):
-            batch = authors[i:i + self.batch_size]
-            logger.info(f"处理作者批次 {i//self.batch_size + 1}/{(len(authors)-1)//self.batch_size + 1} ({len(batch)} 个)")
-
-            # 并发调用AI
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                future_to_author = {
-                    executor.submit(self._ai_standardize_author_single, author): author
-                    for author in batch
-                }
-
-                for future in as_completed(future_to_author):
-                    author = future_to_author[future]
-                    try:
-                        wos_name = future.result()
-                        if wos_name:
-                            results[author] = wos_name
-                        else:
-                            results[author] = author  # 失败时保持原样
-                    except Exception as e:
-                        logger.error(f"处理作者 {author} 失败: {e}")
-                        results[author] = author
-
-        return results
+        """批量AI标准化作者名（每次请求 batch_size 个）"""
+        return self._run_batch_requests(authors, self.batch_size, self._ai_standardize_authors_batch_request, '作者')
 
     def _batch_ai_standardize_countries(self, countries: List[str]) -> Dict[str, str]:
         """批量AI标准化国家名（每次请求20个）"""
-        results = {}
-        batch_request_size = 20  # 每次API请求处理20个
-
-        for i in range(0, len(countries), batch_request_size):
-            batch = countries[i:i + batch_request_size]
-            logger.info(f"处理国家批次 {i//batch_request_size + 1}/{(len(countries)-1)//batch_request_size + 1} ({len(batch)} 个)")
-
-            # 一次API请求处理20个国家
-            batch_results = self._ai_standardize_countries_batch_request(batch)
-
-            # 合并结果，失败的保持原样
-            for country in batch:
-                if country in batch_results and batch_results[country]:
-                    results[country] = batch_results[country]
-                else:
-                    results[country] = country
-
-            # 批次间延迟，避免429错误
-            if i + batch_request_size < len(countries):
-                time.sleep(2.0)
-
-        return results
+        return self._run_batch_requests(countries, 20, self._ai_standardize_countries_batch_request, '国家')
 
     def _batch_ai_standardize_journals(self, journals: List[str]) -> Dict[str, str]:
         """批量AI标准化期刊名（每次请求20个）"""
-        results = {}
-        batch_request_size = 20  # 每次API请求处理20个
-
-        for i in range(0, len(journals), batch_request_size):
-            batch = journals[i:i + batch_request_size]
-            logger.info(f"处理期刊批次 {i//batch_request_size + 1}/{(len(journals)-1)//batch_request_size + 1} ({len(batch)} 个)")
+        return self._run_batch_requests(journals, 20, self._ai_standardize_journals_batch_request, '期刊')
 
-            # 一次API请求处理20个期刊
-            batch_results = self._ai_standardize_journals_batch_request(batch)
+    def _run_batch_requests(self, items: List[str], batch_request_size: int,
+                            batch_request: Callable[[List[str]], Dict[str, str]], label: str) -> Dict[str, str]:
+        """
+        分批并发请求AI（最多 max_workers 个批次同时进行，请求速率由限速器控制）
 
-            # 合并结果，失败的保持原样
-            for journal in batch:
-                if journal in batch_results and batch_results[journal]:
-                    results[journal] = batch_results[journal]
-                else:
-                    results[journal] = journal
+        数据库键相同的名称（如 "Wang, Z." 与 "Wang, Z"）只请求第一个，结果共用；
+        结果按批次顺序合并，失败的保持原样
+        """
+        aliases: Dict[str, List[str]] = {}
+        for item in items:
+            aliases.setdefault(WOSStandardDatabase._normalize_key(item), []).append(item)
+        if len(aliases) < len(items):
+            logger.info(f"{label}: {len(items) - len(aliases)} 个名称与其他名称数据库键相同，合并请求")
+        aliases = {group[0]: group for group in aliases.values()}
+        representatives = list(aliases)
+
+        batches = [representatives[i:i + batch_request_size] for i in range(0, len(representatives), batch_request_size)]
+        for index, batch in enumerate(batches, 1):
+            logger.info(f"处理{label}批次 {index}/{len(batches)} ({len(batch)} 个)")
 
-            # 批次间延迟，避免429错误
-            if i + batch_request_size < len(journals):
-                time.sleep(2.0)
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch, batch_results in zip(batches, executor.map(batch_request, batches)):
+                for representative in batch:
+                    value = batch_results.get(representative)
+                    for item in aliases[representative]:
+                        results[item] = value or item
 
         return results
 
-    def _ai_standardize_author_single(self, author_name: str) -> Optional[str]:
-        """AI标准化单个作者名"""
+    def _ai_standardize_authors_batch_request(self, authors: List[str]) -> Dict[str, str]:
+        """批量AI标准化作者名（一次请求处理多个）"""
+        if not authors:
+            return {}
+
+        authors_list = '\n'.join([f"{i+1}. {a}" for i, a in enumerate(authors)])
+
         prompt = f"""You are an expert in Web of Science (WOS) author name formatting.
 
-Task: Standardize this author name to WOS format.
+Task: Standardize these author names to WOS format.
 
-Input: {author_name}
+Input authors:
+{authors_list}
 
 WOS Author Name Rules:
 1. Remove ALL accent marks and diacritics
@@ -333,17 +383,22 @@ Examples:
 - "Özgüroĝlu, Mustafa" → "Ozguroglu, M"
 - "Abu Akar, Firas" → "Abu Akar, F"
 
-Output ONLY the standardized name, no explanation:"""
+Output format (one per line, number and result only):
+1. WOS_NAME_1
+2. WOS_NAME_2
+...
+
+Output ONLY the numbered list, no explanation:"""
 
         try:
-            response = self._call_gemini_api(prompt)
+            response = self._call_gemini_api(prompt, max_output_tokens=_OUTPUT_TOKENS_PER_ITEM * len(authors))
             if response:
-                wos_name = response.strip().strip('"\'')
-                return wos_name
+                # 按行首序号对应输入（作者名本身可能带句点，不能按行号硬对齐）
+                return _parse_numbered_response(response, authors)
         except Exception as e:
-            logger.error(f"AI标准化作者失败 {author_name}: {e}")
+            logger.error(f"批量AI标准化作者失败: {e}")
 
-        return None
+        return {}
 
     def _ai_standardize_countries_batch_request(self, countries: List[str]) -> Dict[str, str]:
         """批量AI标准化国家名（一次请求处理多个）"""
@@ -383,16 +438,9 @@ Output format (one per line, number and result only):
 Output ONLY the numbered list, no explanation:"""
 
         try:
-            response = self._call_gemini_api(prompt)
+            response = self._call_gemini_api(prompt, max_output_tokens=_OUTPUT_TOKENS_PER_ITEM * len(countries))
             if response:
-                results = {}
-                lines = response.strip().split('\n')
-                for i, line in enumerate(lines):
-                    if i < len(countries):
-                        # 提取结果（去除序号）
-                        wos_name = line.split('.', 1)[-1].strip().strip('"\'')
-                        results[countries[i]] = wos_name
-                return results
+                return _parse_numbered_response(response, countries)
         except Exception as e:
             logger.error(f"批量AI标准化国家失败: {e}")
 
@@ -432,7 +480,7 @@ Examples:
 Output ONLY the WOS abbreviation in UPPERCASE, no explanation:"""
 
         try:
-            response = self._call_gemini_api(prompt)
+            response = self._call_gemini_api(prompt, max_output_tokens=_OUTPUT_TOKENS_PER_ITEM)
             if response:
                 wos_abbrev = response.strip().strip('"\'').upper()
                 return wos_abbrev
@@ -467,130 +515,45 @@ Output format (one per line, number and abbreviation only):
 Output ONLY the numbered list in UPPERCASE, no explanation:"""
 
         try:
-            response = self._call_gemini_api(prompt)
+            response = self._call_gemini_api(prompt, max_output_tokens=_OUTPUT_TOKENS_PER_ITEM * len(journals))
             if response:
-                results = {}
-                lines = response.strip().split('\n')
-                for i, line in enumerate(lines):
-                    if i < len(journals):
-                        wos_abbrev = line.split('.', 1)[-1].strip().strip('"\'').upper()
-                        results[journals[i]] = wos_abbrev
-                return results
+                results = _parse_numbered_response(response, journals)
+                return {journal: wos_abbrev.upper() for journal, wos_abbrev in results.items()}
         except Exception as e:
             logger.error(f"批量AI标准化期刊失败: {e}")
         return {}
 
-    def _call_gemini_api(self, prompt: str) -> Optional[str]:
+    def _call_gemini_api(self, prompt: str, max_output_tokens: int = 500) -> Optional[str]:
         """
-        调用Gemini API（改进的重试逻辑）
+        调用Gemini API（重试与限速见 utils.http.post_with_retry）
 
-        重试策略：
-        - 前5次：每次间隔5秒（快速重试）
-        - 后7次：每次间隔2分钟（慢速重试，针对429限流）
-        - 总共最多12次重试
+        max_output_tokens: 输出上限，由调用方按名称个数给出
         """
-        # ✅ 速率限制：在API调用前延迟（避免429错误）
-        time.sleep(self.request_delay)
-
         self.stats['api_calls'] += 1
 
         url = f"{self.config.api_url}/models/{self.config.model}:generateContent"
-
-        headers = {'Content-Type': 'application/json'}
         data = {
             'contents': [{'parts': [{'text': prompt}]}],
             'generationConfig': {
                 'temperature': 0.1,
-                'maxOutputTokens': 500
+                'maxOutputTokens': max_output_tokens
             }
         }
 
-        max_retries = 12  # 总共最多重试12次
-        retry_count = 0
-
-        while retry_count <= max_retries:
-            try:
-                response = requests.post(
-                    url,
-                    headers=headers,
-                    params={'key': self.config.api_key},
-                    json=data,
-                    timeout=self.config.timeout
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    if 'candidates' in result and len(result['candidates']) > 0:
-                        text = result['candidates'][0]['content']['parts'][0]['text']
-                        return text.strip()
-                    else:
-                        logger.error(f"响应格式错误或无candidates")
-                        return None
-
-                # API返回错误，需要重试
-                retry_count += 1
-                if retry_count > max_retries:
-                    if response.status_code == 429:
-                        logger.error(f"✗ 429错误重试已达上限（{max_retries}次），放弃")
-                    else:
-                        logger.error(f"✗ API错误重试已达上限（{max_retries}次），放弃")
-                    return None
-
-                # 确定等待时间
-                if retry_count <= 5:
-                    # 前5次：每次间隔5秒
-                    wait_time = 5
-                    logger.warning(f"⚠️ API错误（{response.status_code}），等待{wait_time}秒后重试... (尝试 {retry_count}/{max_retries}，快速重试阶段)")
-                else:
-                    # 后7次：每次间隔2分钟（针对429限流）
-                    wait_time = 120
-                    logger.warning(f"⚠️ API错误（{response.status_code}），等待{wait_time}秒（2分钟）后重试... (尝试 {retry_count}/{max_retries}，慢速重试阶段)")
-
-                if response.status_code != 200:
-                    logger.error(f"API错误: {response.status_code} - {response.text[:200]}")
-
-                time.sleep(wait_time)
-                logger.info("继续重试...")
-                continue
-
-            except requests.exceptions.Timeout:
-                retry_count += 1
-                if retry_count > max_retries:
-                    logger.error(f"✗ 超时错误重试已达上限（{max_retries}次），放弃")
-                    return None
-
-                # 确定等待时间
-                if retry_count <= 5:
-                    wait_time = 5
-                    logger.warning(f"⚠️ API调用超时（{self.config.timeout}秒），等待{wait_time}秒后重试... (尝试 {retry_count}/{max_retries}，快速重试阶段)")
-                else:
-                    wait_time = 120
-                    logger.warning(f"⚠️ API调用超时（{self.config.timeout}秒），等待{wait_time}秒（2分钟）后重试... (尝试 {retry_count}/{max_retries}，慢速重试阶段)")
-
-                time.sleep(wait_time)
-                continue
-
-            except Exception as e:
-                retry_count += 1
-                if retry_count > max_retries:
-                    logger.error(f"✗ API异常重试已达上限（{max_retries}次），放弃")
-                    return None
-
-                # 确定等待时间
-                if retry_count <= 5:
-                    wait_time = 5
-                    logger.warning(f"⚠️ API调用异常: {e}，等待{wait_time}秒后重试... (尝试 {retry_count}/{max_retries}，快速重试阶段)")
-                else:
-                    wait_time = 120
-                    logger.warning(f"⚠️ API调用异常: {e}，等待{wait_time}秒（2分钟）后重试... (尝试 {retry_count}/{max_retries}，慢速重试阶段)")
-
-                time.sleep(wait_time)
-                continue
-
-        # 不应该到达这里
-        logger.error("✗ API调用失败，已达最大重试次数")
+        result = post_with_retry(self._session, self._limiter, url, data, self.config.timeout,
+                                 params={'key': self.config.api_key})
+        if result is None:
+            return None
+        if 'candidates' in result and len(result['candidates']) > 0:
+            text = result['candidates'][0]['content']['parts'][0]['text']
+            return text.strip()
+        logger.error("响应格式错误或无candidates")
         return None
 
+    def close(self):
+        """关闭HTTP会话，释放连接池"""
+        self._session.close()
+
     def get_statistics(self) -> Dict:
         """获取统计信息"""
         total_author = self.stats['author_hits'] + self.stats['author_misses']
@@ -679,6 +642,7 @@ def main():
 
     # 保存数据库
     standardizer.db.save_database()
+    standardizer.close()
 
     # 显示统计
     stats = standardizer.get_statistics()
@@ -0,0 +1,99 @@
+"""Gemini API 请求共用的HTTP辅助函数。"""
+
+import time
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from .rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# 无 Retry-After 时的重试等待：前几次快速重试，之后慢速重试（针对429限流）
+_FAST_RETRIES = 5
+_FAST_RETRY_WAIT = 5
+_SLOW_RETRY_WAIT = 120
+
+
+def create_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    """创建所有线程共用的会话：复用 TCP/TLS 连接，不再每次调用都重新握手（重试由 post_with_retry 处理）"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def parse_retry_after(response) -> Optional[float]:
+    """解析 Retry-After 响应头（秒数或HTTP日期），没有或无法解析时返回None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def post_with_retry(session: requests.Session, limiter: RateLimiter, url: str, payload: Dict,
+                    timeout: float, max_retries: int = 12, params: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    POST JSON请求并按统一策略重试，成功时返回解析后的响应JSON，重试耗尽时返回None
+
+    重试策略：
+    - 每次请求（含重试）前从共享限速器取令牌；429时限速器降速，成功时逐步恢复
+    - 服务器返回 Retry-After 时按其等待
+    - 否则前5次：每次间隔5秒（快速重试）
+    - 之后：每次间隔2分钟（慢速重试，针对429限流）
+    """
+    for attempt in range(1, max_retries + 2):
+        limiter.acquire()
+        retry_after = None
+
+        try:
+            response = session.post(url, params=params, json=payload, timeout=timeout)
+
+            if response.status_code == 200:
+                limiter.on_success()
+                return response.json()
+        except requests.exceptions.Timeout:
+            error = f"API调用超时（{timeout}秒）"
+        except Exception as e:
+            error = f"调用Gemini API失败: {e}"
+        else:
+            # API返回错误，需要重试（429时同时降低共享请求速率）
+            error = f"API错误（{response.status_code}）"
+            logger.error(f"Gemini API错误: {response.status_code} - {response.text[:200]}")
+            if response.status_code == 429:
+                limiter.on_throttle()
+            retry_after = parse_retry_after(response)
+
+        if attempt > max_retries:
+            logger.error(f"✗ {error}，重试已达上限（{max_retries}次），放弃")
+            return None
+
+        if retry_after is not None:
+            wait_time = retry_after
+            stage = "按服务器Retry-After"
+        elif attempt <= _FAST_RETRIES:
+            wait_time = _FAST_RETRY_WAIT
+            stage = "快速重试阶段"
+        else:
+            wait_time = _SLOW_RETRY_WAIT
+            stage = "慢速重试阶段"
+
+        logger.warning(f"⚠️ {error}，等待{wait_time:g}秒后重试... (尝试 {attempt}/{max_retries}，{stage})")
+        time.sleep(wait_time)
+
+    return None
@@ -0,0 +1,22 @@
+"""JSON读写辅助（优先使用可选依赖 orjson，未安装时使用标准库 json）。"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
+
+
+def json_loads(data):
+    """解析JSON（优先使用 orjson；其解析错误同样是 json.JSONDecodeError）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps_bytes(obj) -> bytes:
+    """序列化为缩进2格的UTF-8 JSON字节串（格式同 json.dump(..., ensure_ascii=False, indent=2)）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
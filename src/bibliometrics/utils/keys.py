@@ -0,0 +1,35 @@
+"""数据库查找键的标准化（小写、去除标点、合并空白）。"""
+
+import re
+import functools
+from typing import Callable
+
+# 每个标准化函数缓存的键个数（同一名称查询和写入时共用一次标准化结果）
+_KEY_CACHE_SIZE = 1 << 17
+
+
+def make_key_normalizer(punct_pattern: str, cache_size: int = _KEY_CACHE_SIZE) -> Callable[[str], str]:
+    """
+    按标点字符类生成带缓存的键标准化函数
+
+    Args:
+        punct_pattern: 需要去除的单个字符的正则（如 r'[^\\w\\s|]'）
+        cache_size: 结果缓存的条目数
+
+    Returns:
+        text -> 小写、去标点、合并空白后的键
+    """
+    punct_re = re.compile(punct_pattern)
+    # 纯ASCII键改用 bytes.translate 删除同一组字符（由该正则生成，结果一致）
+    punct_ascii = bytes(c for c in range(128) if punct_re.match(chr(c)))
+
+    @functools.lru_cache(maxsize=cache_size)
+    def normalize_key(text: str) -> str:
+        key = text.lower()
+        if key.isascii():
+            key = key.encode('ascii').translate(None, punct_ascii).decode('ascii')
+        else:
+            key = punct_re.sub('', key)
+        return ' '.join(key.split())
+
+    return normalize_key
@@ -12,50 +12,89 @@ API速率限制器
 """
 
 import time
+import logging
 import threading
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
+# 连续成功多少次后提速一次、每次提速倍数、遇到429时的降速倍数
+_RATE_RECOVER_AFTER = 10
+_RATE_INCREASE_FACTOR = 1.25
+_RATE_DECREASE_FACTOR = 0.5
+# 降速下限（每秒请求数，即最慢每分钟一次）
+_MIN_REQUEST_RATE = 1 / 60
+
 
 class RateLimiter:
     """
     API速率限制器
 
     使用令牌桶算法实现速率限制，确保API调用不超过限制。
-    线程安全设计，支持多线程并发使用。
+    线程安全设计，支持多线程并发使用；遇到429时速率减半，连续成功后逐步恢复。
     """
 
-    def __init__(self, requests_per_minute: int = 30, min_interval: float = 1.5):
+    def __init__(self, requests_per_minute: float = 30, min_interval: float = 0.0, burst: int = 1):
         """
         初始化速率限制器
 
         Args:
-            requests_per_minute: 每分钟最大请求数（默认30，保守值）
-            min_interval: 最小请求间隔（秒，默认1.5秒）
+            requests_per_minute: 每分钟最大请求数（同时也是恢复速率的上限）
+            min_interval: 最小请求间隔（秒，大于0时进一步限制速率）
+            burst: 桶容量（允许的突发请求数）
         """
+        rate = requests_per_minute / 60
+        if min_interval > 0:
+            rate = min(rate, 1 / min_interval)
+
         self.requests_per_minute = requests_per_minute
         self.min_interval = min_interval
-        self.last_request_time = 0
-        self.lock = threading.Lock()
-
-    def acquire(self):
+        self._max_rate = max(rate, _MIN_REQUEST_RATE)
+        self._rate = self._max_rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """当前速率（每秒请求数）"""
+        return self._rate
+
+    def acquire(self, tokens: int = 1):
         """
         获取API调用许可（阻塞直到可以发送请求）
 
-        使用令牌桶算法：
-        1. 确保与上次请求间隔至少min_interval秒
-        2. 线程安全，多线程环境下正确工作
+        在锁内预留令牌、锁外等待，多个线程按到达顺序依次放行
         """
-        with self.lock:
-            current_time = time.time()
-            time_since_last_request = current_time - self.last_request_time
-
-            # 如果距离上次请求时间太短，等待
-            if time_since_last_request < self.min_interval:
-                wait_time = self.min_interval - time_since_last_request
-                time.sleep(wait_time)
-
-            # 更新上次请求时间
-            self.last_request_time = time.time()
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            wait_time = -self._tokens / self._rate if self._tokens < 0 else 0.0
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    def on_throttle(self):
+        """收到429：速率减半（不低于下限）"""
+        with self._lock:
+            self._refill()
+            self._rate = new_rate = max(self._rate * _RATE_DECREASE_FACTOR, _MIN_REQUEST_RATE)
+            self._successes = 0
+        logger.warning(f"⚠️ 触发限流，请求速率降至 {new_rate * 60:.1f} 次/分钟")
+
+    def on_success(self):
+        """请求成功：连续成功达到阈值后提速（不超过初始速率）"""
+        with self._lock:
+            if self._rate >= self._max_rate:
+                return
+            self._successes += 1
+            if self._successes < _RATE_RECOVER_AFTER:
+                return
+            self._refill()
+            self._rate = min(self._rate * _RATE_INCREASE_FACTOR, self._max_rate)
+            self._successes = 0
 
     def wait_for_quota(self, seconds: int = 60):
         """
@@ -66,6 +105,12 @@ class RateLimiter:
         """
         time.sleep(seconds)
 
+    def _refill(self):
+        """按当前速率补充令牌（调用方持有锁）"""
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
 
 # 全局单例实例
 _global_rate_limiter: Optional[RateLimiter] = None
@@ -111,7 +156,7 @@ if __name__ == '__main__':
 
     limiter = RateLimiter(requests_per_minute=30, min_interval=1.5)
 
-    print("测试连续5次请求（应该每次间隔1.5秒）...")
+    print("测试连续5次请求（第1次立即放行，之后每次间隔2秒）...")
     for i in range(5):
         start_time = time.time()
         limiter.acquire()
@@ -0,0 +1,19 @@
+"""WOS纯文本文件的记录切分。"""
+
+from typing import Iterator
+
+# 记录之间的分隔：空行后紧跟 "PT " 字段
+_RECORD_SEPARATOR = '\n\nPT '
+
+
+def iter_wos_record_blocks(content: str) -> Iterator[str]:
+    """
+    逐条产出WOS文件内容中以 "PT " 开头的记录块（文件头之前的部分不产出）
+
+    用 find 逐段定位记录边界直接切片，不先 split 出全部块再拼接 "PT " 前缀（少一次整文件拷贝）
+    """
+    start = content.find(_RECORD_SEPARATOR)
+    while start != -1:
+        end = content.find(_RECORD_SEPARATOR, start + len(_RECORD_SEPARATOR))
+        yield content[start + 2:end if end != -1 else len(content)]
+        start = end